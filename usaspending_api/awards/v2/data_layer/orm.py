@@ -25,7 +25,7 @@ from usaspending_api.common.helpers.business_categories_helper import get_busine
 from usaspending_api.common.helpers.data_constants import state_code_from_name, state_name_from_code
 from usaspending_api.common.helpers.date_helper import get_date_from_datetime
 from usaspending_api.common.helpers.sql_helpers import execute_sql_to_ordered_dictionary
-from usaspending_api.common.recipient_lookups import obtain_recipient_uri
+from usaspending_api.common.recipient_lookups import obtain_recipient_uris
 from usaspending_api.references.models import Agency, Cfda, PSC, NAICS, SubtierAgency, DisasterEmergencyFundCode
 from usaspending_api.submissions.models import SubmissionAttributes
 from usaspending_api.awards.v2.data_layer.sql import defc_sql
@@ -167,27 +167,28 @@ def construct_idv_response(requested_award_dict: dict) -> OrderedDict:
 
 
 def create_recipient_object(db_row_dict: dict) -> OrderedDict:
-    return OrderedDict(
+    recipient_hash, parent_recipient_hash = obtain_recipient_uris(
         [
             (
-                "recipient_hash",
-                obtain_recipient_uri(
-                    db_row_dict["_recipient_name"],
-                    db_row_dict["_recipient_unique_id"],
-                    db_row_dict["_parent_recipient_unique_id"],
-                ),
+                db_row_dict["_recipient_name"],
+                db_row_dict["_recipient_unique_id"],
+                db_row_dict["_parent_recipient_unique_id"],
+                False,  # is_parent_recipient
             ),
-            ("recipient_name", db_row_dict["_recipient_name"]),
-            ("recipient_unique_id", db_row_dict["_recipient_unique_id"]),
             (
-                "parent_recipient_hash",
-                obtain_recipient_uri(
-                    db_row_dict["_parent_recipient_name"],
-                    db_row_dict["_parent_recipient_unique_id"],
-                    None,  # parent_recipient_unique_id
-                    True,  # is_parent_recipient
-                ),
+                db_row_dict["_parent_recipient_name"],
+                db_row_dict["_parent_recipient_unique_id"],
+                None,  # parent_recipient_unique_id
+                True,  # is_parent_recipient
             ),
+        ]
+    )
+    return OrderedDict(
+        [
+            ("recipient_hash", recipient_hash),
+            ("recipient_name", db_row_dict["_recipient_name"]),
+            ("recipient_unique_id", db_row_dict["_recipient_unique_id"]),
+            ("parent_recipient_hash", parent_recipient_hash),
             ("parent_recipient_name", db_row_dict["_parent_recipient_name"]),
             ("parent_recipient_unique_id", db_row_dict["_parent_recipient_unique_id"]),
             (
@@ -31,6 +31,20 @@ def get_last_load_date(key, lookback_minutes=None, default=None):
     return last_load_date
 
 
+def get_last_load_dates(keys):
+    """
+    Retrieve the last_load_date of each of the keys with a single query, as a dictionary of key to last_load_date
+    (None for keys with no last_load_date).  Valid keys are dictated by the keys in EXTERNAL_DATA_TYPE_DICT.
+    """
+    keys_by_id = {lookups.EXTERNAL_DATA_TYPE_DICT[key]: key for key in keys}
+    last_load_dates = dict(
+        ExternalDataLoadDate.objects.filter(external_data_type_id__in=keys_by_id).values_list(
+            "external_data_type_id", "last_load_date"
+        )
+    )
+    return {key: last_load_dates.get(external_data_type_id) for external_data_type_id, key in keys_by_id.items()}
+
+
 def update_last_load_date(key, last_load_date):
     """
     Save the provided last_load_date to the database as UTC (which is our standard timezone).
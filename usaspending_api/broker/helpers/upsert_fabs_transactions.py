@@ -1,9 +1,11 @@
 import logging
 import time
 
+from collections import defaultdict
 from copy import copy
 from datetime import datetime, timezone
 from django.db import connection, transaction
+from django.db.models import F
 
 from usaspending_api.awards.models import TransactionFABS, TransactionNormalized, Award
 from usaspending_api.broker.helpers.get_business_categories import get_business_categories
@@ -15,6 +17,11 @@ from usaspending_api.common.helpers.timing_helpers import timer
 from usaspending_api.etl.award_helpers import update_awards, update_assistance_awards
 from usaspending_api.etl.broker_etl_helpers import dictfetchall
 from usaspending_api.etl.management.load_base import load_data_into_model, format_date
+from usaspending_api.etl.transaction_loaders.data_load_helpers import (
+    copy_to_staging_table,
+    format_column_list,
+    format_update_list,
+)
 from usaspending_api.references.models import Agency
 
 
@@ -22,6 +29,25 @@ logger = logging.getLogger("console")
 
 BATCH_FETCH_SIZE = 25000
 
+FABS_NORMALIZED_FIELD_MAP = {
+    "type": "assistance_type",
+    "description": "award_description",
+    "funding_amount": "total_funding_amount",
+}
+
+FABS_FIELD_MAP = {
+    "officer_1_name": "high_comp_officer1_full_na",
+    "officer_1_amount": "high_comp_officer1_amount",
+    "officer_2_name": "high_comp_officer2_full_na",
+    "officer_2_amount": "high_comp_officer2_amount",
+    "officer_3_name": "high_comp_officer3_full_na",
+    "officer_3_amount": "high_comp_officer3_amount",
+    "officer_4_name": "high_comp_officer4_full_na",
+    "officer_4_amount": "high_comp_officer4_amount",
+    "officer_5_name": "high_comp_officer5_full_na",
+    "officer_5_amount": "high_comp_officer5_amount",
+}
+
 
 def fetch_fabs_data_generator(dap_uid_list):
     db_cursor = connection.cursor()
@@ -47,33 +73,63 @@ def fetch_fabs_data_generator(dap_uid_list):
 @transaction.atomic
 def insert_all_new_fabs(all_new_to_insert):
     update_award_ids = []
+    subtier_agencies = get_subtier_agency_map()
     for to_insert in fetch_fabs_data_generator(all_new_to_insert):
         start = time.perf_counter()
-        update_award_ids.extend(insert_new_fabs(to_insert))
+        update_award_ids.extend(upsert_new_fabs(to_insert, subtier_agencies))
         logger.info("FABS insertions took {:.2f}s".format(time.perf_counter() - start))
     return update_award_ids
 
 
-def insert_new_fabs(to_insert):
-    fabs_normalized_field_map = {
-        "type": "assistance_type",
-        "description": "award_description",
-        "funding_amount": "total_funding_amount",
+def get_subtier_agency_map():
+    """Agencies by subtier code, for every subtier code Agency.get_by_subtier_only would find an agency for"""
+    agencies_by_subtier_code = defaultdict(list)
+    for agency in Agency.objects.annotate(subtier_code=F("subtier_agency__subtier_code")):
+        agencies_by_subtier_code[agency.subtier_code].append(agency)
+    return {code: agencies[0] for code, agencies in agencies_by_subtier_code.items() if len(agencies) == 1}
+
+
+def transform_fabs_row(row, award, awarding_agency, funding_agency):
+    """Returns the TransactionNormalized and TransactionFABS field values loaded from a source FABS row"""
+    try:
+        last_mod_date = datetime.strptime(str(row["modified_at"]), "%Y-%m-%d %H:%M:%S.%f").date()
+    except ValueError:
+        last_mod_date = datetime.strptime(str(row["modified_at"]), "%Y-%m-%d %H:%M:%S").date()
+
+    parent_txn_value_map = {
+        "award": award,
+        "awarding_agency": awarding_agency,
+        "funding_agency": funding_agency,
+        "period_of_performance_start_date": format_date(row["period_of_performance_star"]),
+        "period_of_performance_current_end_date": format_date(row["period_of_performance_curr"]),
+        "action_date": format_date(row["action_date"]),
+        "last_modified_date": last_mod_date,
+        "type_description": row["assistance_type_desc"],
+        "transaction_unique_id": row["afa_generated_unique"],
+        "business_categories": get_business_categories(row=row, data_type="fabs"),
     }
 
-    fabs_field_map = {
-        "officer_1_name": "high_comp_officer1_full_na",
-        "officer_1_amount": "high_comp_officer1_amount",
-        "officer_2_name": "high_comp_officer2_full_na",
-        "officer_2_amount": "high_comp_officer2_amount",
-        "officer_3_name": "high_comp_officer3_full_na",
-        "officer_3_amount": "high_comp_officer3_amount",
-        "officer_4_name": "high_comp_officer4_full_na",
-        "officer_4_amount": "high_comp_officer4_amount",
-        "officer_5_name": "high_comp_officer5_full_na",
-        "officer_5_amount": "high_comp_officer5_amount",
-    }
+    transaction_normalized_dict = load_data_into_model(
+        TransactionNormalized(),  # thrown away
+        row,
+        field_map=FABS_NORMALIZED_FIELD_MAP,
+        value_map=parent_txn_value_map,
+        as_dict=True,
+    )
+
+    financial_assistance_data = load_data_into_model(
+        TransactionFABS(), row, field_map=FABS_FIELD_MAP, as_dict=True  # thrown away
+    )
+
+    # Hack to cut back on the number of warnings dumped to the log.
+    financial_assistance_data["updated_at"] = cast_datetime_to_utc(financial_assistance_data["updated_at"])
+    financial_assistance_data["created_at"] = cast_datetime_to_utc(financial_assistance_data["created_at"])
+    financial_assistance_data["modified_at"] = cast_datetime_to_utc(financial_assistance_data["modified_at"])
+
+    return transaction_normalized_dict, financial_assistance_data
+
 
+def insert_new_fabs(to_insert):
     update_award_ids = []
     for row in to_insert:
         upper_case_dict_values(row)
@@ -94,41 +150,10 @@ def insert_new_fabs(to_insert):
         # Append row to list of Awards updated
         update_award_ids.append(award.id)
 
-        try:
-            last_mod_date = datetime.strptime(str(row["modified_at"]), "%Y-%m-%d %H:%M:%S.%f").date()
-        except ValueError:
-            last_mod_date = datetime.strptime(str(row["modified_at"]), "%Y-%m-%d %H:%M:%S").date()
-
-        parent_txn_value_map = {
-            "award": award,
-            "awarding_agency": awarding_agency,
-            "funding_agency": funding_agency,
-            "period_of_performance_start_date": format_date(row["period_of_performance_star"]),
-            "period_of_performance_current_end_date": format_date(row["period_of_performance_curr"]),
-            "action_date": format_date(row["action_date"]),
-            "last_modified_date": last_mod_date,
-            "type_description": row["assistance_type_desc"],
-            "transaction_unique_id": row["afa_generated_unique"],
-            "business_categories": get_business_categories(row=row, data_type="fabs"),
-        }
-
-        transaction_normalized_dict = load_data_into_model(
-            TransactionNormalized(),  # thrown away
-            row,
-            field_map=fabs_normalized_field_map,
-            value_map=parent_txn_value_map,
-            as_dict=True,
-        )
-
-        financial_assistance_data = load_data_into_model(
-            TransactionFABS(), row, field_map=fabs_field_map, as_dict=True  # thrown away
+        transaction_normalized_dict, financial_assistance_data = transform_fabs_row(
+            row, award, awarding_agency, funding_agency
         )
 
-        # Hack to cut back on the number of warnings dumped to the log.
-        financial_assistance_data["updated_at"] = cast_datetime_to_utc(financial_assistance_data["updated_at"])
-        financial_assistance_data["created_at"] = cast_datetime_to_utc(financial_assistance_data["created_at"])
-        financial_assistance_data["modified_at"] = cast_datetime_to_utc(financial_assistance_data["modified_at"])
-
         afa_generated_unique = financial_assistance_data["afa_generated_unique"]
         unique_fabs = TransactionFABS.objects.filter(afa_generated_unique=afa_generated_unique)
 
@@ -155,6 +180,139 @@ def insert_new_fabs(to_insert):
     return update_award_ids
 
 
+def upsert_new_fabs(to_insert, subtier_agencies):
+    """
+    Set based equivalent of insert_new_fabs. Agencies come from the preloaded subtier agency map, missing summary
+    awards are created in one statement and transactions are upserted from staging tables. Rows without a unique
+    award key are left to insert_new_fabs, since their awards are matched on other identifiers.
+    """
+    for row in to_insert:
+        upper_case_dict_values(row)
+    update_award_ids = insert_new_fabs([row for row in to_insert if not row["unique_award_key"]])
+    to_insert = [row for row in to_insert if row["unique_award_key"]]
+    if not to_insert:
+        return update_award_ids
+
+    awards = get_or_create_summary_awards(to_insert)
+
+    transaction_normalized_dicts = []
+    financial_assistance_dicts = []
+    for row in to_insert:
+        award = awards[row["unique_award_key"]]
+        update_award_ids.append(award.id)
+
+        transaction_normalized_dict, financial_assistance_data = transform_fabs_row(
+            row,
+            award,
+            subtier_agencies.get(row["awarding_sub_tier_agency_c"]),
+            subtier_agencies.get(row["funding_sub_tier_agency_co"]),
+        )
+        transaction_normalized_dict["update_date"] = datetime.now(timezone.utc)
+        transaction_normalized_dict["fiscal_year"] = fy(transaction_normalized_dict["action_date"])
+        transaction_normalized_dicts.append(transaction_normalized_dict)
+        financial_assistance_dicts.append(financial_assistance_data)
+
+    with connection.cursor() as cursor:
+        normalized_columns, normalized_updates = _stage_models(
+            cursor, TransactionNormalized, transaction_normalized_dicts, "temp_fabs_transaction_normalized"
+        )
+        fabs_columns, fabs_updates = _stage_models(
+            cursor, TransactionFABS, financial_assistance_dicts, "temp_fabs_transaction_fabs"
+        )
+
+        # afa_generated_unique is unique in the source table, so a batch never holds the same transaction twice
+        cursor.execute(
+            "update temp_fabs_transaction_fabs s set transaction_id = f.transaction_id "
+            "from transaction_fabs f where f.afa_generated_unique = s.afa_generated_unique"
+        )
+        cursor.execute(
+            "update temp_fabs_transaction_fabs s set transaction_id = new_ids.id from ("
+            "  select load_order, nextval(pg_get_serial_sequence('transaction_normalized', 'id')) as id "
+            "  from temp_fabs_transaction_fabs where transaction_id is null order by load_order"
+            ") new_ids where new_ids.load_order = s.load_order"
+        )
+        cursor.execute(
+            "update temp_fabs_transaction_normalized s set id = f.transaction_id "
+            "from temp_fabs_transaction_fabs f where f.load_order = s.load_order"
+        )
+
+        cursor.execute(
+            f"update transaction_normalized t set {format_update_list(normalized_updates, 's')} "
+            f"from temp_fabs_transaction_normalized s where t.id = s.id"
+        )
+        cursor.execute(
+            f"insert into transaction_normalized (id, {format_column_list(normalized_columns)}) "
+            f"select id, {format_column_list(normalized_columns)} from temp_fabs_transaction_normalized s "
+            f"where not exists (select from transaction_normalized t where t.id = s.id) order by load_order"
+        )
+        cursor.execute(
+            f"insert into transaction_fabs (transaction_id, {format_column_list(fabs_columns)}) "
+            f"select transaction_id, {format_column_list(fabs_columns)} from temp_fabs_transaction_fabs order by load_order "
+            f"on conflict (afa_generated_unique) do update set {format_update_list(fabs_updates, 'excluded')}"
+        )
+
+        cursor.execute("drop table temp_fabs_transaction_normalized")
+        cursor.execute("drop table temp_fabs_transaction_fabs")
+
+    return update_award_ids
+
+
+def get_or_create_summary_awards(rows):
+    """
+    Returns summary awards by unique award key, creating the missing ones in one statement with the values
+    Award.get_or_create_summary_award would give them
+    """
+    first_rows = {}
+    for row in rows:
+        first_rows.setdefault(row["unique_award_key"], row)
+
+    awards = {}
+    for award in (
+        Award.objects.filter(generated_unique_award_id__in=list(first_rows))
+        .order_by("-id")
+        .only("id", "generated_unique_award_id")
+    ):
+        awards[award.generated_unique_award_id] = award
+
+    # The per row load saves every award it is given, which stamps its update date
+    Award.objects.filter(id__in=[award.id for award in awards.values()]).update(update_date=datetime.now(timezone.utc))
+
+    new_awards = []
+    for unique_award_key, row in first_rows.items():
+        if unique_award_key not in awards:
+            lookup_value = {"piid": None}
+            if row["record_type"]:
+                lookup_value = {"fain": row["fain"]} if str(row["record_type"]) in ("2", "3") else {"uri": row["uri"]}
+            awards[unique_award_key] = Award(
+                generated_unique_award_id=unique_award_key,
+                is_fpds=unique_award_key.startswith("CONT_"),
+                **lookup_value,
+            )
+            new_awards.append(awards[unique_award_key])
+    Award.objects.bulk_create(new_awards)
+
+    return awards
+
+
+def _stage_models(cursor, model, field_values, staging_table):
+    """
+    Copies the rows that saving a model instance for each dict of field values would write into a temporary table
+    shaped like the model's table. Returns the columns staged and the columns named by the dicts, which are the ones
+    an update of an existing row writes.
+    """
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    columns = [field.column for field in fields]
+    updated_columns = [field.column for field in fields if field.name in field_values[0]]
+
+    rows = []
+    for values in field_values:
+        instance = model(**values)
+        rows.append([field.get_db_prep_save(field.pre_save(instance, True), connection) for field in fields])
+    copy_to_staging_table(cursor, rows, columns, staging_table, model._meta.db_table, [model._meta.pk.column] + columns)
+
+    return columns, updated_columns
+
+
 def upsert_fabs_transactions(ids_to_upsert, externally_updated_award_ids):
     if ids_to_upsert or externally_updated_award_ids:
         update_award_ids = copy(externally_updated_award_ids)
@@ -16,6 +16,12 @@ EXTERNAL_DATA_TYPE = [
     # "opposite" side of the broker data load, data from USAspending DB -> Elasticsearch
     LookupType(100, "es_transactions", "Load elasticsearch with transactions from USAspending"),
     LookupType(101, "es_awards", "Load elasticsearch with awards from USAspending"),
+    # tables derived within USAspending, whose loads invalidate what processes have read from them
+    LookupType(200, "recipient_lookup", "Update recipient_lookup in USAspending"),
+    LookupType(201, "tas", "Load TAS and federal accounts in USAspending"),
+    LookupType(202, "psc", "Load PSC in USAspending"),
+    LookupType(203, "naics", "Load NAICS in USAspending"),
+    LookupType(204, "recipient_profile", "Restock recipient_profile in USAspending"),
 ]
 EXTERNAL_DATA_TYPE_DICT = {item.name: item.id for item in EXTERNAL_DATA_TYPE}
 EXTERNAL_DATA_TYPE_DICT_ID = {item.id: item.name for item in EXTERNAL_DATA_TYPE}
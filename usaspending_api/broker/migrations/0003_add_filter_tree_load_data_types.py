@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+# The load dates load_tas, load_psc and load_naics record reference these through a foreign key
+FILTER_TREE_LOAD_DATA_TYPES = [
+    (201, "tas", "Load TAS and federal accounts in USAspending"),
+    (202, "psc", "Load PSC in USAspending"),
+    (203, "naics", "Load NAICS in USAspending"),
+]
+
+
+def add_filter_tree_load_data_types(apps, schema_editor):
+    ExternalDataType = apps.get_model("broker", "ExternalDataType")
+    for external_data_type_id, name, description in FILTER_TREE_LOAD_DATA_TYPES:
+        ExternalDataType.objects.update_or_create(
+            external_data_type_id=external_data_type_id, defaults={"name": name, "description": description}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("broker", "0002_auto_20190402_1457"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_filter_tree_load_data_types, migrations.RunPython.noop),
+    ]
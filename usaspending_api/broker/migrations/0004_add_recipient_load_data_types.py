@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+# The load dates update_recipient_lookup and restock_recipient_profile.sql record reference these through a foreign key
+RECIPIENT_LOAD_DATA_TYPES = [
+    (200, "recipient_lookup", "Update recipient_lookup in USAspending"),
+    (204, "recipient_profile", "Restock recipient_profile in USAspending"),
+]
+
+
+def add_recipient_load_data_types(apps, schema_editor):
+    ExternalDataType = apps.get_model("broker", "ExternalDataType")
+    for external_data_type_id, name, description in RECIPIENT_LOAD_DATA_TYPES:
+        ExternalDataType.objects.update_or_create(
+            external_data_type_id=external_data_type_id, defaults={"name": name, "description": description}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("broker", "0003_add_filter_tree_load_data_types"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_recipient_load_data_types, migrations.RunPython.noop),
+    ]
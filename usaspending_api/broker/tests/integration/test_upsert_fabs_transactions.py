@@ -0,0 +1,77 @@
+import pytest
+
+from datetime import datetime
+from model_mommy import mommy
+
+from usaspending_api.awards.models import TransactionFABS
+from usaspending_api.broker.helpers.upsert_fabs_transactions import (
+    get_subtier_agency_map,
+    insert_new_fabs,
+    upsert_new_fabs,
+)
+from usaspending_api.etl.transaction_loaders.tests.transaction_load_test_helpers import load_and_roll_back
+
+
+def _source_row(afa_generated_unique, unique_award_key, **values):
+    """A row as fetch_fabs_data_generator returns it"""
+    return {
+        "published_award_financial_assistance_id": int(afa_generated_unique[-1]),
+        "afa_generated_unique": afa_generated_unique,
+        "unique_award_key": unique_award_key,
+        "record_type": 2,
+        "fain": unique_award_key[-5:],
+        "uri": None,
+        "award_modification_amendme": afa_generated_unique,
+        "cfda_number": "10.001",
+        "awarding_sub_tier_agency_c": "0001",
+        "funding_sub_tier_agency_co": "0002",
+        "action_date": "2020-01-01",
+        "period_of_performance_star": "2020-01-01",
+        "period_of_performance_curr": "2021-01-01",
+        "assistance_type": "02",
+        "assistance_type_desc": "block grant",
+        "award_description": "description",
+        "business_types": "A",
+        "federal_action_obligation": 100,
+        "total_funding_amount": 150,
+        "modified_at": datetime(2020, 1, 2, 3, 4, 5),
+        "created_at": datetime(2020, 1, 1),
+        "updated_at": datetime(2020, 1, 2),
+        **values,
+    }
+
+
+def _load_with(loader):
+    """Loads one transaction, then a batch that updates it and adds others to new and existing awards"""
+
+    def load():
+        loader([_source_row("AFA_1", "ASST_NON_NEW_1")])
+        return loader(
+            [
+                _source_row("AFA_1", "ASST_NON_NEW_1", federal_action_obligation=200),
+                _source_row("AFA_2", "ASST_NON_NEW_2", awarding_sub_tier_agency_c="0002", record_type=1, uri="URI"),
+                _source_row("AFA_3", "ASST_NON_EXISTING"),
+                _source_row("AFA_4", "ASST_NON_NEW_2", funding_sub_tier_agency_co="0003"),
+            ]
+        )
+
+    return load_and_roll_back(load, TransactionFABS)
+
+
+@pytest.mark.django_db
+def test_set_based_upsert_matches_per_row_load():
+    mommy.make("references.Agency", subtier_agency__subtier_code="0001")
+    mommy.make("references.SubtierAgency", subtier_code="0002")
+    mommy.make("awards.Award", generated_unique_award_id="ASST_NON_EXISTING", transaction_unique_id="EXISTING")
+
+    subtier_agencies = get_subtier_agency_map()
+    assert list(subtier_agencies) == ["0001"]
+
+    rows_per_row, award_keys_per_row = _load_with(insert_new_fabs)
+    rows_set_based, award_keys_set_based = _load_with(lambda rows: upsert_new_fabs(rows, subtier_agencies))
+
+    assert award_keys_set_based == award_keys_per_row == ["ASST_NON_EXISTING", "ASST_NON_NEW_1", "ASST_NON_NEW_2"]
+    assert len(rows_set_based[0]) == 3
+    assert len(rows_set_based[2]) == 4
+    assert 200 in [row["federal_action_obligation"] for row in rows_set_based[2]]
+    assert rows_set_based == rows_per_row
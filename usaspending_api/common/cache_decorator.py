@@ -1,13 +1,154 @@
 # -*- coding: utf-8 -*-
 import logging
+import threading
+
+from collections import OrderedDict, namedtuple
+from django.conf import settings
+from django.core.cache.backends.dummy import DummyCache
+from django.http import HttpResponse
 from rest_framework_extensions.cache.decorators import CacheResponse
+from time import monotonic, perf_counter, sleep
 
 from usaspending_api.common.experimental_api_flags import is_experimental_elasticsearch_api
 
 logger = logging.getLogger("console")
 
+# What is stored in the caches for a response; the rendered bytes rather than the pickled response object
+CachedResponse = namedtuple("CachedResponse", ["status_code", "headers", "content"])
+
+# Headers describing how a response was served which must not be stored along with it
+UNCACHED_HEADERS = ("cache-trace", "cache-lookup-ms", "key")
+
+# Seconds between checks for a response being computed by another request, doubling up to the maximum
+LOCK_POLL_INTERVAL = 0.05
+MAX_LOCK_POLL_INTERVAL = 0.5
+# Locks held for this close to their timeout are left to expire rather than deleted, as they may already belong to
+# another request
+LOCK_EXPIRY_MARGIN = 1
+
+
+class LocalResponseCache:
+    """
+    Bounded, thread safe, least recently used cache of responses held in the memory of a single process.
+
+    It sits in front of the shared cache to avoid fetching (and transferring) the same hot responses over and over
+    again. Since it cannot be cleared along with the shared cache, entries only live for a short time.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        if self.max_entries <= 0 or timeout <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResponseCacheStats:
+    """Running totals of how cached endpoints were served by this process, reported in the server log"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.too_large = 0
+        self.coalesced = 0
+        self.lock_waits_expired = 0
+        self.errors = 0
+        self.lookup_seconds = 0.0
+
+    def record(self, outcome, lookup_seconds=0.0):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self.lookup_seconds += lookup_seconds
+
+    def as_dict(self):
+        with self._lock:
+            lookups = self.local_hits + self.shared_hits + self.coalesced + self.misses
+            return {
+                "local_hits": self.local_hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "sets": self.sets,
+                "too_large": self.too_large,
+                "coalesced": self.coalesced,
+                "lock_waits_expired": self.lock_waits_expired,
+                "errors": self.errors,
+                "local_entries": len(LOCAL_RESPONSE_CACHE),
+                "avg_lookup_ms": round(self.lookup_seconds * 1000 / lookups, 3) if lookups else 0.0,
+            }
+
+
+LOCAL_RESPONSE_CACHE = LocalResponseCache(settings.RESPONSE_CACHE_LOCAL_MAX_ENTRIES)
+RESPONSE_CACHE_STATS = ResponseCacheStats()
+
+
+def get_response_cache_stats():
+    return RESPONSE_CACHE_STATS.as_dict()
+
 
 class CustomCacheResponse(CacheResponse):
+    """
+    Caches rendered responses in two tiers: a small in-process LRU (LOCAL_RESPONSE_CACHE) in front of the shared
+    cache backend. On top of the arguments taken by CacheResponse (where "timeout" is the time to live in the shared
+    cache) a view can set:
+        max_entry_size -- responses with more bytes than this are not cached
+        local_timeout -- seconds a response lives in the in-process LRU; never longer than "timeout"
+        lock_timeout -- seconds a request computing a missing response holds its lock; 0 disables waiting on it
+        lock_wait -- seconds identical requests wait for that response before computing it themselves
+    """
+
+    def __init__(self, *args, max_entry_size=None, local_timeout=None, lock_timeout=None, lock_wait=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if max_entry_size is None:
+            max_entry_size = settings.RESPONSE_CACHE_MAX_ENTRY_SIZE
+        if local_timeout is None:
+            local_timeout = settings.RESPONSE_CACHE_LOCAL_TIMEOUT
+        if lock_timeout is None:
+            lock_timeout = settings.RESPONSE_CACHE_LOCK_TIMEOUT
+        if lock_wait is None:
+            lock_wait = settings.RESPONSE_CACHE_LOCK_WAIT
+        self.max_entry_size = max_entry_size
+        self.local_timeout = min(local_timeout, self.timeout) if self.timeout else local_timeout
+        self.lock_timeout = lock_timeout
+        self.lock_wait = lock_wait
+        # Nothing should be cached in-process, nor waited on, when caching is disabled
+        if isinstance(self.cache, DummyCache):
+            self.local_cache = None
+            self.lock_timeout = 0
+        else:
+            self.local_cache = LOCAL_RESPONSE_CACHE
+
     def process_cache_response(self, view_instance, view_method, request, args, kwargs):
         if is_experimental_elasticsearch_api(request):
             # bypass cache altogether
@@ -18,36 +159,161 @@ class CustomCacheResponse(CacheResponse):
         key = self.calculate_key(
             view_instance=view_instance, view_method=view_method, request=request, args=args, kwargs=kwargs
         )
-        response = None
-        try:
-            response = self.cache.get(key)
-        except Exception:
-            msg = "Problem while retrieving key [{k}] from cache for path:'{p}'"
-            logger.exception(msg.format(k=key, p=str(request.path)))
 
-        if not response:
-            response = view_method(view_instance, request, *args, **kwargs)
-            response = view_instance.finalize_response(request, response, *args, **kwargs)
-            response["Cache-Trace"] = "no-cache"
-            response.render()  # should be rendered, before picklining while storing to cache
-
-            if not response.status_code >= 400 or self.cache_errors:
-                if self.cache_errors:
-                    logger.error(self.cache_errors)
-                try:
-                    self.cache.set(key, response, self.timeout)
-                    response["Cache-Trace"] = "set-cache"
-                except Exception:
-                    msg = "Problem while writing to cache: path:'{p}' data:'{d}'"
-                    logger.exception(msg.format(p=str(request.path), d=str(request.data)))
+        lookup_start = perf_counter()
+        cached_response, cache_trace = self.get_cached_response(key, request)
+        lock_deadline = None
+        if cached_response is None and self.lock_timeout > 0:
+            # Only one request computes a missing response at a time; identical requests wait for it to be cached
+            lock_deadline = self.acquire_lock(key, request)
+            if lock_deadline is None:
+                cached_response = self.wait_for_cached_response(key, request)
+                cache_trace = "hit-coalesced-cache"
+        lookup_seconds = perf_counter() - lookup_start
+
+        if cached_response is None:
+            RESPONSE_CACHE_STATS.record("misses", lookup_seconds)
+            try:
+                response = view_method(view_instance, request, *args, **kwargs)
+                response = view_instance.finalize_response(request, response, *args, **kwargs)
+                response["Cache-Trace"] = "no-cache"
+                response.render()  # should be rendered, before storing its content in the cache
+
+                if not response.status_code >= 400 or self.cache_errors:
+                    if self.cache_errors:
+                        logger.error(self.cache_errors)
+                    self.set_cached_response(key, response, request)
+            finally:
+                if lock_deadline is not None:
+                    self.release_lock(key, lock_deadline)
         else:
-            response["Cache-Trace"] = "hit-cache"
+            if cache_trace == "hit-local-cache":
+                RESPONSE_CACHE_STATS.record("local_hits", lookup_seconds)
+            elif cache_trace == "hit-cache":
+                RESPONSE_CACHE_STATS.record("shared_hits", lookup_seconds)
+            else:
+                RESPONSE_CACHE_STATS.record("coalesced", lookup_seconds)
+            response = build_response(cached_response)
+            response["Cache-Trace"] = cache_trace
 
         if not hasattr(response, "_closable_objects"):
             response._closable_objects = []
 
+        response["Cache-Lookup-Ms"] = f"{lookup_seconds * 1000:.3f}"
         response["key"] = key
         return response
 
+    def get_cached_response(self, key, request):
+        cached_response = self.local_cache.get(key) if self.local_cache is not None else None
+        if cached_response is not None:
+            return cached_response, "hit-local-cache"
+
+        try:
+            cached_response = self.cache.get(key)
+        except Exception:
+            RESPONSE_CACHE_STATS.record("errors")
+            msg = "Problem while retrieving key [{k}] from cache for path:'{p}'"
+            logger.exception(msg.format(k=key, p=str(request.path)))
+        return self._accept_cached_response(key, cached_response), "hit-cache"
+
+    def _accept_cached_response(self, key, cached_response):
+        # Anything else (such as a response pickled by an earlier release) is treated as a miss
+        if not isinstance(cached_response, CachedResponse):
+            return None
+        if self.local_cache is not None:
+            self.local_cache.set(key, cached_response, self.local_timeout)
+        return cached_response
+
+    def acquire_lock(self, key, request):
+        """
+        Returns the monotonic time until which the lock is surely held when this request gets to compute the response
+        for key, or None when another request is already computing it. The lock is held in the shared cache so that
+        it spans processes and expires on its own should the request holding it never release it.
+        """
+        deadline = monotonic() + self.lock_timeout - LOCK_EXPIRY_MARGIN
+        try:
+            acquired = self.cache.add(lock_key(key), True, self.lock_timeout)
+        except Exception:
+            RESPONSE_CACHE_STATS.record("errors")
+            msg = "Problem while acquiring lock for key [{k}] from cache for path:'{p}'"
+            logger.exception(msg.format(k=key, p=str(request.path)))
+            return deadline
+        return deadline if acquired else None
+
+    def release_lock(self, key, deadline):
+        """
+        Delete the lock for key unless it may have expired, and been acquired by another request, since the deadline
+        acquire_lock returned. Until then no other request can hold it, so it is deleted without checking its owner.
+        """
+        if monotonic() >= deadline:
+            return
+        try:
+            self.cache.delete(lock_key(key))
+        except Exception:
+            RESPONSE_CACHE_STATS.record("errors")
+            logger.exception(f"Problem while releasing lock for key [{key}]")
+
+    def wait_for_cached_response(self, key, request):
+        """
+        Wait for the request holding the lock for key to cache its response. Returns None, so the response is computed
+        after all, when the lock is released without a response being cached (for example an error response) or
+        when the response is not cached within lock_wait seconds.
+        """
+        deadline = monotonic() + self.lock_wait
+        delay = LOCK_POLL_INTERVAL
+        while monotonic() < deadline:
+            sleep(delay)
+            delay = min(delay * 2, MAX_LOCK_POLL_INTERVAL)
+            try:
+                values = self.cache.get_many([key, lock_key(key)])
+            except Exception:
+                RESPONSE_CACHE_STATS.record("errors")
+                msg = "Problem while waiting on key [{k}] from cache for path:'{p}'"
+                logger.exception(msg.format(k=key, p=str(request.path)))
+                return None
+            cached_response = self._accept_cached_response(key, values.get(key))
+            if cached_response is not None:
+                return cached_response
+            if lock_key(key) not in values:
+                return None
+
+        RESPONSE_CACHE_STATS.record("lock_waits_expired")
+        logger.warning(f"Gave up waiting on the response for key [{key}] path:'{request.path}' to be cached")
+        return None
+
+    def set_cached_response(self, key, response, request):
+        if len(response.content) > self.max_entry_size:
+            RESPONSE_CACHE_STATS.record("too_large")
+            return
+
+        cached_response = CachedResponse(
+            status_code=response.status_code,
+            headers=[(k, v) for k, v in response.items() if k.lower() not in UNCACHED_HEADERS],
+            content=response.content,
+        )
+        try:
+            self.cache.set(key, cached_response, self.timeout)
+            RESPONSE_CACHE_STATS.record("sets")
+            response["Cache-Trace"] = "set-cache"
+        except Exception:
+            RESPONSE_CACHE_STATS.record("errors")
+            msg = "Problem while writing to cache: path:'{p}' data:'{d}'"
+            logger.exception(msg.format(p=str(request.path), d=str(request.data)))
+            return
+
+        if self.local_cache is not None:
+            self.local_cache.set(key, cached_response, self.local_timeout)
+
+
+def lock_key(key):
+    return f"{key}:lock"
+
+
+def build_response(cached_response):
+    response = HttpResponse(cached_response.content, status=cached_response.status_code)
+    for header, value in cached_response.headers:
+        response[header] = value
+    return response
+
 
 cache_response = CustomCacheResponse
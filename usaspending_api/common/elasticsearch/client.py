@@ -2,6 +2,8 @@ from typing import Union, Optional
 
 import certifi
 import logging
+import os
+import threading
 
 from django.conf import settings
 from elasticsearch import Elasticsearch
@@ -14,6 +16,9 @@ logger = logging.getLogger("console")
 CLIENT = None
 ElasticsearchResponse = Optional[Union[dict, Response]]
 
+_CLIENT_LOCK = threading.Lock()
+_CLIENT_HOSTNAME = None
+
 
 def instantiate_elasticsearch_client() -> Elasticsearch:
     es_kwargs = {"timeout": 300}
@@ -28,7 +33,11 @@ def create_es_client() -> Elasticsearch:
     if settings.ES_HOSTNAME is None or settings.ES_HOSTNAME == "":
         logger.error("env var 'ES_HOSTNAME' needs to be set for Elasticsearch connection")
     global CLIENT
-    es_config = {"hosts": [settings.ES_HOSTNAME], "timeout": settings.ES_TIMEOUT}
+    es_config = {
+        "hosts": [settings.ES_HOSTNAME],
+        "timeout": settings.ES_TIMEOUT,
+        "maxsize": settings.ES_CONNECTION_POOL_MAXSIZE,
+    }
     try:
         # If the connection string is using SSL with localhost, disable verifying
         # the certificates to allow testing in a development environment
@@ -46,3 +55,44 @@ def create_es_client() -> Elasticsearch:
         CLIENT = Elasticsearch(**es_config)
     except Exception as e:
         logger.error("Error creating the elasticsearch client: {}".format(e))
+    return CLIENT
+
+
+def get_es_client() -> Elasticsearch:
+    """
+    Return the Elasticsearch client shared by everything in this process, creating it on first use.  Sharing the
+    client means sharing its pool of (keep-alive) connections instead of paying for new connections and TLS handshakes
+    on every search.  Forked processes (gunicorn workers, multiprocessing) create their own client since sockets must
+    not be shared across processes.
+    """
+    global _CLIENT_HOSTNAME
+    if CLIENT is None or _CLIENT_HOSTNAME != settings.ES_HOSTNAME:
+        with _CLIENT_LOCK:
+            if CLIENT is None or _CLIENT_HOSTNAME != settings.ES_HOSTNAME:
+                _CLIENT_HOSTNAME = settings.ES_HOSTNAME
+                create_es_client()
+    return CLIENT
+
+
+def get_es_client_pool_stats() -> Optional[dict]:
+    """Usage of the shared client's connection pools, summed over all Elasticsearch nodes; None if not yet created"""
+    if CLIENT is None:
+        return None
+    pools = [connection.pool for connection in CLIENT.transport.connection_pool.connections]
+    return {
+        "maxsize": sum(pool.pool.maxsize for pool in pools),
+        # urllib3 keeps a slot in its queue for every connection (open or not) that is not checked out
+        "in_use": sum(pool.pool.maxsize - pool.pool.qsize() for pool in pools),
+        "connections_opened": sum(pool.num_connections for pool in pools),
+        "requests": sum(pool.num_requests for pool in pools),
+    }
+
+
+def _reset_client_after_fork():
+    global CLIENT, _CLIENT_HOSTNAME, _CLIENT_LOCK
+    CLIENT = None
+    _CLIENT_HOSTNAME = None
+    _CLIENT_LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_client_after_fork)
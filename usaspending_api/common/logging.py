@@ -5,6 +5,9 @@ import logging
 import traceback
 from time import perf_counter  # Matches response time browsers return more accurately than now()
 
+from usaspending_api.common.cache_decorator import get_response_cache_stats
+from usaspending_api.common.elasticsearch.client import get_es_client_pool_stats
+
 
 def get_remote_addr(request):
     """ Get IP address of user making request can be used for other logging"""
@@ -90,6 +93,13 @@ class LoggingMiddleware(MiddlewareMixin):
                 self.log["cache_key"] = response._headers["key"][1]
             if "cache-trace" in response._headers and len(response._headers["cache-trace"]) >= 2:
                 self.log["cache_trace"] = response._headers["cache-trace"][1]
+            if "cache-lookup-ms" in response._headers and len(response._headers["cache-lookup-ms"]) >= 2:
+                self.log["cache_lookup_ms"] = response._headers["cache-lookup-ms"][1]
+                self.log["response_cache"] = get_response_cache_stats()
+
+        es_connection_pool = get_es_client_pool_stats()
+        if es_connection_pool:
+            self.log["es_connection_pool"] = es_connection_pool
 
         if 100 <= status_code < 400:
             # Logged at an INFO level: 1xx (Informational), 2xx (Success), 3xx Redirection
@@ -1,4 +1,5 @@
 import logging
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.core.cache import caches
 
@@ -7,6 +8,9 @@ class Command(BaseCommand):
     """
     This command will clear the usaspending-cache (useful after a load or a deletion
     to ensure end users don't see stale data)
+
+    Responses the API processes hold in their own in-process caches are not cleared; they
+    expire on their own after RESPONSE_CACHE_LOCAL_TIMEOUT seconds
     """
 
     help = "Clears the usaspending-cache"
@@ -16,4 +20,6 @@ class Command(BaseCommand):
         self.logger.info("Clearing usaspending-cache...")
         cache = caches["usaspending-cache"]
         cache.clear()
-        self.logger.info("Done.")
+        self.logger.info(
+            f"Done. Responses cached in API processes expire within {settings.RESPONSE_CACHE_LOCAL_TIMEOUT} seconds."
+        )
@@ -1,9 +1,191 @@
+from collections import defaultdict, namedtuple
+from django.conf import settings
 from django.db.models import CharField, Expression
 from psycopg2.sql import Identifier, Literal, SQL
+from typing import Dict, Iterable, List, Optional, Tuple
+from usaspending_api.common.cache_decorator import LocalResponseCache
 from usaspending_api.common.helpers.sql_helpers import convert_composable_query_to_string
+from usaspending_api.common.versioned_cache import LoadVersionedValue
 from usaspending_api.recipient.models import RecipientLookup, RecipientProfile
 from usaspending_api.recipient.v2.lookups import SPECIAL_CASES
 
+# Levels of the recipient profiles of a recipient hash; named_levels leaves out profiles named for SPECIAL_CASES
+RecipientProfileLevels = namedtuple("RecipientProfileLevels", ["levels", "named_levels"])
+
+
+class RecipientProfileTable:
+    """
+    In-process table of the recipient_lookup and recipient_profile values needed to build recipient ids (recipient
+    hash + level), so that pages listing many recipients do not query for each one of them.
+
+    Values are read for a whole batch of recipients with one query per kind of value and are kept for
+    RECIPIENT_PROFILE_TABLE_TIMEOUT seconds. The table starts over when update_recipient_lookup or the restock of
+    recipient_profile (restock_recipient_profile.sql, run after it) records a load other than the one it was started
+    after, which is checked at most every RECIPIENT_PROFILE_TABLE_VERSION_CHECK seconds.
+    """
+
+    def __init__(self, max_entries, timeout):
+        self.timeout = timeout
+        self._entries = LoadVersionedValue(
+            ("recipient_lookup", "recipient_profile"),
+            lambda: LocalResponseCache(max_entries),
+            "RECIPIENT_PROFILE_TABLE_VERSION_CHECK",
+        )
+
+    def clear(self):
+        self._entries.clear()
+
+    def lookup_hashes(self, recipient_unique_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Map each DUNS to the recipient hash recipient_lookup has for it (or None)"""
+        return self._get_many("lookup_hash", recipient_unique_ids, _fetch_lookup_hashes)
+
+    def profile_levels(self, recipient_hashes: Iterable[str]) -> Dict[str, Optional[RecipientProfileLevels]]:
+        """Map each recipient hash to the levels of its recipient profiles (or None when it has no profiles)"""
+        return self._get_many("profile_levels", recipient_hashes, _fetch_profile_levels)
+
+    def profile_ids(self, recipient_unique_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Map each DUNS to the recipient id of its preferred, not SPECIAL_CASES, recipient profile (or None)"""
+        return self._get_many("profile_id", recipient_unique_ids, _fetch_profile_ids)
+
+    def _get_many(self, kind, keys, fetch):
+        entries = self._entries.get()
+        values = {}
+        missing_keys = set()
+        for key in set(keys):
+            entry = entries.get((kind, key))
+            if entry is None:
+                missing_keys.add(key)
+            else:
+                values[key] = entry[0]  # stored as a one item tuple, since None is cached as well
+
+        if missing_keys:
+            fetched = fetch(missing_keys)
+            for key in missing_keys:
+                values[key] = fetched.get(key)
+                entries.set((kind, key), (values[key],), self.timeout)
+
+        return values
+
+
+def _fetch_lookup_hashes(recipient_unique_ids):
+    lookups = RecipientLookup.objects.filter(duns__in=recipient_unique_ids).values_list("duns", "recipient_hash")
+    return {duns: str(recipient_hash) for duns, recipient_hash in lookups}
+
+
+def _fetch_profile_levels(recipient_hashes):
+    levels = defaultdict(str)
+    named_levels = defaultdict(str)
+    profiles = RecipientProfile.objects.filter(recipient_hash__in=recipient_hashes).values_list(
+        "recipient_hash", "recipient_level", "recipient_name"
+    )
+    for recipient_hash, recipient_level, recipient_name in profiles:
+        levels[str(recipient_hash)] += recipient_level
+        if recipient_name not in SPECIAL_CASES:
+            named_levels[str(recipient_hash)] += recipient_level
+    return {
+        recipient_hash: RecipientProfileLevels(recipient_levels, named_levels[recipient_hash])
+        for recipient_hash, recipient_levels in levels.items()
+    }
+
+
+def _fetch_profile_ids(recipient_unique_ids):
+    levels = defaultdict(lambda: defaultdict(str))
+    profiles = (
+        RecipientProfile.objects.filter(recipient_unique_id__in=recipient_unique_ids)
+        .exclude(recipient_name__in=SPECIAL_CASES)
+        .values_list("recipient_unique_id", "recipient_hash", "recipient_level")
+    )
+    for recipient_unique_id, recipient_hash, recipient_level in profiles:
+        levels[recipient_unique_id][str(recipient_hash)] += recipient_level
+
+    profile_ids = {}
+    for recipient_unique_id, levels_by_hash in levels.items():
+        preferred_levels = {h: preferred_recipient_level(levels) for h, levels in levels_by_hash.items()}
+        recipient_hash = min(preferred_levels, key=lambda h: recipient_level_order(preferred_levels[h]))
+        profile_ids[recipient_unique_id] = combine_recipient_hash_and_level(
+            recipient_hash, preferred_levels[recipient_hash]
+        )
+    return profile_ids
+
+
+RECIPIENT_PROFILE_TABLE = RecipientProfileTable(
+    settings.RECIPIENT_PROFILE_TABLE_MAX_ENTRIES, settings.RECIPIENT_PROFILE_TABLE_TIMEOUT
+)
+
+
+def recipient_level_order(recipient_level: str) -> int:
+    """Child level profiles are preferred to standalone ones, which are preferred to any other (parent) profile"""
+    return {"C": 0, "R": 1}.get(recipient_level, 2)
+
+
+def preferred_recipient_level(recipient_levels: str) -> Optional[str]:
+    return min(recipient_levels, key=recipient_level_order, default=None)
+
+
+def fetch_recipient_ids_by_hash(recipient_hashes: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Map each recipient hash to the recipient id (hash + level) of its preferred recipient profile, leaving out profiles
+    named for SPECIAL_CASES, or None when it has no such profile
+    """
+    profile_levels = RECIPIENT_PROFILE_TABLE.profile_levels(
+        str(recipient_hash) for recipient_hash in recipient_hashes if recipient_hash is not None
+    )
+    return {
+        recipient_hash: combine_recipient_hash_and_level(recipient_hash, preferred_recipient_level(levels.named_levels))
+        if levels is not None and levels.named_levels
+        else None
+        for recipient_hash, levels in profile_levels.items()
+    }
+
+
+def fetch_recipient_ids_by_duns(recipient_unique_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Map each DUNS to the recipient id (hash + level) of its preferred recipient profile, leaving out profiles named for
+    SPECIAL_CASES, or None when it has no such profile
+    """
+    return RECIPIENT_PROFILE_TABLE.profile_ids(duns for duns in recipient_unique_ids if duns is not None)
+
+
+def obtain_recipient_uris(recipients: List[Tuple[str, str, str, bool]]) -> List[Optional[str]]:
+    """
+    Batch version of obtain_recipient_uri; takes a list of (recipient_name, recipient_unique_id,
+    parent_recipient_unique_id, is_parent_recipient) and returns the recipient URI of each (or None)
+    """
+    recipient_unique_ids = [recipient[1] for recipient in recipients if recipient[1]]
+    lookup_hashes = RECIPIENT_PROFILE_TABLE.lookup_hashes(recipient_unique_ids)
+
+    candidates = []
+    for recipient_name, recipient_unique_id, parent_recipient_unique_id, is_parent_recipient in recipients:
+        if (is_parent_recipient and not recipient_unique_id) or not (recipient_unique_id or recipient_name):
+            candidates.append(None)
+            continue
+
+        recipient_hash = lookup_hashes.get(recipient_unique_id) if recipient_unique_id else None
+        if recipient_hash is None:
+            recipient_hash = generate_missing_recipient_hash(recipient_unique_id, recipient_name)
+
+        recipient_level = obtain_recipient_level(
+            {
+                "duns": recipient_unique_id,
+                "parent_duns": parent_recipient_unique_id,
+                "is_parent_recipient": is_parent_recipient,
+            }
+        )
+        candidates.append((recipient_hash, recipient_level))
+
+    # Confirm that a recipient profile exists for the recipient information we have collected/generated.
+    profile_levels = RECIPIENT_PROFILE_TABLE.profile_levels(
+        candidate[0] for candidate in candidates if candidate is not None
+    )
+    uris = []
+    for candidate in candidates:
+        levels = profile_levels.get(candidate[0]) if candidate is not None else None
+        if levels is not None and candidate[1] in levels.levels:
+            uris.append(combine_recipient_hash_and_level(*candidate))
+        else:
+            uris.append(None)
+    return uris
+
 
 def obtain_recipient_uri(recipient_name, recipient_unique_id, parent_recipient_unique_id, is_parent_recipient=False):
     """ Return a valid string to be used for api/v2/recipient/duns/<recipient-hash>/ (or None)
@@ -19,30 +201,9 @@ def obtain_recipient_uri(recipient_name, recipient_unique_id, parent_recipient_u
         Return example string: 11fcdf15-3490-cdad-3df4-3b410f3d9b20-C
 
     """
-    if (is_parent_recipient and not recipient_unique_id) or not (recipient_unique_id or recipient_name):
-        return None
-
-    if recipient_unique_id:
-        recipient_hash = fetch_recipient_hash_using_duns(recipient_unique_id)
-    else:
-        recipient_hash = None
-
-    if recipient_hash is None:
-        recipient_hash = generate_missing_recipient_hash(recipient_unique_id, recipient_name)
-
-    recipient_level = obtain_recipient_level(
-        {
-            "duns": recipient_unique_id,
-            "parent_duns": parent_recipient_unique_id,
-            "is_parent_recipient": is_parent_recipient,
-        }
-    )
-
-    # Confirm that a recipient profile exists for the recipient information we have collected/generated.
-    if RecipientProfile.objects.filter(recipient_hash=recipient_hash, recipient_level=recipient_level).exists():
-        return combine_recipient_hash_and_level(recipient_hash, recipient_level)
-
-    return None
+    return obtain_recipient_uris(
+        [(recipient_name, recipient_unique_id, parent_recipient_unique_id, is_parent_recipient)]
+    )[0]
 
 
 def generate_missing_recipient_hash(recipient_unique_id, recipient_name):
@@ -65,9 +226,7 @@ def generate_missing_recipient_hash(recipient_unique_id, recipient_name):
 
 
 def fetch_recipient_hash_using_duns(recipient_unique_id):
-    recipient = RecipientLookup.objects.filter(duns=recipient_unique_id).values("recipient_hash").first()
-
-    return recipient["recipient_hash"] if recipient else None
+    return RECIPIENT_PROFILE_TABLE.lookup_hashes([recipient_unique_id])[recipient_unique_id]
 
 
 def obtain_recipient_level(recipient_record: dict) -> str:
@@ -0,0 +1,166 @@
+import pytest
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import caches
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from usaspending_api.common import cache_decorator
+from usaspending_api.common.cache_decorator import CachedResponse, CustomCacheResponse, LocalResponseCache
+
+
+class CountingView(APIView):
+    calls = 0
+
+    def post(self, request):
+        CountingView.calls += 1
+        calls = CountingView.calls
+        if request.data.get("fail"):
+            raise ValueError("Failed")
+        time.sleep(request.data.get("sleep", 0))
+        return Response({"calls": calls, "request": request.data})
+
+
+@pytest.fixture
+def cached_view(monkeypatch):
+    monkeypatch.setattr(cache_decorator, "LOCAL_RESPONSE_CACHE", LocalResponseCache(10))
+    monkeypatch.setattr(cache_decorator, "RESPONSE_CACHE_STATS", cache_decorator.ResponseCacheStats())
+    monkeypatch.setattr(CountingView, "calls", 0)
+    caches["default"].clear()
+
+    def _cached_view(**kwargs):
+        decorator = CustomCacheResponse(cache="default", **kwargs)
+        return type("CachedCountingView", (CountingView,), {"post": decorator(CountingView.post)}).as_view()
+
+    yield _cached_view
+    caches["default"].clear()
+
+
+def _post(view, data):
+    response = view(APIRequestFactory().post("/api/v2/test/", data, format="json"))
+    if hasattr(response, "render"):
+        response.render()
+    return response
+
+
+def test_local_response_cache_evicts_least_recently_used():
+    cache = LocalResponseCache(2)
+    cache.set("a", 1, 60)
+    cache.set("b", 2, 60)
+    assert cache.get("a") == 1
+    cache.set("c", 3, 60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_local_response_cache_expires_entries():
+    cache = LocalResponseCache(2)
+    cache.set("a", 1, -1)
+    cache.set("b", 2, 0)
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert len(cache) == 0
+
+
+def test_response_served_from_each_tier(cached_view):
+    view = cached_view()
+
+    response = _post(view, {"page": 1})
+    assert response["Cache-Trace"] == "set-cache"
+    assert response.data == {"calls": 1, "request": {"page": 1}}
+
+    response = _post(view, {"page": 1})
+    assert response["Cache-Trace"] == "hit-local-cache"
+    assert response.content == b'{"calls":1,"request":{"page":1}}'
+    assert response["Content-Type"] == "application/json"
+
+    cache_decorator.LOCAL_RESPONSE_CACHE.clear()
+    response = _post(view, {"page": 1})
+    assert response["Cache-Trace"] == "hit-cache"
+    assert response.content == b'{"calls":1,"request":{"page":1}}'
+    assert "Cache-Lookup-Ms" in response
+
+    assert CountingView.calls == 1
+    stats = cache_decorator.get_response_cache_stats()
+    assert (stats["misses"], stats["local_hits"], stats["shared_hits"], stats["sets"]) == (1, 1, 1, 1)
+
+
+def test_rendered_bytes_are_stored(cached_view):
+    response = _post(cached_view(), {"page": 2})
+
+    cached_response = caches["default"].get(response["key"])
+    assert isinstance(cached_response, CachedResponse)
+    assert cached_response.status_code == 200
+    assert cached_response.content == response.content
+    assert {header.lower() for header, value in cached_response.headers}.isdisjoint({"cache-trace", "key"})
+
+
+def test_responses_over_max_entry_size_are_not_cached(cached_view):
+    view = cached_view(max_entry_size=10)
+
+    assert _post(view, {"page": 3})["Cache-Trace"] == "no-cache"
+    assert _post(view, {"page": 3})["Cache-Trace"] == "no-cache"
+    assert CountingView.calls == 2
+    assert cache_decorator.get_response_cache_stats()["too_large"] == 2
+
+
+def test_unrecognized_cache_entries_are_misses(cached_view):
+    view = cached_view()
+    key = _post(view, {"page": 4})["key"]
+    cache_decorator.LOCAL_RESPONSE_CACHE.clear()
+    caches["default"].set(key, {"pickled": "response"})
+
+    assert _post(view, {"page": 4})["Cache-Trace"] == "set-cache"
+    assert CountingView.calls == 2
+
+
+def test_identical_concurrent_misses_are_coalesced(cached_view):
+    view = cached_view()
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        responses = list(executor.map(lambda _: _post(view, {"sleep": 0.5}), range(5)))
+
+    assert CountingView.calls == 1
+    assert sorted(response["Cache-Trace"] for response in responses) == ["hit-coalesced-cache"] * 4 + ["set-cache"]
+    assert len({response.content for response in responses}) == 1
+    assert caches["default"].get(cache_decorator.lock_key(responses[0]["key"])) is None
+    assert cache_decorator.get_response_cache_stats()["coalesced"] == 4
+
+
+def test_waiting_gives_up_after_lock_wait(cached_view):
+    view = cached_view(lock_wait=0.2)
+    key = _post(view, {"page": 5})["key"]
+    caches["default"].clear()
+    cache_decorator.LOCAL_RESPONSE_CACHE.clear()
+    caches["default"].add(cache_decorator.lock_key(key), "held elsewhere", 60)
+
+    assert _post(view, {"page": 5})["Cache-Trace"] == "set-cache"
+    assert CountingView.calls == 2
+    assert cache_decorator.get_response_cache_stats()["lock_waits_expired"] == 1
+
+
+def test_lock_released_when_view_fails(cached_view):
+    view = cached_view(lock_wait=5)
+
+    with pytest.raises(ValueError):
+        _post(view, {"fail": True})
+
+    # Would wait out lock_wait if the first request had not released its lock
+    start = time.perf_counter()
+    with pytest.raises(ValueError):
+        _post(view, {"fail": True})
+    assert time.perf_counter() - start < 1
+    assert cache_decorator.get_response_cache_stats()["lock_waits_expired"] == 0
+
+
+def test_lock_left_to_expire_once_it_may_belong_to_another_request(cached_view, monkeypatch):
+    # The lock could have expired, and been acquired again, before any request finishes
+    monkeypatch.setattr(cache_decorator, "LOCK_EXPIRY_MARGIN", 60)
+    view = cached_view(lock_timeout=60)
+
+    response = _post(view, {"page": 1})
+    assert caches["default"].get(cache_decorator.lock_key(response["key"])) is True
@@ -0,0 +1,74 @@
+import pytest
+
+from io import BytesIO
+
+from usaspending_api.common import csv_helpers
+from usaspending_api.common.csv_helpers import (
+    concatenate_delimited_files,
+    count_rows_in_delimited_file,
+    iterate_delimited_records,
+    partition_large_delimited_file,
+)
+
+DELIMITED_DATA = b'id,name\n1,"multi\nline"\n2,"with ""quotes"", and comma"\n3,\0\n4,plain\n5,"x"\n6,last'
+
+
+@pytest.mark.parametrize("read_block_size", [1, 5, 4096])
+def test_count_rows_in_delimited_file(tmp_path, monkeypatch, read_block_size):
+    monkeypatch.setattr(csv_helpers, "READ_BLOCK_SIZE", read_block_size)
+    file_path = tmp_path / "test.csv"
+    file_path.write_bytes(DELIMITED_DATA)
+    assert count_rows_in_delimited_file(file_path) == 6
+    assert count_rows_in_delimited_file(file_path, has_header=False) == 7
+
+    file_path.write_bytes(DELIMITED_DATA + b"\n")
+    assert count_rows_in_delimited_file(file_path) == 6
+
+    file_path.write_bytes(b"")
+    assert count_rows_in_delimited_file(file_path) == 0
+
+
+@pytest.mark.parametrize("read_block_size", [1, 5, 4096])
+def test_partition_large_delimited_file(tmp_path, monkeypatch, read_block_size):
+    monkeypatch.setattr(csv_helpers, "READ_BLOCK_SIZE", read_block_size)
+    file_path = tmp_path / "test.csv"
+    file_path.write_bytes(DELIMITED_DATA + b"\n")
+
+    partitions = partition_large_delimited_file(str(file_path), row_limit=2, output_name_template="part_%s.csv")
+
+    assert partitions == [str(tmp_path / f"part_{i}.csv") for i in range(1, 4)]
+    assert [open(partition, "rb").read() for partition in partitions] == [
+        b'id,name\n1,"multi\nline"\n2,"with ""quotes"", and comma"\n',
+        b"id,name\n3,\0\n4,plain\n",
+        b'id,name\n5,"x"\n6,last\n',
+    ]
+
+    partitions = partition_large_delimited_file(str(file_path), row_limit=10, keep_headers=False)
+    assert len(partitions) == 1
+    assert open(partitions[0], "rb").read() == DELIMITED_DATA + b"\n"
+
+
+def test_concatenate_delimited_files(tmp_path):
+    file_paths = [tmp_path / "1.csv", tmp_path / "2.csv", tmp_path / "3.csv"]
+    file_paths[0].write_bytes(b"a,b\n1,2\n")
+    file_paths[1].write_bytes(b"a,b\n")
+    file_paths[2].write_bytes(b'a,b\n3,"4\n5"\n')
+    output_path = tmp_path / "output.csv"
+
+    concatenate_delimited_files(file_paths, output_path)
+
+    assert output_path.read_bytes() == b'a,b\n1,2\n3,"4\n5"\n'
+
+
+def test_iterate_delimited_records():
+    data = b'a,b,c\n1,"two\nlines",3\n4,"quoted ""comma"", here",6\n7,8,9'
+    assert list(iterate_delimited_records(BytesIO(data))) == [
+        b"a,b,c\n",
+        b'1,"two\nlines",3\n',
+        b'4,"quoted ""comma"", here",6\n',
+        b"7,8,9",
+    ]
+
+
+def test_iterate_delimited_records_empty_stream():
+    assert list(iterate_delimited_records(BytesIO(b""))) == []
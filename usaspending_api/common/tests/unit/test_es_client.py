@@ -0,0 +1,38 @@
+import os
+
+from usaspending_api.common.elasticsearch import client
+from usaspending_api.common.elasticsearch.search_wrappers import AwardSearch, TransactionSearch
+
+
+def test_get_es_client_is_shared(monkeypatch):
+    monkeypatch.setattr(client, "CLIENT", None)
+    es_client = client.get_es_client()
+
+    assert es_client is not None
+    assert client.get_es_client() is es_client
+    assert TransactionSearch()._using is es_client
+    assert AwardSearch()._using is es_client
+
+
+def test_get_es_client_is_recreated_after_fork(monkeypatch):
+    monkeypatch.setattr(client, "CLIENT", None)
+    es_client = client.get_es_client()
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write_fd, b"1" if client.CLIENT is None and client.get_es_client() is not es_client else b"0")
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read_fd, 1) == b"1"
+
+
+def test_get_es_client_pool_stats(monkeypatch):
+    monkeypatch.setattr(client, "CLIENT", None)
+    assert client.get_es_client_pool_stats() is None
+
+    client.get_es_client()
+    stats = client.get_es_client_pool_stats()
+    assert stats["maxsize"] >= 1
+    assert stats["in_use"] == 0
+    assert stats["requests"] == 0
@@ -1,8 +1,17 @@
 import pytest
 
+from datetime import datetime, timezone
 from model_mommy import mommy
 
-from usaspending_api.common.recipient_lookups import obtain_recipient_uri
+from usaspending_api.broker.helpers.last_load_date import update_last_load_date
+from usaspending_api.broker.lookups import EXTERNAL_DATA_TYPE_DICT
+from usaspending_api.common.recipient_lookups import (
+    fetch_recipient_ids_by_duns,
+    fetch_recipient_ids_by_hash,
+    obtain_recipient_uri,
+    obtain_recipient_uris,
+)
+from usaspending_api.recipient.models import RecipientProfile
 
 
 @pytest.fixture
@@ -101,3 +110,90 @@ def test_parent_recipient_with_id_and_name(recipient_lookup):
     }
     expected_result = "01c03484-d1bd-41cc-2aca-4b427a2d0611-P"
     assert obtain_recipient_uri(**child_recipient_parameters) == expected_result
+
+
+# Batch Tests
+@pytest.mark.django_db
+def test_obtain_recipient_uris(recipient_lookup, django_assert_num_queries):
+    recipients = [
+        ("Child Recipient Test", "456", "123", False),
+        ("Child Recipient Test Without ID", None, "123", False),
+        (None, "123", None, True),
+        (None, None, None, True),
+        ("Recipient Without Profile", "789", None, False),
+    ]
+    expected_results = [
+        "1c4e7c2a-efe3-1b7e-2190-6f4487f808ac-C",
+        "b2c8fe8e-b520-c47f-31e3-3620a358ce48-C",
+        "01c03484-d1bd-41cc-2aca-4b427a2d0611-P",
+        None,
+        None,
+    ]
+
+    # The version check, the recipient_lookup hashes, and the recipient_profile levels
+    with django_assert_num_queries(3):
+        assert obtain_recipient_uris(recipients) == expected_results
+    with django_assert_num_queries(0):
+        assert obtain_recipient_uris(recipients) == expected_results
+        assert [obtain_recipient_uri(*recipient) for recipient in recipients] == expected_results
+
+
+@pytest.mark.django_db
+def test_fetch_recipient_ids(django_assert_num_queries):
+    for recipient_level in ("P", "R", "C"):
+        mommy.make(
+            "recipient.RecipientProfile",
+            recipient_hash="01c03484-d1bd-41cc-2aca-4b427a2d0611",
+            recipient_level=recipient_level,
+            recipient_unique_id="123",
+            recipient_name="PARENT RECIPIENT",
+        )
+    mommy.make(
+        "recipient.RecipientProfile",
+        recipient_hash="1c4e7c2a-efe3-1b7e-2190-6f4487f808ac",
+        recipient_level="R",
+        recipient_unique_id="456",
+        recipient_name="MULTIPLE RECIPIENTS",
+    )
+
+    with django_assert_num_queries(2):
+        assert fetch_recipient_ids_by_duns(["123", "456", "789", None]) == {
+            "123": "01c03484-d1bd-41cc-2aca-4b427a2d0611-C",
+            "456": None,
+            "789": None,
+        }
+    with django_assert_num_queries(1):
+        assert fetch_recipient_ids_by_hash(
+            ["01c03484-d1bd-41cc-2aca-4b427a2d0611", "1c4e7c2a-efe3-1b7e-2190-6f4487f808ac"]
+        ) == {
+            "01c03484-d1bd-41cc-2aca-4b427a2d0611": "01c03484-d1bd-41cc-2aca-4b427a2d0611-C",
+            "1c4e7c2a-efe3-1b7e-2190-6f4487f808ac": None,
+        }
+
+
+@pytest.mark.django_db
+def test_recipient_profile_table_refreshed_by_update_recipient_lookup(recipient_lookup, settings):
+    mommy.make("broker.ExternalDataType", external_data_type_id=EXTERNAL_DATA_TYPE_DICT["recipient_lookup"])
+    settings.RECIPIENT_PROFILE_TABLE_VERSION_CHECK = 0
+    assert obtain_recipient_uri(None, "789", "123") is None
+
+    mommy.make("recipient.RecipientLookup", duns="789", recipient_hash="b2c8fe8e-b520-c47f-31e3-3620a358ce48")
+    assert obtain_recipient_uri(None, "789", "123") is None
+
+    update_last_load_date("recipient_lookup", datetime.now(timezone.utc))
+    assert obtain_recipient_uri(None, "789", "123") == "b2c8fe8e-b520-c47f-31e3-3620a358ce48-C"
+
+
+@pytest.mark.django_db
+def test_recipient_profile_table_refreshed_by_recipient_profile_restock(recipient_lookup, settings):
+    mommy.make("broker.ExternalDataType", external_data_type_id=EXTERNAL_DATA_TYPE_DICT["recipient_profile"])
+    settings.RECIPIENT_PROFILE_TABLE_VERSION_CHECK = 0
+    assert fetch_recipient_ids_by_duns(["456"]) == {"456": None}
+
+    RecipientProfile.objects.filter(recipient_hash="1c4e7c2a-efe3-1b7e-2190-6f4487f808ac").update(
+        recipient_unique_id="456"
+    )
+    assert fetch_recipient_ids_by_duns(["456"]) == {"456": None}
+
+    update_last_load_date("recipient_profile", datetime.now(timezone.utc))
+    assert fetch_recipient_ids_by_duns(["456"]) == {"456": "1c4e7c2a-efe3-1b7e-2190-6f4487f808ac-C"}
@@ -0,0 +1,41 @@
+from usaspending_api.common.elasticsearch import search_wrappers
+from usaspending_api.common.elasticsearch.search_wrappers import TransactionSearch
+
+
+class _RecordingClient:
+    """Stands in for the Elasticsearch client, recording every request made to the cluster"""
+
+    def __init__(self):
+        self.requests = []
+
+    def search(self, **kwargs):
+        self.requests.append(("search", kwargs))
+        return {"took": 1, "timed_out": False, "hits": {"total": {"value": 42, "relation": "eq"}, "hits": []}}
+
+    def count(self, **kwargs):
+        self.requests.append(("count", kwargs))
+        return {"count": 42}
+
+
+def test_handle_count_makes_a_single_request(monkeypatch):
+    client = _RecordingClient()
+    monkeypatch.setattr(search_wrappers, "get_es_client", lambda: client)
+
+    search = TransactionSearch().filter("term", type="A")
+    assert search.handle_count() == 42
+
+    assert len(client.requests) == 1
+    request_type, request = client.requests[0]
+    assert request_type == "search"
+    assert request["body"]["size"] == 0
+    assert request["body"]["track_total_hits"] is True
+    assert request["body"]["query"] == search.to_dict()["query"]
+    assert request["timeout"] == "90s"
+
+
+def test_handle_count_without_response(monkeypatch):
+    client = _RecordingClient()
+    monkeypatch.setattr(search_wrappers, "get_es_client", lambda: client)
+    monkeypatch.setattr(TransactionSearch, "execute", lambda self: None)
+
+    assert TransactionSearch().handle_count(retries=2) is None
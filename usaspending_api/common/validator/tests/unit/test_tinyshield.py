@@ -229,3 +229,46 @@ def test_any_rule():
     # Test with required 'value' missing.
     with pytest.raises(UnprocessableEntityException):
         TinyShield(models).block({"another_value": 2})
+
+
+def test_compile_caches_on_model_list_identity():
+    models = [{"name": "id", "key": "id", "type": "integer", "optional": False}]
+
+    compiled = TinyShield.compile(models)
+
+    assert TinyShield.compile(models) is compiled
+    assert TinyShield.compile(copy.deepcopy(models)) is not compiled
+    assert compiled.rules is not models
+    assert compiled.rules[0]["optional"] is False
+
+
+def test_compiled_rules_are_not_changed_by_requests():
+    models = [
+        {"name": "id", "key": "id", "type": "integer", "optional": False},
+        {"name": "extra", "key": "extra", "type": "passthrough", "default": {}},
+        {
+            "name": "value",
+            "key": "filters|value",
+            "type": "any",
+            "models": [{"type": "integer"}, {"type": "text", "text_type": "search"}],
+        },
+    ]
+    compiled = TinyShield.compile(models)
+
+    validated = compiled.block({"id": "1", "filters": {"value": "XYZ"}})
+    assert validated == {"id": 1, "extra": {}, "filters": {"value": "XYZ"}}
+    validated["extra"]["changed"] = True
+
+    with pytest.raises(UnprocessableEntityException, match="Missing value: 'id' is a required field"):
+        compiled.block({"filters": {"value": 2}})
+
+    assert compiled.block({"id": 2}) == {"id": 2, "extra": {}}
+    assert all("value" not in rule for rule in compiled.rules)
+    assert all("value" not in model for model in compiled.rules[2]["models"])
+
+
+def test_compiled_award_filter_matches_uncompiled():
+    compiled = TinyShield.compile(AWARD_FILTER)
+
+    assert compiled.block(FILTER_OBJ) == TinyShield(copy.deepcopy(AWARD_FILTER)).block(FILTER_OBJ) == FILTER_OBJ
+    assert compiled.block(FILTER_OBJ) == FILTER_OBJ
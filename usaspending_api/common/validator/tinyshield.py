@@ -45,6 +45,9 @@ VALIDATORS = {
     },
 }
 
+# TinyShields compiled by TinyShield.compile, keyed on the identity of the model list they were compiled from
+_COMPILED_TINY_SHIELDS = {}
+
 
 # Decorator
 
@@ -70,7 +73,7 @@ def validate_post_request(model_list):
 
 # Main entrypoint
 def validation_function(request, model_list):
-    new_request_data = TinyShield(copy.deepcopy(model_list)).block(request.data)
+    new_request_data = TinyShield.compile(model_list).block(request.data)
     if hasattr(request.data, "_mutable"):
         mutable = request.data._mutable
         request.data._mutable = True
@@ -175,16 +178,43 @@ class TinyShield:
 
     A dictionary of the validated data keyed on model.key from the input "model" list provided during instantiation.
     Validated data is also accessible via self.data.
+
+    REUSE
+
+    Checking a model list is repeated on every instantiation.  Views that validate every request against the same
+    module level model list should compile it once instead:
+
+        validated = TinyShield.compile(MODELS).block(request.data)
+
+    "block" leaves the compiled rules untouched, so the same TinyShield can validate any number of requests.
     """
 
     def __init__(self, model_list):
         self.rules = self.check_models(model_list)
         self.data = {}
 
+    @classmethod
+    def compile(cls, model_list):
+        """
+        Return a TinyShield for a copy of model_list, checking the models only the first time the list is seen.
+        The compiled TinyShield is cached on the identity of model_list and keeps it alive, so only pass lists that
+        live for the life of the process (module level constants) and are not modified after their first use.
+        """
+        compiled = _COMPILED_TINY_SHIELDS.get(id(model_list))
+        if compiled is None:
+            compiled = (model_list, cls(copy.deepcopy(model_list)))
+            _COMPILED_TINY_SHIELDS[id(model_list)] = compiled
+        return compiled[1]
+
     def block(self, request):
-        self.parse_request(request)
-        self.enforce_rules()
-        return self.data
+        # Validate against copies of the rules so the values of this request are not left behind in self.rules
+        validator = copy.copy(self)
+        validator.rules = [copy.copy(rule) for rule in self.rules]
+        validator.data = {}
+        validator.parse_request(request)
+        validator.enforce_rules()
+        self.data = validator.data
+        return validator.data
 
     def check_model(self, model, in_any=False):
         # Confirm required fields (both baseline and type-specific) are in the model
@@ -250,7 +280,7 @@ class TinyShield:
                 raise UnprocessableEntityException("Missing value: '{}' is a required field".format(item["key"]))
             elif "default" in item:
                 # If value wasn't found, and this is optional, use the default
-                item["value"] = item["default"]
+                item["value"] = copy.deepcopy(item["default"])
             else:
                 # This model/field is optional, no value provided, and no default value.
                 # Use the "hidden" feature Ellipsis since None can be a valid value provided in the request
@@ -309,7 +339,8 @@ class TinyShield:
             _return = object_result
         # Any is a "special" type since it is is really a collection of other rules.
         elif rule["type"] == "any":
-            for child_rule in rule["models"]:
+            for model in rule["models"]:
+                child_rule = copy.copy(model)
                 child_rule["value"] = rule["value"]
                 try:
                     # First successful rule wins.
@@ -0,0 +1,65 @@
+import threading
+
+from django.conf import settings
+from time import monotonic
+from typing import Any, Callable, Optional, Sequence, Union
+from usaspending_api.broker.helpers.last_load_date import get_last_load_dates
+
+
+class LoadVersionedValue:
+    """
+    A value built from data loaded into USAspending and held in the memory of a process, which is versioned on the
+    last load dates the loaders of that data record with update_last_load_date.
+
+    The value is built by `build` the first time it is needed and is treated as read only. It is built again when the
+    loader for `data_type` (a key of EXTERNAL_DATA_TYPE_DICT, or several of them) records a load other than the one
+    it was built after, which is checked at most every `version_check_setting` seconds, or once it is
+    `timeout_setting` seconds old. Both are names of settings, read whenever the value is used.
+    """
+
+    def __init__(
+        self,
+        data_type: Union[str, Sequence[str]],
+        build: Callable[[], Any],
+        version_check_setting: str,
+        timeout_setting: Optional[str] = None,
+    ):
+        self.data_types = (data_type,) if isinstance(data_type, str) else tuple(data_type)
+        self.build = build
+        self.version_check_setting = version_check_setting
+        self.timeout_setting = timeout_setting
+        self._lock = threading.Lock()
+        self._value = None
+        self._version = None
+        self._built_at = None
+        self._version_checked_at = None
+
+    def clear(self):
+        with self._lock:
+            self._value = None
+
+    def get(self) -> Any:
+        now = monotonic()
+        with self._lock:
+            value = self._value
+            if value is not None and not self._expired(now):
+                if now - self._version_checked_at < getattr(settings, self.version_check_setting):
+                    return value
+
+        version = get_last_load_dates(self.data_types)
+        with self._lock:
+            if value is not None and value is self._value and version == self._version and not self._expired(now):
+                self._version_checked_at = now
+                return value
+
+        # Built outside of the lock; requests racing to rebuild the same value only cost the extra queries
+        value = self.build()
+        with self._lock:
+            self._value = value
+            self._version = version
+            self._built_at = now
+            self._version_checked_at = now
+        return value
+
+    def _expired(self, now):
+        return self.timeout_setting is not None and now - self._built_at >= getattr(settings, self.timeout_setting)
@@ -20,6 +20,8 @@ from usaspending_api.common.sqs.sqs_handler import (
     _FakeUnitTestFileBackedSQSQueue,
 )
 from usaspending_api.common.helpers.generic_helper import generate_matviews
+from usaspending_api.common.recipient_lookups import RECIPIENT_PROFILE_TABLE
+from usaspending_api.references.v2.views.filter_tree.filter_tree import clear_snapshot_caches
 from usaspending_api.conftest_helpers import (
     TestElasticSearchIndex,
     ensure_broker_server_dblink_exists,
@@ -293,6 +295,18 @@ def temp_file_path():
         pass
 
 
+@pytest.fixture(autouse=True)
+def clear_recipient_profile_table():
+    """Recipients held in process by RECIPIENT_PROFILE_TABLE must not outlive the test data they were read from"""
+    RECIPIENT_PROFILE_TABLE.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_filter_tree_snapshots():
+    """Filter trees held in process by SnapshotCache must not outlive the test data they were built from"""
+    clear_snapshot_caches()
+
+
 @pytest.fixture(scope="session")
 def unittest_fake_sqs_queue_instance():
     fake_unittest_q = _FakeUnitTestFileBackedSQSQueue.instance()
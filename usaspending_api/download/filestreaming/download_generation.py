@@ -10,15 +10,23 @@ import re
 import shutil
 import subprocess
 import tempfile
+import threading
 import time
 import traceback
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from django.conf import settings
+from django.db import connection
 
 from usaspending_api.awards.v2.filters.filter_helpers import add_date_range_comparison_types
 from usaspending_api.awards.v2.lookups.lookups import contract_type_mapping, assistance_type_mapping, idv_type_mapping
-from usaspending_api.common.csv_helpers import count_rows_in_delimited_file, partition_large_delimited_file
+from usaspending_api.common.csv_helpers import (
+    concatenate_delimited_files,
+    count_rows_in_delimited_file,
+    iterate_delimited_records,
+    partition_large_delimited_file,
+)
 from usaspending_api.common.exceptions import InvalidParameterException
 from usaspending_api.common.helpers.orm_helpers import generate_raw_quoted_query
 from usaspending_api.common.helpers.text_helpers import slugify_text_for_file_names
@@ -27,7 +35,11 @@ from usaspending_api.download.download_utils import construct_data_date_range
 from usaspending_api.download.filestreaming import NAMING_CONFLICT_DISCRIMINATOR
 from usaspending_api.download.filestreaming.download_source import DownloadSource
 from usaspending_api.download.filestreaming.file_description import build_file_description, save_file_description
-from usaspending_api.download.filestreaming.zip_file import append_files_to_zip_file
+from usaspending_api.download.filestreaming.zip_file import (
+    append_files_to_zip_file,
+    merge_zip_files,
+    write_records_to_partitioned_zip_file,
+)
 from usaspending_api.download.helpers import (
     verify_requested_columns_available,
     multipart_upload,
@@ -41,6 +53,9 @@ MAX_VISIBILITY_TIMEOUT = 60 * 60 * 4
 EXCEL_ROW_LIMIT = 1000000
 WAIT_FOR_PROCESS_SLEEP = 5
 
+# Guards updates to the DownloadJob when its sources are generated concurrently
+DOWNLOAD_JOB_LOCK = threading.Lock()
+
 logger = logging.getLogger(__name__)
 
 
@@ -72,18 +87,12 @@ def generate_download(download_job: DownloadJob, origination: Optional[str] = No
 
         # Generate sources from the JSON request object
         sources = get_download_sources(json_request, origination)
-        for source in sources:
-            # Parse and write data to the file; if there are no matching columns for a source then add an empty file
-            source_column_count = len(source.columns(columns))
-            if source_column_count == 0:
-                create_empty_data_file(
-                    source, download_job, working_dir, piid, assistance_id, zip_file_path, file_format
-                )
-            else:
-                download_job.number_of_columns += source_column_count
-                parse_source(
-                    source, columns, download_job, working_dir, piid, assistance_id, zip_file_path, limit, file_format
-                )
+        source_args = (columns, download_job, working_dir, piid, assistance_id, limit, file_format)
+        if len(sources) > 1 and settings.DOWNLOAD_SOURCE_WORKERS > 1:
+            generate_sources_in_parallel(sources, source_args, zip_file_path)
+        else:
+            for source in sources:
+                generate_source(source, *source_args, zip_file_path)
         include_data_dictionary = json_request.get("include_data_dictionary")
         if include_data_dictionary:
             add_data_dictionary_to_zip(working_dir, zip_file_path)
@@ -240,6 +249,59 @@ def build_data_file_name(source, download_job, piid, assistance_id):
     return data_file_name
 
 
+def generate_sources_in_parallel(sources, source_args, zip_file_path):
+    """
+    Export the sources concurrently using a bounded pool of workers.  Each source writes its entries to its own zip
+    file in the working directory; once all are complete, those are merged in source order into the final zip file.
+
+    The workers are threads which fork the processes exporting their source, so this is only used when
+    DOWNLOAD_SOURCE_WORKERS is raised above its default of 1 (see the setting for why doing so is unsafe).
+    """
+    download_job, working_dir = source_args[1], source_args[2]
+    source_zip_file_paths = [os.path.join(working_dir, f"source_{i}.zip") for i in range(len(sources))]
+    max_workers = min(settings.DOWNLOAD_SOURCE_WORKERS, len(sources))
+
+    write_to_log(message=f"Generating {len(sources)} sources with {max_workers} workers", download_job=download_job)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_generate_source_in_thread, source, *source_args, source_zip_file_path)
+            for source, source_zip_file_path in zip(sources, source_zip_file_paths)
+        ]
+        try:
+            for future in futures:
+                future.result()
+        except Exception:
+            # Sources not yet started are dropped; leaving the pool waits for the running ones to finish so none of
+            # them is still exporting once the job is marked failed and its working directory removed
+            for future in futures:
+                future.cancel()
+            raise
+
+    log_time = time.perf_counter()
+    merge_zip_files(source_zip_file_paths, zip_file_path)
+    write_to_log(message=f"Merging zip files took {time.perf_counter() - log_time:.4f}s", download_job=download_job)
+
+
+def _generate_source_in_thread(*args):
+    try:
+        generate_source(*args)
+    finally:
+        # Django opens a database connection per thread which is not closed automatically when the thread completes
+        connection.close()
+
+
+def generate_source(source, columns, download_job, working_dir, piid, assistance_id, limit, file_format, zip_file_path):
+    """Parse and write data to the zip file; if there are no matching columns for a source then add an empty file"""
+    source_column_count = len(source.columns(columns))
+    if source_column_count == 0:
+        create_empty_data_file(source, download_job, working_dir, piid, assistance_id, zip_file_path, file_format)
+    else:
+        with DOWNLOAD_JOB_LOCK:
+            download_job.number_of_columns += source_column_count
+        parse_source(source, columns, download_job, working_dir, piid, assistance_id, zip_file_path, limit, file_format)
+
+
 def parse_source(source, columns, download_job, working_dir, piid, assistance_id, zip_file_path, limit, file_format):
     """Write to delimited text file(s) and zip file(s) using the source data"""
 
@@ -258,33 +320,57 @@ def parse_source(source, columns, download_job, working_dir, piid, assistance_id
 
     start_time = time.perf_counter()
     try:
-        # Create a separate process to run the PSQL command; wait
-        psql_process = multiprocessing.Process(target=execute_psql, args=(temp_file_path, source_path, download_job))
-        psql_process.start()
-        wait_for_process(psql_process, start_time, download_job)
-
-        delim = FILE_FORMATS[file_format]["delimiter"]
-
-        # Log how many rows we have
-        write_to_log(message="Counting rows in delimited text file", download_job=download_job)
-        try:
-            download_job.number_of_rows += count_rows_in_delimited_file(
-                filename=source_path, has_header=True, delimiter=delim
+        key_ranges = get_export_key_ranges(source, source_query, limit, download_job)
+        if settings.STREAM_DOWNLOADS_TO_ZIP and not key_ranges:
+            # Pipe the PSQL output straight into partitioned zip entries in a separate process; wait
+            row_count = multiprocessing.Value("q", 0)
+            stream_process = multiprocessing.Process(
+                target=execute_psql_to_zip_file,
+                args=(temp_file_path, zip_file_path, data_file_name, file_format, row_count, download_job),
             )
-        except Exception:
-            write_to_log(
-                message="Unable to obtain delimited text file line count", is_error=True, download_job=download_job
+            stream_process.start()
+            wait_for_process(stream_process, start_time, download_job)
+            with DOWNLOAD_JOB_LOCK:
+                download_job.number_of_rows += row_count.value
+                download_job.save()
+        else:
+            if key_ranges:
+                # Create a separate process to run the PSQL command for each key range concurrently; wait
+                execute_psql_in_key_ranges(
+                    source_query, key_ranges, source, columns, file_format, source_path, start_time, download_job
+                )
+            else:
+                # Create a separate process to run the PSQL command; wait
+                psql_process = multiprocessing.Process(
+                    target=execute_psql, args=(temp_file_path, source_path, download_job)
+                )
+                psql_process.start()
+                wait_for_process(psql_process, start_time, download_job)
+
+            delim = FILE_FORMATS[file_format]["delimiter"]
+
+            # Log how many rows we have
+            write_to_log(message="Counting rows in delimited text file", download_job=download_job)
+            try:
+                row_count = count_rows_in_delimited_file(filename=source_path, has_header=True, delimiter=delim)
+            except Exception:
+                row_count = 0
+                write_to_log(
+                    message="Unable to obtain delimited text file line count", is_error=True, download_job=download_job
+                )
+            with DOWNLOAD_JOB_LOCK:
+                download_job.number_of_rows += row_count
+                download_job.save()
+
+            # Create a separate process to split the large data files into smaller file and write to zip; wait
+            zip_process = multiprocessing.Process(
+                target=split_and_zip_data_files,
+                args=(zip_file_path, source_path, data_file_name, file_format, download_job),
             )
-        download_job.save()
-
-        # Create a separate process to split the large data files into smaller file and write to zip; wait
-        zip_process = multiprocessing.Process(
-            target=split_and_zip_data_files,
-            args=(zip_file_path, source_path, data_file_name, file_format, download_job),
-        )
-        zip_process.start()
-        wait_for_process(zip_process, start_time, download_job)
-        download_job.save()
+            zip_process.start()
+            wait_for_process(zip_process, start_time, download_job)
+            with DOWNLOAD_JOB_LOCK:
+                download_job.save()
     except Exception as e:
         raise e
     finally:
@@ -293,6 +379,100 @@ def parse_source(source, columns, download_job, working_dir, piid, assistance_id
         os.remove(temp_file_path)
 
 
+def get_export_key_ranges(source, source_query, limit, download_job):
+    """
+    Large award sources are exported by several PSQL processes in parallel, each one responsible for a range of the
+    source's primary key.  Returns the list of (inclusive lower, exclusive upper) key ranges for the source or None if
+    it should be exported by a single PSQL process.
+
+    Only unlimited and unordered award sources are split since concatenating the ranges would otherwise not produce
+    the same rows in the same order.  Whether a source is large enough to split is decided by Postgres' row estimate,
+    which is not asked for when the source's table (views have no row count) holds too few rows to exceed the threshold.
+    """
+    if (
+        settings.DOWNLOAD_EXPORT_WORKERS <= 1
+        or limit
+        or VALUE_MAPPINGS[source.source_type]["source_type"] != "award"
+        or source_query.query.order_by
+    ):
+        return None
+
+    model = source_query.model
+    key_column = f'"{model._meta.db_table}"."{model._meta.pk.column}"'
+    from_clause = _top_level_split(generate_raw_quoted_query(source_query), "FROM")[1]
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind, reltuples FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        relkind, table_rows = cursor.fetchone()
+        if relkind != "v" and table_rows < settings.DOWNLOAD_EXPORT_SPLIT_ROW_THRESHOLD:
+            return None
+
+        cursor.execute(f"EXPLAIN (FORMAT JSON) SELECT {key_column} FROM {from_clause}")
+        plan = cursor.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        estimated_rows = plan[0]["Plan"]["Plan Rows"]
+        if estimated_rows < settings.DOWNLOAD_EXPORT_SPLIT_ROW_THRESHOLD:
+            return None
+
+        cursor.execute(f"SELECT MIN({key_column}), MAX({key_column}) FROM {from_clause}")
+        lower, upper = cursor.fetchone()
+        if lower is None:
+            return None
+
+    key_ranges = split_key_range(lower, upper, settings.DOWNLOAD_EXPORT_WORKERS)
+    write_to_log(
+        message=f"Splitting export of an estimated {estimated_rows:,} rows into {len(key_ranges)} key ranges",
+        download_job=download_job,
+    )
+    return key_ranges
+
+
+def split_key_range(lower, upper, range_count):
+    """Split the inclusive integer range [lower, upper] into at most range_count contiguous, half open ranges"""
+    range_count = max(1, min(range_count, upper - lower + 1))
+    bounds = [lower + ((upper - lower + 1) * i) // range_count for i in range(range_count + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def execute_psql_in_key_ranges(
+    source_query, key_ranges, source, columns, file_format, source_path, start_time, download_job
+):
+    """
+    Export each key range of the source with its own PSQL process, all running concurrently, then concatenate the
+    results in key order into a single delimited file at source_path.
+    """
+    temp_files = []
+    part_paths = []
+    processes = []
+    try:
+        for lower, upper in key_ranges:
+            range_query = source_query.filter(pk__gte=lower, pk__lt=upper)
+            export_query = generate_export_query(range_query, None, source, columns, file_format)
+            temp_files.append(generate_export_query_temp_file(export_query, download_job))
+            part_paths.append(f"{source_path}.part{len(part_paths)}")
+            process = multiprocessing.Process(
+                target=execute_psql, args=(temp_files[-1][1], part_paths[-1], download_job)
+            )
+            process.start()
+            processes.append(process)
+
+        for process in processes:
+            wait_for_process(process, start_time, download_job)
+
+        concatenate_delimited_files(part_paths, source_path)
+    except Exception:
+        # The other ranges may still be being exported into the files removed below
+        _terminate_processes(processes, download_job)
+        raise
+    finally:
+        for temp_file, temp_file_path in temp_files:
+            os.close(temp_file)
+            os.remove(temp_file_path)
+        for part_path in part_paths:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+
 def split_and_zip_data_files(zip_file_path, source_path, data_file_name, file_format, download_job=None):
     try:
         # Split data files into separate files
@@ -314,7 +494,12 @@ def split_and_zip_data_files(zip_file_path, source_path, data_file_name, file_fo
         # Zip the split files into one zipfile
         write_to_log(message="Beginning zipping and compression", download_job=download_job)
         log_time = time.perf_counter()
-        append_files_to_zip_file(list_of_files, zip_file_path)
+        append_files_to_zip_file(
+            list_of_files,
+            zip_file_path,
+            compression_level=settings.DOWNLOAD_ZIP_COMPRESSION_LEVEL,
+            workers=settings.DOWNLOAD_ZIP_COMPRESSION_WORKERS,
+        )
 
         if download_job:
             write_to_log(
@@ -523,6 +708,56 @@ def execute_psql(temp_sql_file_path, source_path, download_job):
         raise e
 
 
+def execute_psql_to_zip_file(temp_sql_file_path, zip_file_path, data_file_name, file_format, row_count, download_job):
+    """
+    Executes a single PSQL command within its own Subprocess, streaming its output directly into partitioned entries
+    of the zip file instead of writing it to disk first.  The number of rows written is reported back through the
+    shared row_count value.
+    """
+    try:
+        log_time = time.perf_counter()
+        extension = FILE_FORMATS[file_format]["extension"]
+
+        with open(temp_sql_file_path, "r") as sql_file, tempfile.TemporaryFile() as psql_errors:
+            psql_process = subprocess.Popen(
+                ["psql", "-q", retrieve_db_string(), "-v", "ON_ERROR_STOP=1"],
+                stdin=sql_file,
+                stdout=subprocess.PIPE,
+                stderr=psql_errors,
+            )
+            try:
+                row_count.value, archive_names = write_records_to_partitioned_zip_file(
+                    records=iterate_delimited_records(psql_process.stdout),
+                    zip_file_path=zip_file_path,
+                    row_limit=EXCEL_ROW_LIMIT,
+                    output_name_template=f"{data_file_name}_%s.{extension}",
+                    compression_level=settings.DOWNLOAD_ZIP_COMPRESSION_LEVEL,
+                    workers=settings.DOWNLOAD_ZIP_COMPRESSION_WORKERS,
+                )
+            finally:
+                psql_process.stdout.close()
+                return_code = psql_process.wait()
+
+            if return_code != 0:
+                psql_errors.seek(0)
+                raise subprocess.CalledProcessError(return_code, psql_process.args, output=psql_errors.read())
+
+        duration = time.perf_counter() - log_time
+        write_to_log(
+            message=f"Streamed {row_count.value:,} rows into {len(archive_names)} zipped files, took {duration:.4f} "
+            f"seconds",
+            download_job=download_job,
+        )
+    except Exception as e:
+        if not settings.IS_LOCAL:
+            # Not logging the command as it can contain the database connection string
+            e.cmd = "[redacted psql command]"
+        logger.error(e)
+        sql = subprocess.check_output(["cat", temp_sql_file_path]).decode()
+        logger.error(f"Faulty SQL: {sql}")
+        raise e
+
+
 def retrieve_db_string():
     """It is necessary for this to be a function so the test suite can mock the connection string"""
     return settings.DOWNLOAD_DATABASE_URL
@@ -566,6 +801,22 @@ def _kill_spawned_processes(download_job=None):
             pass
 
 
+def _terminate_processes(processes, download_job=None):
+    """Terminate the processes still running, along with the PSQL commands they run, and wait for them to exit"""
+    for process in processes:
+        if process.is_alive():
+            write_to_log(
+                message=f"Attempting to terminate process (pid {process.pid})", download_job=download_job, is_error=True
+            )
+            try:
+                for spawn_of_process in ps.Process(process.pid).children(recursive=True):
+                    spawn_of_process.kill()
+            except ps.NoSuchProcess:
+                pass
+            process.terminate()
+        process.join()
+
+
 def create_empty_data_file(
     source: DownloadSource,
     download_job: DownloadJob,
@@ -1,19 +1,270 @@
 import os
+import struct
+import time
 import zipfile
+import zlib
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-def append_files_to_zip_file(file_paths, zip_file_path):
+# Size of the blocks compressed independently (and concurrently) by parallel compression
+DEFLATE_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def append_files_to_zip_file(file_paths, zip_file_path, compression_level=zlib.Z_DEFAULT_COMPRESSION, workers=1):
     """
     Create zip archive at the specified zip_file_path if it does not exist, and add all the files at provided
     file_paths to it.
 
+    When more than one worker is requested, each file is split into blocks that are deflated concurrently by that
+    many threads (zlib releases the GIL while compressing) and then stitched back together into a single standard
+    deflate stream, the same approach taken by pigz.
+
     NOTE: If a zip file already exists at zip_file_path, the given files will be added in addition to the ones
     already in the zip when using append (`a`) mode. If that zip contains a file with the same name as one provided,
     it will throw a UserWarning and duplicate the file.
     Use caution in this case by removing the zip in the finally of an exception and also checking for and removing
     the zip if it exists before you begin to create it from scratch
     """
+    with _open_zip_file(zip_file_path, compression_level) as zip_file:
+        if workers <= 1:
+            for file_path in file_paths:
+                archive_name = os.path.basename(file_path)
+                zip_file.write(file_path, archive_name)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for file_path in file_paths:
+                zip_info = zipfile.ZipInfo.from_file(file_path, os.path.basename(file_path))
+                zip64 = zip_info.file_size * 1.05 > zipfile.ZIP64_LIMIT
+                entry = _ParallelDeflateEntry(zip_file, zip_info, zip64, executor, compression_level, workers)
+                with open(file_path, "rb") as source_file:
+                    for chunk in iter(lambda: source_file.read(DEFLATE_CHUNK_SIZE), b""):
+                        entry.write(chunk)
+                entry.close()
+
+
+def write_records_to_partitioned_zip_file(
+    records,
+    zip_file_path,
+    row_limit,
+    output_name_template="output_%s.csv",
+    keep_headers=True,
+    compression_level=zlib.Z_DEFAULT_COMPRESSION,
+    workers=1,
+):
+    """
+    Stream records (bytes) directly into entries of the zip archive at zip_file_path, starting a new entry every time
+    row_limit rows have been written.  Nothing is staged on disk apart from the zip archive itself.
+
+    Returns a tuple of the number of rows written (excluding headers) and the list of archive entry names.
+    """
+    row_count = 0
+    archive_names = []
+    headers = None
+
+    with _open_zip_file(zip_file_path, compression_level) as zip_file:
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        writer = None
+        try:
+            for record in records:
+                if keep_headers and headers is None:
+                    headers = record
+                    continue
+
+                if writer is None or writer.rows_written >= row_limit:
+                    if writer is not None:
+                        writer.close()
+                    archive_names.append(output_name_template % (len(archive_names) + 1))
+                    writer = _BufferedZipEntryWriter(zip_file, archive_names[-1], executor, compression_level, workers)
+                    if headers is not None:
+                        writer.write_header(headers)
+
+                writer.write_row(record)
+                row_count += 1
+
+            if writer is None:
+                # Mirror partition_large_delimited_file which always produces at least one (header only) file
+                archive_names.append(output_name_template % 1)
+                writer = _BufferedZipEntryWriter(zip_file, archive_names[-1], executor, compression_level, workers)
+                if headers is not None:
+                    writer.write_header(headers)
+        finally:
+            if writer is not None:
+                writer.close()
+            if executor is not None:
+                executor.shutdown()
+
+    return row_count, archive_names
+
+
+def merge_zip_files(source_zip_file_paths, zip_file_path):
+    """
+    Append every entry of the zip archives at source_zip_file_paths (in order) to the zip archive at zip_file_path.
+
+    Entries are copied as-is in their already compressed form, so merging costs no more than copying the bytes.
+    """
     with zipfile.ZipFile(zip_file_path, "a", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zip_file:
-        for file_path in file_paths:
-            archive_name = os.path.basename(file_path)
-            zip_file.write(file_path, archive_name)
+        for source_zip_file_path in source_zip_file_paths:
+            with zipfile.ZipFile(source_zip_file_path, "r") as source_zip_file:
+                for source_info in source_zip_file.infolist():
+                    source_zip_file.fp.seek(source_info.header_offset)
+                    local_header = source_zip_file.fp.read(zipfile.sizeFileHeader)
+                    name_length, extra_length = struct.unpack("<HH", local_header[-4:])
+                    source_zip_file.fp.seek(name_length + extra_length, os.SEEK_CUR)
+                    _write_compressed_entry(zip_file, source_info, source_zip_file.fp)
+
+
+def _open_zip_file(zip_file_path, compression_level):
+    return zipfile.ZipFile(
+        zip_file_path, "a", compression=zipfile.ZIP_DEFLATED, allowZip64=True, compresslevel=compression_level
+    )
+
+
+class _BufferedZipEntryWriter:
+    """Collects small writes into larger blocks before handing them to the (comparatively expensive) compressor"""
+
+    BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self, zip_file, archive_name, executor=None, compression_level=None, workers=1):
+        self.rows_written = 0
+        if executor is None:
+            self._entry = zip_file.open(archive_name, "w", force_zip64=True)
+        else:
+            zip_info = zipfile.ZipInfo(archive_name, time.localtime(time.time())[:6])
+            zip_info.external_attr = 0o600 << 16
+            self._entry = _ParallelDeflateEntry(zip_file, zip_info, True, executor, compression_level, workers)
+        self._buffer = []
+        self._buffered_bytes = 0
+
+    def write_header(self, header):
+        self._append(header)
+
+    def write_row(self, row):
+        self.rows_written += 1
+        self._append(row)
+
+    def _append(self, data):
+        self._buffer.append(data)
+        self._buffered_bytes += len(data)
+        if self._buffered_bytes >= self.BUFFER_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._entry.write(b"".join(self._buffer))
+            self._buffer = []
+            self._buffered_bytes = 0
+
+    def close(self):
+        self._flush()
+        self._entry.close()
+
+
+class _ParallelDeflateEntry:
+    """
+    Writes a single deflated entry to an open zip file, compressing blocks of DEFLATE_CHUNK_SIZE bytes concurrently.
+
+    Every block is compressed independently and ends with a sync flush, so the compressed blocks can simply be
+    concatenated in order; an empty final block then terminates the deflate stream.  The CRC is calculated over the
+    uncompressed data as it is written.  At most two blocks per worker are held in memory at any time.
+    """
+
+    FINAL_BLOCK = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS).flush(zlib.Z_FINISH)
+
+    def __init__(self, zip_file, zip_info, zip64, executor, compression_level, workers):
+        self._zip_file = zip_file
+        self._zip_info = zip_info
+        self._zip64 = zip64
+        self._executor = executor
+        self._compression_level = compression_level
+        self._max_pending = workers * 2
+        self._pending = deque()
+        self._buffer = bytearray()
+
+        zip_info.compress_type = zipfile.ZIP_DEFLATED
+        zip_info.CRC = 0
+        zip_info.compress_size = 0
+        zip_info.file_size = 0
+        _start_entry(zip_file, zip_info, zip64)
+
+    def write(self, data):
+        self._zip_info.CRC = zlib.crc32(data, self._zip_info.CRC)
+        self._zip_info.file_size += len(data)
+        self._buffer += data
+        while len(self._buffer) >= DEFLATE_CHUNK_SIZE:
+            self._submit(bytes(self._buffer[:DEFLATE_CHUNK_SIZE]))
+            del self._buffer[:DEFLATE_CHUNK_SIZE]
+
+    def close(self):
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer = bytearray()
+        while self._pending:
+            self._write_compressed(self._pending.popleft().result())
+        self._write_compressed(self.FINAL_BLOCK)
+        _finish_entry(self._zip_file, self._zip_info, self._zip64)
+
+    def _submit(self, chunk):
+        if len(self._pending) >= self._max_pending:
+            self._write_compressed(self._pending.popleft().result())
+        self._pending.append(self._executor.submit(_deflate_chunk, chunk, self._compression_level))
+
+    def _write_compressed(self, compressed):
+        self._zip_file.fp.write(compressed)
+        self._zip_info.compress_size += len(compressed)
+
+
+def _deflate_chunk(chunk, compression_level):
+    compressor = zlib.compressobj(compression_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def _write_compressed_entry(zip_file, source_info, compressed_data):
+    """Write an entry whose data has already been compressed (with CRC and sizes known up front) to an open zip file"""
+    zip_info = zipfile.ZipInfo(source_info.filename, source_info.date_time)
+    zip_info.compress_type = source_info.compress_type
+    zip_info.external_attr = source_info.external_attr
+    zip_info.CRC = source_info.CRC
+    zip_info.compress_size = source_info.compress_size
+    zip_info.file_size = source_info.file_size
+
+    zip64 = max(zip_info.file_size, zip_info.compress_size) > zipfile.ZIP64_LIMIT
+    _start_entry(zip_file, zip_info, zip64)
+    _copy_bytes(compressed_data, zip_file.fp, zip_info.compress_size)
+    _finish_entry(zip_file, zip_info, zip64)
+
+
+# The zipfile module has no public API for writing data that has already been compressed so, like ZipFile.write and
+# ZipFile.open, these write the local header and data directly and then register the entry to be written out with
+# the central directory when the zip file is closed.
+def _start_entry(zip_file, zip_info, zip64):
+    zip_file._writecheck(zip_info)
+    zip_file._didModify = True
+    zip_file.fp.seek(zip_file.start_dir)
+    zip_info.header_offset = zip_file.fp.tell()
+    zip_file.fp.write(zip_info.FileHeader(zip64))
+
+
+def _finish_entry(zip_file, zip_info, zip64):
+    if not zip64 and max(zip_info.file_size, zip_info.compress_size) > zipfile.ZIP64_LIMIT:
+        raise zipfile.LargeZipFile("File size too large, try using force_zip64")
+
+    # Rewrite the local header now that the CRC and sizes are known
+    end_offset = zip_file.fp.tell()
+    zip_file.fp.seek(zip_info.header_offset)
+    zip_file.fp.write(zip_info.FileHeader(zip64))
+    zip_file.fp.seek(end_offset)
+
+    zip_file.filelist.append(zip_info)
+    zip_file.NameToInfo[zip_info.filename] = zip_info
+    zip_file.start_dir = end_offset
+
+
+def _copy_bytes(source_file, destination_file, byte_count, chunk_size=1024 * 1024):
+    while byte_count > 0:
+        chunk = source_file.read(min(chunk_size, byte_count))
+        if not chunk:
+            raise zipfile.BadZipFile("Unexpected end of data while copying zip entry")
+        destination_file.write(chunk)
+        byte_count -= len(chunk)
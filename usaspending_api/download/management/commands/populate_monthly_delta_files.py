@@ -1,4 +1,3 @@
-import boto3
 import logging
 import os
 import pandas as pd
@@ -7,27 +6,29 @@ import shutil
 import subprocess
 import tempfile
 
+from collections import defaultdict
 from datetime import datetime, date
 from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.db.models import Case, When, Value, CharField, F
+from django.db.models import Case, When, Value, CharField, F, Q
 
 from usaspending_api.awards.v2.lookups.lookups import all_award_types_mappings as all_ats_mappings
 from usaspending_api.common.csv_helpers import count_rows_in_delimited_file
 from usaspending_api.common.helpers.orm_helpers import generate_raw_quoted_query
-from usaspending_api.download.filestreaming.download_generation import (
-    apply_annotations_to_sql,
-    _top_level_split,
-)
+from usaspending_api.download.filestreaming.download_generation import apply_annotations_to_sql
 from usaspending_api.download.filestreaming.download_generation import split_and_zip_data_files
 from usaspending_api.download.filestreaming.download_source import DownloadSource
 from usaspending_api.download.helpers import pull_modified_agencies_cgacs, multipart_upload
 from usaspending_api.download.lookups import VALUE_MAPPINGS
 from usaspending_api.references.models import ToptierAgency, SubtierAgency
+from usaspending_api.transactions.transaction_delete_journal_helpers import DeleteJournal
 
 
 logger = logging.getLogger(__name__)
 
+# Leading column of the exported changes naming the awarding agency whose delta file each row is copied to
+AGENCY_NAME_COLUMN = "delta_file_agency_name"
+
 AWARD_MAPPINGS = {
     "Contracts": {
         "agency_field": "agency_id",
@@ -70,30 +71,78 @@ AWARD_MAPPINGS = {
 
 
 class Command(BaseCommand):
-    def download(self, award_type, agency="all", generate_since=None):
-        """ Create a delta file based on award_type, and agency_code (or all agencies) """
-        logger.info(
-            "Starting generation. {}, Agency: {}".format(award_type, agency if agency == "all" else agency["name"])
-        )
+    def download(self, award_type, agencies, generate_since=None):
+        """
+        Create the delta files of award_type for each of agencies (toptier agency dicts and/or "all"). The changed
+        transactions are exported once and fanned out to the file of every agency, instead of being queried per file.
+        """
+        logger.info("Starting generation. {}, Agencies: {}".format(award_type, len(agencies)))
+        agency_codes = ["all" if agency == "all" else agency["toptier_code"] for agency in agencies]
+        codes_by_name = {agency["name"]: agency["toptier_code"] for agency in agencies if agency != "all"}
+        source = self.build_source(award_type, agencies, generate_since)
+
+        # Create file paths and working directory
+        timestamp = datetime.strftime(datetime.now(), "%Y%m%d%H%M%S%f")
+        working_dir = f"{settings.CSV_LOCAL_PATH}_{award_type}_delta_gen_{timestamp}/"
+        if not os.path.exists(working_dir):
+            os.mkdir(working_dir)
+        source_names = {agency_code: self.source_name(award_type, agency_code) for agency_code in agency_codes}
+        source_paths = {
+            agency_code: os.path.join(working_dir, "{}.csv".format(source_name))
+            for agency_code, source_name in source_names.items()
+        }
+
+        export_path = os.path.join(working_dir, "{}_changes.csv".format(award_type))
+        self.export_changes(source, export_path)
+        self.fan_out_changes(export_path, source_paths, codes_by_name)
+        os.remove(export_path)
+
+        # Append deleted rows to the end of each file
+        if not self.debugging_skip_deleted:
+            deletions = self.gather_deletion_records(award_type, source, generate_since)
+            for agency_code, source_path in source_paths.items():
+                self.add_deletion_records(deletions, source_path, award_type, agency_code)
+
+        for agency_code in agency_codes:
+            file_path = self.zip_local_file(source_paths[agency_code], source_names[agency_code])
+            if file_path is None:
+                logger.info("No new, modified, or deleted data for agency {}; discarding file".format(agency_code))
+            elif not settings.IS_LOCAL:
+                # Upload file to S3 and delete local version
+                logger.info("Uploading file to S3 bucket and deleting local copy")
+                multipart_upload(
+                    settings.MONTHLY_DOWNLOAD_S3_BUCKET_NAME,
+                    settings.USASPENDING_AWS_REGION,
+                    file_path,
+                    os.path.basename(file_path),
+                )
+                os.remove(file_path)
+
+        shutil.rmtree(working_dir)
+        logger.info("Finished generation. {}, Agencies: {}".format(award_type, len(agencies)))
+
+    def build_source(self, award_type, agencies, generate_since):
+        """
+        Source of every transaction of award_type that was created, modified, or recorded in the transaction delta
+        table since generate_since. Its first column is the awarding toptier agency which rows are fanned out by.
+        """
         award_map = AWARD_MAPPINGS[award_type]
 
         # Create Source and update fields to include correction_delete_ind
-        source = DownloadSource(
-            "transaction",
-            award_map["letter_name"].lower(),
-            "transactions",
-            "all" if agency == "all" else agency["toptier_agency_id"],
-        )
+        source = DownloadSource("transaction", award_map["letter_name"].lower(), "transactions", "all")
+        source.query_paths = source.query_paths.copy()
         source.query_paths.update({"correction_delete_ind": award_map["correction_delete_ind"]})
         if award_type == "Contracts":
             # Add the agency_id column to the mappings
             source.query_paths.update({"agency_id": "transaction__contract_data__agency_id"})
             source.query_paths.move_to_end("agency_id", last=False)
         source.query_paths.move_to_end("correction_delete_ind", last=False)
+        source.query_paths.update({AGENCY_NAME_COLUMN: "awarding_toptier_agency_name"})
+        source.query_paths.move_to_end(AGENCY_NAME_COLUMN, last=False)
         source.human_names = list(source.query_paths.keys())
 
         # Apply filters to the queryset
-        filters, agency_code = self.parse_filters(award_map["award_types"], agency)
+        filters = self.parse_filters(award_map["award_types"], agencies)
         source.queryset = VALUE_MAPPINGS["transactions"]["filter_function"](filters)
 
         if award_type == "Contracts":
@@ -115,65 +164,30 @@ class Command(BaseCommand):
                 )
             )
 
-        transaction_delta_queryset = source.queryset
-
         _filter = {"transaction__{}__{}__gte".format(award_map["model"], award_map["date_filter"]): generate_since}
         if self.debugging_end_date:
             _filter[
                 "transaction__{}__{}__lt".format(award_map["model"], award_map["date_filter"])
             ] = self.debugging_end_date
 
-        source.queryset = source.queryset.filter(**_filter)
+        # Transactions modified in the time frame along with those in the transaction_delta table. The two are
+        # combined with OR rather than a UNION of two queries, which had to sort every column to remove duplicates.
+        source.queryset = source.queryset.filter(Q(**_filter) | Q(transaction__transactiondelta__isnull=False))
 
-        # UNION the normal results to the transaction_delta results.
-        source.queryset = source.queryset.union(
-            transaction_delta_queryset.filter(transaction__transactiondelta__isnull=False)
-        )
-
-        # Generate file
-        file_path = self.create_local_file(award_type, source, agency_code, generate_since)
-        if file_path is None:
-            logger.info("No new, modified, or deleted data; discarding file")
-        elif not settings.IS_LOCAL:
-            # Upload file to S3 and delete local version
-            logger.info("Uploading file to S3 bucket and deleting local copy")
-            multipart_upload(
-                settings.MONTHLY_DOWNLOAD_S3_BUCKET_NAME,
-                settings.USASPENDING_AWS_REGION,
-                file_path,
-                os.path.basename(file_path),
-            )
-            os.remove(file_path)
+        return source
 
-        logger.info(
-            "Finished generation. {}, Agency: {}".format(award_type, agency if agency == "all" else agency["name"])
-        )
+    @staticmethod
+    def source_name(award_type, agency_code):
+        agency_str = "All" if agency_code == "all" else agency_code
+        return f"FY(All)_{agency_str}_{award_type}_Delta_{datetime.strftime(date.today(), '%Y%m%d')}"
 
-    def create_local_file(self, award_type, source, agency_code, generate_since):
-        """ Generate complete file from SQL query and S3 bucket deletion files, then zip it locally """
+    def export_changes(self, source, export_path):
+        """ Export every row of the source to a single CSV with psql's \\copy """
         logger.info("Generating CSV file with creations and modifications")
 
-        # Create file paths and working directory
-        timestamp = datetime.strftime(datetime.now(), "%Y%m%d%H%M%S%f")
-        working_dir = f"{settings.CSV_LOCAL_PATH}_{agency_code}_delta_gen_{timestamp}/"
-        if not os.path.exists(working_dir):
-            os.mkdir(working_dir)
-        agency_str = "All" if agency_code == "all" else agency_code
-        source_name = f"FY(All)_{agency_str}_{award_type}_Delta_{datetime.strftime(date.today(), '%Y%m%d')}"
-        source_path = os.path.join(working_dir, "{}.csv".format(source_name))
-
         # Create a unique temporary file with the raw query
         raw_quoted_query = generate_raw_quoted_query(source.row_emitter(None))  # None requests all headers
-
-        # The raw query is a union of two other queries, each in parentheses. To do replacement we need to split out
-        # each query, apply annotations to each of those, then recombine in a UNION
-        csv_query_annotated = (
-            "("
-            + apply_annotations_to_sql(_top_level_split(raw_quoted_query, "UNION")[0].strip()[1:-1], source.human_names)
-            + ") UNION ("
-            + apply_annotations_to_sql(_top_level_split(raw_quoted_query, "UNION")[1].strip()[1:-1], source.human_names)
-            + ")"
-        )
+        csv_query_annotated = apply_annotations_to_sql(raw_quoted_query, source.human_names)
 
         (temp_sql_file, temp_sql_file_path) = tempfile.mkstemp(prefix="bd_sql_", dir="/tmp")
         with open(temp_sql_file_path, "w") as file:
@@ -184,31 +198,88 @@ class Command(BaseCommand):
         cat_command = subprocess.Popen(["cat", temp_sql_file_path], stdout=subprocess.PIPE)
         try:
             subprocess.check_output(
-                ["psql", "-o", source_path, os.environ["DOWNLOAD_DATABASE_URL"], "-v", "ON_ERROR_STOP=1"],
+                ["psql", "-o", export_path, os.environ["DOWNLOAD_DATABASE_URL"], "-v", "ON_ERROR_STOP=1"],
                 stdin=cat_command.stdout,
                 stderr=subprocess.STDOUT,
             )
         except subprocess.CalledProcessError as e:
             logger.exception(e.output)
             raise e
+        finally:
+            os.close(temp_sql_file)
+            os.remove(temp_sql_file_path)
 
-        # Append deleted rows to the end of the file
-        if not self.debugging_skip_deleted:
-            self.add_deletion_records(source_path, working_dir, award_type, agency_code, source, generate_since)
+    def fan_out_changes(self, export_path, source_paths, codes_by_name):
+        """
+        Stream the exported rows into the file of every agency in source_paths (keyed by toptier code or "all"). Each
+        row goes to the "all" file and to the file of its awarding agency; the agency column itself is dropped. The rest
+        of each row is copied exactly as psql wrote it so empty strings ("") stay distinct from nulls (nothing).
+        """
+        logger.info("Fanning out changes to {} files".format(len(source_paths)))
+        files = {agency_code: open(path, "w", newline="") for agency_code, path in source_paths.items()}
+        try:
+            with open(export_path, newline="") as export_file:
+                records = self.read_csv_records(export_file)
+                header = self.split_first_field(next(records))[1]
+                for f in files.values():
+                    f.write(header)
+
+                all_file = files.get("all")
+                agency_files = {name: files[code] for name, code in codes_by_name.items() if code in files}
+                for record in records:
+                    agency_name, row = self.split_first_field(record)
+                    if all_file is not None:
+                        all_file.write(row)
+                    agency_file = agency_files.get(agency_name)
+                    if agency_file is not None:
+                        agency_file.write(row)
+        finally:
+            for f in files.values():
+                f.close()
+
+    @staticmethod
+    def read_csv_records(csv_file):
+        """
+        Yield the raw text of each record of the CSV. A quoted value can contain line breaks, so a record only ends at
+        a line break after an even number of quotes.
+        """
+        record_lines = []
+        quotes = 0
+        for line in csv_file:
+            record_lines.append(line)
+            quotes += line.count('"')
+            if quotes % 2 == 0:
+                yield "".join(record_lines)
+                record_lines = []
+                quotes = 0
+        if record_lines:
+            yield "".join(record_lines)
+
+    @staticmethod
+    def split_first_field(record):
+        """ Split the raw text of a CSV record into the value of its first field and the raw text of the others """
+        if not record.startswith('"'):
+            value, _, rest = record.partition(",")
+            return value, rest
+        end = 1
+        while True:
+            # A quote inside a quoted value is escaped by doubling it
+            end = record.index('"', end) + 1
+            if not record.startswith('"', end):
+                break
+            end += 1
+        return record[1 : end - 1].replace('""', '"'), record[end + 1 :]
+
+    def zip_local_file(self, source_path, source_name):
+        """ Zip a complete file locally, returning the path of the zip or None when the file has no rows """
         if count_rows_in_delimited_file(source_path, has_header=True, safe=True) > 0:
             # Split the CSV into multiple files and zip it up
             zipfile_path = "{}{}.zip".format(settings.CSV_LOCAL_PATH, source_name)
 
             logger.info("Creating compressed file: {}".format(os.path.basename(zipfile_path)))
             split_and_zip_data_files(zipfile_path, source_path, source_name, "csv")
-        else:
-            zipfile_path = None
-
-        os.close(temp_sql_file)
-        os.remove(temp_sql_file_path)
-        shutil.rmtree(working_dir)
-
-        return zipfile_path
+            return zipfile_path
+        return None
 
     @staticmethod
     def split_transaction_id(tid):
@@ -224,63 +295,56 @@ class Command(BaseCommand):
         tid = tid.upper()
         return pd.Series(tid.split("_") + [tid])
 
-    def add_deletion_records(self, source_path, working_dir, award_type, agency_code, source, generate_since):
-        """ Retrieve deletion files from S3 and append necessary records to the end of the file """
-        logger.info("Retrieving deletion records from S3 files and appending to the CSV")
+    def gather_deletion_records(self, award_type, source, generate_since):
+        """ Retrieve deletion files from S3 and build the deduplicated deletion records of every agency """
+        logger.info("Retrieving deletion records from S3 files")
 
-        # Retrieve all SubtierAgency IDs within this TopTierAgency
-        subtier_agencies = list(
-            SubtierAgency.objects.filter(agency__toptier_agency__toptier_code=agency_code).values_list(
-                "subtier_code", flat=True
-            )
+        # Only the files of the deleted transaction journal within the date range we want
+        journal_files = self.delete_journal.files(
+            lambda obj: self.check_regex_match(award_type, obj.key, generate_since)
         )
 
-        # Create a list of keys in the bucket that match the date range we want
-        bucket = boto3.resource("s3", region_name=settings.USASPENDING_AWS_REGION).Bucket(
-            settings.DELETED_TRANSACTION_JOURNAL_FILES
-        )
+        deletions = []
+        for journal_file in journal_files:
+            if not journal_file.ids:
+                continue
+            match_date = self.check_regex_match(award_type, journal_file.key, generate_since)
+
+            # Split unique identifier into usable columns and add unused columns
+            df = (
+                pd.Series(journal_file.ids, name=AWARD_MAPPINGS[award_type]["unique_iden"])
+                .apply(self.split_transaction_id)
+                .replace("-none-", "")
+                .replace("-NONE-", "")
+                .rename(columns=AWARD_MAPPINGS[award_type]["column_headers"])
+            )
 
-        all_deletions = pd.DataFrame()
-        for key in bucket.objects.all():
-            match_date = self.check_regex_match(award_type, key.key, generate_since)
-            if match_date:
-                # Create a local copy of the deletion file
-                delete_filepath = "{}{}".format(working_dir, key.key)
-                bucket.download_file(key.key, delete_filepath)
-                df = pd.read_csv(delete_filepath)
-                os.remove(delete_filepath)
-
-                # Split unique identifier into usable columns and add unused columns
-                df = (
-                    df[AWARD_MAPPINGS[award_type]["unique_iden"]]
-                    .apply(self.split_transaction_id)
-                    .replace("-none-", "")
-                    .replace("-NONE-", "")
-                    .rename(columns=AWARD_MAPPINGS[award_type]["column_headers"])
-                )
+            # Reorder columns to make it CSV-ready
+            df = self.organize_deletion_columns(source, df, award_type, match_date)
+            logger.info("Found {} deletion records in {}".format(len(df.index), journal_file.key))
+            deletions.append(df)
 
-                # Only include records within the correct agency, and populated files
-                if len(df.index) == 0:
-                    continue
-                if agency_code != "all":
-                    df = df[df[AWARD_MAPPINGS[award_type]["agency_field"]].isin(subtier_agencies)]
-                    if len(df.index) == 0:
-                        continue
+        if not deletions:
+            return None
+        return self.deduplicate_deletions(pd.concat(deletions, ignore_index=True), award_type)
 
-                # Reorder columns to make it CSV-ready, and append
-                df = self.organize_deletion_columns(source, df, award_type, match_date)
-                logger.info("Found {} deletion records to include".format(len(df.index)))
-                all_deletions = all_deletions.append(df, ignore_index=True)
+    def add_deletion_records(self, deletions, source_path, award_type, agency_code):
+        """ Append the deletion records of agency_code (or every agency for "all") to the end of the file """
+        # Only include records within the correct agency
+        if deletions is not None and agency_code != "all":
+            subtier_agencies = self.subtier_codes.get(agency_code, set())
+            deletions = deletions[deletions[AWARD_MAPPINGS[award_type]["agency_field"]].isin(subtier_agencies)]
 
         # Only append to file if there are any records
-        if len(all_deletions.index) == 0:
+        if deletions is None or len(deletions.index) == 0:
             logger.info("No deletion records to append to file")
         else:
-            self.add_deletions_to_file(all_deletions, award_type, source_path)
+            logger.info("Appending {} records to the end of the file".format(len(deletions.index)))
+            deletions.to_csv(source_path, mode="a", header=False, index=False)
 
     def organize_deletion_columns(self, source, dataframe, award_type, match_date):
         """ Ensure that the dataframe has all necessary columns in the correct order """
-        ordered_columns = source.columns(None)
+        ordered_columns = [column for column in source.columns(None) if column != AGENCY_NAME_COLUMN]
         if "correction_delete_ind" not in ordered_columns:
             ordered_columns = ["correction_delete_ind"] + ordered_columns
 
@@ -296,15 +360,13 @@ class Command(BaseCommand):
         # Ensure columns are in correct order
         return dataframe[ordered_columns]
 
-    def add_deletions_to_file(self, df, award_type, source_path):
-        """ Append the deletion records to the end of the CSV file """
+    def deduplicate_deletions(self, df, award_type):
+        """ Keep the most recent deletion record of each transaction """
         logger.info("Removing duplicates from deletion records")
         df = df.sort_values(["last_modified_date"] + list(AWARD_MAPPINGS[award_type]["column_headers"].values()))
         deduped_df = df.drop_duplicates(subset=list(AWARD_MAPPINGS[award_type]["column_headers"].values()), keep="last")
         logger.info("Removed {} duplicated deletion records".format(len(df.index) - len(deduped_df.index)))
-
-        logger.info("Appending {} records to the end of the file".format(len(deduped_df.index)))
-        deduped_df.to_csv(source_path, mode="a", header=False, index=False)
+        return deduped_df
 
     def check_regex_match(self, award_type, file_name, generate_since):
         """ Create a date object from a regular expression match """
@@ -337,18 +399,19 @@ class Command(BaseCommand):
 
         return "{}-{}-{}".format(year, month, day)
 
-    def parse_filters(self, award_types, agency):
+    def parse_filters(self, award_types, agencies):
         """ Convert readable filters to a filter object usable for the matview filter """
         filters = {
             "award_type_codes": [award_type for sublist in award_types for award_type in all_ats_mappings[sublist]]
         }
 
-        agency_code = agency
-        if agency != "all":
-            agency_code = agency["toptier_code"]
-            filters["agencies"] = [{"type": "awarding", "tier": "toptier", "name": agency["name"]}]
+        # Every agency's transactions are needed for the file of "all" agencies
+        if "all" not in agencies:
+            filters["agencies"] = [
+                {"type": "awarding", "tier": "toptier", "name": agency["name"]} for agency in agencies
+            ]
 
-        return filters, agency_code
+        return filters
 
     def add_arguments(self, parser):
         """ Add arguments to the parser """
@@ -397,6 +460,7 @@ class Command(BaseCommand):
         last_date = options["last_date"]
         self.debugging_end_date = options["debugging_end_date"]
         self.debugging_skip_deleted = options["debugging_skip_deleted"]
+        self.delete_journal = DeleteJournal()  # shared by every file generated, so it is only read from S3 once
 
         toptier_agencies = ToptierAgency.objects.filter(toptier_code__in=set(pull_modified_agencies_cgacs()))
         include_all = True
@@ -413,9 +477,17 @@ class Command(BaseCommand):
         if include_all:
             toptier_agencies.append("all")
 
-        for agency in toptier_agencies:
+        # Deletion records are matched to agencies by the SubtierAgency codes within each TopTierAgency
+        self.subtier_codes = defaultdict(set)
+        subtier_agencies = SubtierAgency.objects.filter(
+            agency__toptier_agency__toptier_code__in=[a["toptier_code"] for a in toptier_agencies if a != "all"]
+        ).values_list("agency__toptier_agency__toptier_code", "subtier_code")
+        for toptier_code, subtier_code in subtier_agencies:
+            self.subtier_codes[toptier_code].add(subtier_code)
+
+        if toptier_agencies:
             for award_type in award_types:
-                self.download(award_type.capitalize(), agency, last_date)
+                self.download(award_type.capitalize(), toptier_agencies, last_date)
 
         logger.info(
             "IMPORTANT: Be sure to run synchronize_transaction_delta management command "
@@ -0,0 +1,77 @@
+import os
+import pytest
+import time
+
+from django.db import connection
+from model_mommy import mommy
+from unittest.mock import Mock
+
+from usaspending_api.awards.models import TransactionNormalized
+from usaspending_api.common.helpers.generic_helper import generate_test_db_connection_string
+from usaspending_api.download.filestreaming import download_generation
+from usaspending_api.download.filestreaming.download_source import DownloadSource
+
+
+@pytest.fixture
+def assistance_source(transactional_db, monkeypatch):
+    monkeypatch.setattr(
+        download_generation, "retrieve_db_string", Mock(return_value=generate_test_db_connection_string())
+    )
+    award = mommy.make("awards.Award", id=1, category="grant", generated_unique_award_id="ASST_NON_1")
+    for transaction_id in range(1, 13):
+        mommy.make(TransactionNormalized, id=transaction_id, award=award, modification_number=str(transaction_id))
+    with connection.cursor() as cursor:
+        # Fill in the table row count the estimate is checked against
+        cursor.execute("ANALYZE transaction_normalized")
+
+    source = DownloadSource("assistance_transaction_history", "d2", "assistance_transactions", "all")
+    source.queryset = TransactionNormalized.objects.filter(award_id=1)
+    return source
+
+
+def read_lines(path):
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def test_small_source_is_not_probed(assistance_source, settings, django_assert_num_queries):
+    settings.DOWNLOAD_EXPORT_WORKERS = 3
+    settings.DOWNLOAD_EXPORT_SPLIT_ROW_THRESHOLD = 100
+    source_query = assistance_source.row_emitter([])
+
+    # Only the table's row count is read; neither the estimate nor the key bounds are
+    with django_assert_num_queries(1):
+        assert download_generation.get_export_key_ranges(assistance_source, source_query, None, None) is None
+
+    settings.DOWNLOAD_EXPORT_WORKERS = 1
+    with django_assert_num_queries(0):
+        assert download_generation.get_export_key_ranges(assistance_source, source_query, None, None) is None
+
+
+def test_key_range_export_matches_single_export(assistance_source, settings, tmp_path):
+    settings.DOWNLOAD_EXPORT_WORKERS = 3
+    settings.DOWNLOAD_EXPORT_SPLIT_ROW_THRESHOLD = 10
+    download_job = Mock(monthly_download=True)
+    source_query = assistance_source.row_emitter([])
+
+    key_ranges = download_generation.get_export_key_ranges(assistance_source, source_query, None, download_job)
+    assert key_ranges == [(1, 5), (5, 9), (9, 13)]
+
+    split_path = str(tmp_path / "split.csv")
+    download_generation.execute_psql_in_key_ranges(
+        source_query, key_ranges, assistance_source, [], "csv", split_path, time.perf_counter(), download_job
+    )
+
+    single_path = str(tmp_path / "single.csv")
+    export_query = download_generation.generate_export_query(source_query, None, assistance_source, [], "csv")
+    temp_file, temp_file_path = download_generation.generate_export_query_temp_file(export_query, download_job)
+    try:
+        download_generation.execute_psql(temp_file_path, single_path, download_job)
+    finally:
+        os.close(temp_file)
+        os.remove(temp_file_path)
+
+    split_lines, single_lines = read_lines(split_path), read_lines(single_path)
+    assert len(split_lines) == 13
+    assert split_lines[0] == single_lines[0]
+    assert sorted(split_lines[1:]) == sorted(single_lines[1:])
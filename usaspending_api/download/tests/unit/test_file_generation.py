@@ -1,3 +1,9 @@
+import multiprocessing
+import psutil
+import pytest
+import subprocess
+import time
+
 from unittest.mock import MagicMock
 
 from usaspending_api.awards.v2.lookups.lookups import award_type_mapping, contract_type_mapping, idv_type_mapping
@@ -127,3 +133,51 @@ def test_idv_treasury_account_funding_csv_sources():
     VALUE_MAPPINGS["idv_federal_account_funding"]["filter_function"] = original
     assert csv_sources[0].file_type == "treasury_account"
     assert csv_sources[0].source_type == "idv_federal_account_funding"
+
+
+def test_split_key_range():
+    assert download_generation.split_key_range(1, 100, 4) == [(1, 26), (26, 51), (51, 76), (76, 101)]
+    assert download_generation.split_key_range(1, 10, 3) == [(1, 4), (4, 7), (7, 11)]
+    assert download_generation.split_key_range(5, 6, 4) == [(5, 6), (6, 7)]
+    assert download_generation.split_key_range(5, 5, 4) == [(5, 6)]
+
+
+def test_failed_source_waits_for_running_sources(monkeypatch, settings, tmp_path):
+    finished = []
+
+    def generate_source(source, *args):
+        if source == "failing":
+            raise RuntimeError("source failed")
+        time.sleep(0.2)
+        finished.append(source)
+
+    monkeypatch.setattr(download_generation, "generate_source", generate_source)
+    settings.DOWNLOAD_SOURCE_WORKERS = 2
+    source_args = (None, None, str(tmp_path), None, None, None, "csv")
+    with pytest.raises(RuntimeError):
+        download_generation.generate_sources_in_parallel(["slow", "failing"], source_args, str(tmp_path / "a.zip"))
+    assert finished == ["slow"]
+
+
+def test_failed_key_range_stops_other_key_ranges(monkeypatch, tmp_path):
+    def execute_psql(temp_sql_file_path, source_path, download_job):
+        if source_path.endswith(".part0"):
+            time.sleep(0.5)
+            raise RuntimeError("psql failed")
+        psql = subprocess.Popen(["sleep", "30"])
+        (tmp_path / "psql.pid").write_text(str(psql.pid))
+        psql.wait()
+
+    monkeypatch.setattr(download_generation, "execute_psql", execute_psql)
+    monkeypatch.setattr(download_generation, "generate_export_query", lambda *args: "SELECT 1")
+    source_path = str(tmp_path / "source.csv")
+    with pytest.raises(Exception):
+        download_generation.execute_psql_in_key_ranges(
+            MagicMock(), [(1, 5), (5, 9)], None, [], "csv", source_path, time.perf_counter(), MagicMock()
+        )
+
+    # The export of the other key range was stopped, along with its psql, before its files were removed
+    assert multiprocessing.active_children() == []
+    psql_pid = int((tmp_path / "psql.pid").read_text())
+    assert not psutil.pid_exists(psql_pid) or psutil.Process(psql_pid).status() == psutil.STATUS_ZOMBIE
+    assert not (tmp_path / "source.csv.part1").exists()
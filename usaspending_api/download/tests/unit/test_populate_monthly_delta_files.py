@@ -0,0 +1,69 @@
+import csv
+import pandas as pd
+
+from usaspending_api.download.management.commands.populate_monthly_delta_files import Command
+
+
+def _read(path):
+    with open(path, newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_changes_fanned_out_to_agency_files(tmp_path):
+    export_path = tmp_path / "changes.csv"
+    export_path.write_text(
+        "delta_file_agency_name,correction_delete_ind,award_id_fain\n"
+        "Agency A,C,FAIN1\n"
+        'Agency B,,"FAIN,2"\n'
+        "Agency C,,FAIN3\n"
+        "Agency A,,FAIN4\n"
+    )
+    source_paths = {code: str(tmp_path / "{}.csv".format(code)) for code in ("all", "001", "002")}
+
+    Command().fan_out_changes(str(export_path), source_paths, {"Agency A": "001", "Agency B": "002"})
+
+    header = ["correction_delete_ind", "award_id_fain"]
+    assert _read(source_paths["all"]) == [header, ["C", "FAIN1"], ["", "FAIN,2"], ["", "FAIN3"], ["", "FAIN4"]]
+    assert _read(source_paths["001"]) == [header, ["C", "FAIN1"], ["", "FAIN4"]]
+    assert _read(source_paths["002"]) == [header, ["", "FAIN,2"]]
+
+
+def test_changes_fanned_out_as_exported(tmp_path):
+    export_path = tmp_path / "changes.csv"
+    export = (
+        "delta_file_agency_name,correction_delete_ind,award_description\n"
+        '"Agency ""A""",C,""\n'
+        'Agency B,,"Line 1\nLine 2, ""quoted"""\n'
+        "Agency A,,\n"
+    )
+    export_path.write_text(export)
+    source_paths = {code: str(tmp_path / "{}.csv".format(code)) for code in ("all", "001", "002")}
+
+    Command().fan_out_changes(str(export_path), source_paths, {'Agency "A"': "001", "Agency B": "002"})
+
+    header = "correction_delete_ind,award_description\n"
+    # psql writes empty strings as "" and nulls as nothing, which a CSV reader would not tell apart
+    assert open(source_paths["all"]).read() == header + 'C,""\n,"Line 1\nLine 2, ""quoted"""\n,\n'
+    assert open(source_paths["001"]).read() == header + 'C,""\n'
+    assert open(source_paths["002"]).read() == header + ',"Line 1\nLine 2, ""quoted"""\n'
+
+
+def test_deletion_records_split_by_subtier_agency(tmp_path):
+    command = Command()
+    command.subtier_codes = {"001": {"1100"}, "002": {"2200"}}
+    deletions = pd.DataFrame(
+        {
+            "correction_delete_ind": ["D", "D", "D"],
+            "awarding_sub_agency_code": ["1100", "2200", "3300"],
+            "assistance_transaction_unique_key": ["1100_A", "2200_B", "3300_C"],
+        }
+    )
+    source_paths = {code: tmp_path / "{}.csv".format(code) for code in ("all", "001", "002", "003")}
+
+    for agency_code, source_path in source_paths.items():
+        command.add_deletion_records(deletions, str(source_path), "Assistance", agency_code)
+
+    assert _read(source_paths["all"]) == [["D", "1100", "1100_A"], ["D", "2200", "2200_B"], ["D", "3300", "3300_C"]]
+    assert _read(source_paths["001"]) == [["D", "1100", "1100_A"]]
+    assert _read(source_paths["002"]) == [["D", "2200", "2200_B"]]
+    assert not source_paths["003"].exists()
@@ -2,7 +2,13 @@ import os
 import zipfile
 
 from tempfile import NamedTemporaryFile
-from usaspending_api.download.filestreaming.zip_file import append_files_to_zip_file
+
+from usaspending_api.download.filestreaming import zip_file as zip_file_module
+from usaspending_api.download.filestreaming.zip_file import (
+    append_files_to_zip_file,
+    merge_zip_files,
+    write_records_to_partitioned_zip_file,
+)
 
 
 def test_append_files_to_zip_file():
@@ -20,3 +26,81 @@ def test_append_files_to_zip_file():
                         os.path.basename(include_file_1.name),
                         os.path.basename(include_file_2.name),
                     ]
+
+
+def test_write_records_to_partitioned_zip_file():
+    records = [b"header\n"] + [f"row {i}\n".encode() for i in range(5)]
+    with NamedTemporaryFile() as zip_file:
+        row_count, archive_names = write_records_to_partitioned_zip_file(
+            records, zip_file.name, row_limit=2, output_name_template="test_%s.csv"
+        )
+        assert row_count == 5
+        assert archive_names == ["test_1.csv", "test_2.csv", "test_3.csv"]
+
+        with zipfile.ZipFile(zip_file.name, "r") as zf:
+            assert zf.namelist() == archive_names
+            assert zf.read("test_1.csv") == b"header\nrow 0\nrow 1\n"
+            assert zf.read("test_3.csv") == b"header\nrow 4\n"
+
+
+def test_write_records_to_partitioned_zip_file_headers_only():
+    with NamedTemporaryFile() as zip_file:
+        row_count, archive_names = write_records_to_partitioned_zip_file(
+            [b"header\n"], zip_file.name, row_limit=2, output_name_template="test_%s.csv"
+        )
+        assert row_count == 0
+        with zipfile.ZipFile(zip_file.name, "r") as zf:
+            assert zf.read("test_1.csv") == b"header\n"
+
+
+def test_merge_zip_files():
+    with NamedTemporaryFile() as zip_file, NamedTemporaryFile() as zip_1, NamedTemporaryFile() as zip_2:
+        with zipfile.ZipFile(zip_1.name, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("a.csv", b"header\n" + b"a,b,c\n" * 1000)
+            zf.writestr("b.csv", b"header\n")
+        with zipfile.ZipFile(zip_2.name, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("c.csv", b"header\n" + b"1,2,3\n" * 1000)
+        append_files_to_zip_file([zip_1.name], zip_file.name)
+
+        merge_zip_files([zip_1.name, zip_2.name], zip_file.name)
+
+        with zipfile.ZipFile(zip_file.name, "r") as zf:
+            assert zf.testzip() is None
+            assert zf.namelist() == [os.path.basename(zip_1.name), "a.csv", "b.csv", "c.csv"]
+            assert zf.read("a.csv") == b"header\n" + b"a,b,c\n" * 1000
+            assert zf.read("b.csv") == b"header\n"
+            assert zf.read("c.csv") == b"header\n" + b"1,2,3\n" * 1000
+
+
+def test_append_files_to_zip_file_parallel_compression(monkeypatch):
+    monkeypatch.setattr(zip_file_module, "DEFLATE_CHUNK_SIZE", 1024)
+    contents = [b"", b"short", "".join(f"{i},row {i}\n" for i in range(5000)).encode()]
+    with NamedTemporaryFile() as zip_file:
+        file_paths = []
+        with NamedTemporaryFile() as f1, NamedTemporaryFile() as f2, NamedTemporaryFile() as f3:
+            for include_file, content in zip((f1, f2, f3), contents):
+                include_file.write(content)
+                include_file.flush()
+                file_paths.append(include_file.name)
+            append_files_to_zip_file(file_paths, zip_file.name, compression_level=1, workers=4)
+
+        with zipfile.ZipFile(zip_file.name, "r") as zf:
+            assert zf.testzip() is None
+            assert zf.namelist() == [os.path.basename(file_path) for file_path in file_paths]
+            assert [zf.read(os.path.basename(file_path)) for file_path in file_paths] == contents
+            assert zf.getinfo(os.path.basename(file_paths[2])).compress_size < len(contents[2])
+
+
+def test_write_records_to_partitioned_zip_file_parallel_compression(monkeypatch):
+    monkeypatch.setattr(zip_file_module, "DEFLATE_CHUNK_SIZE", 1024)
+    records = [b"header\n"] + [f"row {i}\n".encode() for i in range(2500)]
+    with NamedTemporaryFile() as zip_file:
+        row_count, archive_names = write_records_to_partitioned_zip_file(
+            records, zip_file.name, row_limit=1000, output_name_template="test_%s.csv", workers=3
+        )
+        assert row_count == 2500
+
+        with zipfile.ZipFile(zip_file.name, "r") as zf:
+            assert zf.testzip() is None
+            assert zf.namelist() == ["test_1.csv", "test_2.csv", "test_3.csv"]
+            assert zf.read("test_3.csv") == b"header\n" + b"".join(records[2001:])
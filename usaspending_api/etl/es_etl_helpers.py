@@ -1,22 +1,29 @@
 from typing import Optional
 
 import json
+import numpy as np
 import os
 import pandas as pd
 import psycopg2
+import shutil
 import subprocess
 
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from django.conf import settings
-from django.core.management import call_command
-from elasticsearch import helpers, TransportError
-from time import perf_counter, sleep
+from elasticsearch import TransportError
+from json.encoder import encode_basestring_ascii
+from multiprocessing import current_process, Value
+from pathlib import Path
+from queue import Empty
+from time import perf_counter, sleep, time
 
 from usaspending_api.awards.v2.lookups.elasticsearch_lookups import INDEX_ALIASES_TO_AWARD_TYPES
 from usaspending_api.common.csv_helpers import count_rows_in_delimited_file
-from usaspending_api.common.helpers.s3_helpers import retrieve_s3_bucket_object_list, access_s3_object
+from usaspending_api.common.elasticsearch.client import instantiate_elasticsearch_client
 from usaspending_api.common.helpers.sql_helpers import get_database_dsn_string
+from usaspending_api.transactions.transaction_delete_journal_helpers import DeleteJournal, latest_deletions
 
 # ==============================================================================
 # SQL Template Strings for Postgres Statements
@@ -191,13 +198,30 @@ UPDATE_DATE_SQL = " AND update_date >= '{}'"
 COUNT_SQL = """
 SELECT COUNT(*) AS count
 FROM {view}
+WHERE {type_fy}fiscal_year={fy}{update_date}{id_range}
+"""
+
+ID_BOUNDS_SQL = """
+SELECT MIN({id_column}) AS min_id, MAX({id_column}) AS max_id
+FROM {view}
 WHERE {type_fy}fiscal_year={fy}{update_date}
 """
 
+STREAM_SQL = """
+SELECT {columns}
+FROM {view}
+WHERE {type_fy}fiscal_year={fy}{update_date}{id_range}{after_id}
+ORDER BY {view}.{id_column}
+"""
+
+AFTER_ID_SQL = " AND {id_column} > {after_id}"
+ID_RANGE_LOW_SQL = " AND {id_column} >= {low}"
+ID_RANGE_HIGH_SQL = " AND {id_column} < {high}"
+
 COPY_SQL = """"COPY (
     SELECT *
     FROM {view}
-    WHERE {type_fy}fiscal_year={fy}{update_date}
+    WHERE {type_fy}fiscal_year={fy}{update_date}{id_range}
 ) TO STDOUT DELIMITER ',' CSV HEADER" > '{filename}'
 """
 
@@ -230,19 +254,136 @@ AWARD_DESC_CATEGORIES = {
     "direct payment": "directpayments",
 }
 
+# Number of ids matched by a single terms query when deleting documents; well below the index.max_terms_count default
+DELETE_CHUNK_SIZE = 10000
+
+# Number of documents sent in a single bulk request; the elasticsearch.helpers default
+BULK_REQUEST_SIZE = 500
+
 UNIVERSAL_TRANSACTION_ID_NAME = "generated_unique_transaction_id"
 UNIVERSAL_AWARD_ID_NAME = "generated_unique_award_id"
 
+# Prefixes turning the ids in the files of the deleted transaction journal into generated_unique_transaction_ids
+DELETED_ID_PREFIXES = {"detached_award_proc_unique": "CONT_TX_", "afa_generated_unique": "ASST_TX_"}
+
 
 class DataJob:
-    def __init__(self, *args):
+    def __init__(self, *args, id_range=(None, None)):
         self.name = args[0]
         self.index = args[1]
         self.fy = args[2]
         self.csv = args[3]
+        self.id_range = id_range  # (inclusive, exclusive) bounds of the ids in the fiscal year; None is unbounded
         self.count = None
 
 
+class LoadProgress:
+    """
+    Totals shared by every Download and ES Index process of a load (they are held in shared memory) so that progress
+    across all of the jobs can be reported as each one finishes
+    """
+
+    def __init__(self, total_jobs):
+        self.total_jobs = total_jobs
+        self.started = time()
+        self._jobs_downloaded = Value("i", 0)
+        self._records_downloaded = Value("q", 0)
+        self._jobs_indexed = Value("i", 0)
+        self._documents_indexed = Value("q", 0)
+
+    def job_downloaded(self, job):
+        _increment(self._jobs_downloaded, 1)
+        _increment(self._records_downloaded, job.count or 0)
+        printf({"msg": self.summary(), "job": job.name, "f": "Download"})
+
+    def job_indexed(self, job, documents):
+        _increment(self._jobs_indexed, 1)
+        _increment(self._documents_indexed, documents)
+        printf({"msg": self.summary(), "job": job.name, "f": "ES Ingest"})
+
+    def summary(self):
+        duration = time() - self.started
+        return "Progress: {}/{} jobs downloaded ({:,} records), {}/{} jobs indexed{}".format(
+            self._jobs_downloaded.value,
+            self.total_jobs,
+            self._records_downloaded.value,
+            self._jobs_indexed.value,
+            self.total_jobs,
+            format_rate(self._documents_indexed.value, duration),
+        )
+
+
+def _increment(shared_value, amount):
+    with shared_value.get_lock():
+        shared_value.value += amount
+
+
+class JobCheckpoint:
+    """
+    Progress of the DataJob for a fiscal year being loaded into a new index. It is saved to a file after every chunk
+    so that an interrupted load can be resumed (es_rapidloader --resume) instead of starting over.
+    """
+
+    def __init__(
+        self, path, fiscal_year, id_range=(None, None), chunks_completed=0, documents=0, last_id=None, complete=False
+    ):
+        self.path = path
+        self.fiscal_year = fiscal_year
+        self.id_range = tuple(id_range)
+        self.chunks_completed = chunks_completed
+        self.documents = documents
+        self.last_id = last_id
+        self.complete = complete
+
+    @classmethod
+    def load(cls, config, fiscal_year, id_range=(None, None)):
+        if id_range == (None, None):
+            name = "{}.json".format(fiscal_year)
+        else:
+            name = "{}_{}-{}.json".format(fiscal_year, *("" if bound is None else bound for bound in id_range))
+        path = checkpoint_directory(config) / name
+        if path.exists():
+            return cls(path, **json.loads(path.read_text()))
+        return cls(path, fiscal_year, id_range)
+
+    @property
+    def started(self):
+        return self.chunks_completed > 0
+
+    def chunk_completed(self, documents, last_id=None):
+        self.chunks_completed += 1
+        self.documents += documents
+        self.last_id = last_id
+        self.save()
+
+    def mark_complete(self):
+        self.complete = True
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        checkpoint = {
+            "fiscal_year": self.fiscal_year,
+            "id_range": self.id_range,
+            "chunks_completed": self.chunks_completed,
+            "documents": self.documents,
+            "last_id": self.last_id,
+            "complete": self.complete,
+        }
+        # Write to a temporary file first so a checkpoint is never left half written
+        temp_path = self.path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(checkpoint))
+        os.replace(str(temp_path), str(self.path))
+
+
+def checkpoint_directory(config):
+    return Path(config["directory"]) / "checkpoints" / config["index_name"]
+
+
+def clear_checkpoints(config):
+    shutil.rmtree(str(checkpoint_directory(config)), ignore_errors=True)
+
+
 # ==============================================================================
 # Helper functions for several Django management commands focused on ETL into a Elasticsearch cluster
 # ==============================================================================
@@ -274,6 +415,18 @@ def convert_postgres_json_array_as_string_to_list(json_array_as_string: str) ->
     return result
 
 
+# Need a specific converter to handle converting strings to correct data types (e.g. string -> array)
+CONVERTERS = {
+    "business_categories": convert_postgres_array_as_string_to_list,
+    "tas_paths": convert_postgres_array_as_string_to_list,
+    "tas_components": convert_postgres_array_as_string_to_list,
+    "federal_accounts": convert_postgres_json_array_as_string_to_list,
+    "disaster_emergency_fund_codes": convert_postgres_array_as_string_to_list,
+}
+# Columns read from the CSV as strings; pd.read_csv infers the types of the others
+CSV_STRING_COLUMNS = set(VIEW_COLUMNS + list(CONVERTERS))
+
+
 def process_guarddog(process_list):
     """
         pass in a list of multiprocess Process objects.
@@ -295,21 +448,21 @@ def configure_sql_strings(config, filename, deleted_ids):
     """
     Populates the formatted strings defined globally in this file to create the desired SQL
     """
-    update_date_str = UPDATE_DATE_SQL.format(config["starting_date"].strftime("%Y-%m-%d"))
-    if config["load_type"] == "awards":
-        view_name = settings.ES_AWARDS_ETL_VIEW_NAME
-        view_type = "award"
-        type_fy = ""
-    else:
-        view_name = settings.ES_TRANSACTIONS_ETL_VIEW_NAME
-        view_type = "transaction"
-        type_fy = "transaction_"
+    view_name, view_type, type_fy, update_date_str = _view_sql_parameters(config)
+    id_range_str = _id_range_sql(config, view_type)
 
     copy_sql = COPY_SQL.format(
-        fy=config["fiscal_year"], update_date=update_date_str, filename=filename, view=view_name, type_fy=type_fy
+        fy=config["fiscal_year"],
+        update_date=update_date_str,
+        id_range=id_range_str,
+        filename=filename,
+        view=view_name,
+        type_fy=type_fy,
     )
 
-    count_sql = COUNT_SQL.format(fy=config["fiscal_year"], update_date=update_date_str, view=view_name, type_fy=type_fy)
+    count_sql = COUNT_SQL.format(
+        fy=config["fiscal_year"], update_date=update_date_str, id_range=id_range_str, view=view_name, type_fy=type_fy
+    )
     if deleted_ids and config["process_deletes"]:
         id_list = ",".join(["('{}')".format(x) for x in deleted_ids.keys()])
         id_sql = CHECK_IDS_SQL.format(id_list=id_list, fy=config["fiscal_year"], type_fy=type_fy, view_type=view_type)
@@ -319,6 +472,75 @@ def configure_sql_strings(config, filename, deleted_ids):
     return copy_sql, id_sql, count_sql
 
 
+def configure_stream_sql(config):
+    """
+    Create the SQL selecting the same records as the COPY from configure_sql_strings. Every column is cast to text so
+    values arrive as they would have been written to the CSV (e.g. arrays as "{a,b}") for the CONVERTERS, and
+    db_rows_to_df then types them the way pd.read_csv types the CSV in csv_chunk_gen.
+    Records are ordered by id so that a load can be resumed after the last id loaded (config["after_id"]). The id is
+    qualified with the view name so they are ordered by the integer column rather than its text alias.
+    """
+    view_name, view_type, type_fy, update_date_str = _view_sql_parameters(config)
+    view_columns = AWARD_VIEW_COLUMNS if config["load_type"] == "awards" else VIEW_COLUMNS
+    columns = ", ".join('"{0}"::text AS "{0}"'.format(column) for column in view_columns)
+    id_column = "{}_id".format(view_type)
+    after_id = ""
+    if config.get("after_id") is not None:
+        after_id = AFTER_ID_SQL.format(id_column=id_column, after_id=int(config["after_id"]))
+    return STREAM_SQL.format(
+        columns=columns,
+        fy=config["fiscal_year"],
+        update_date=update_date_str,
+        id_range=_id_range_sql(config, view_type),
+        view=view_name,
+        type_fy=type_fy,
+        after_id=after_id,
+        id_column=id_column,
+    )
+
+
+def configure_id_bounds_sql(config):
+    view_name, view_type, type_fy, update_date_str = _view_sql_parameters(config)
+    return ID_BOUNDS_SQL.format(
+        id_column="{}_id".format(view_type),
+        fy=config["fiscal_year"],
+        update_date=update_date_str,
+        view=view_name,
+        type_fy=type_fy,
+    )
+
+
+def split_id_range(min_id, max_id, range_count):
+    """
+    Split the ids from min_id to max_id into range_count ranges of equal width, as (inclusive, exclusive) bounds.
+    The first and last ranges are left unbounded so together the ranges cover every id, even ones added later on.
+    """
+    if min_id is None or range_count <= 1:
+        return [(None, None)]
+    width = max(1, -(-(max_id - min_id + 1) // range_count))
+    boundaries = list(range(min_id + width, max_id + 1, width))
+    return list(zip([None] + boundaries, boundaries + [None]))
+
+
+def _id_range_sql(config, view_type):
+    low, high = config.get("id_range", (None, None))
+    id_column = "{}_id".format(view_type)
+    id_range_str = ""
+    if low is not None:
+        id_range_str += ID_RANGE_LOW_SQL.format(id_column=id_column, low=int(low))
+    if high is not None:
+        id_range_str += ID_RANGE_HIGH_SQL.format(id_column=id_column, high=int(high))
+    return id_range_str
+
+
+def _view_sql_parameters(config):
+    update_date_str = UPDATE_DATE_SQL.format(config["starting_date"].strftime("%Y-%m-%d"))
+    if config["load_type"] == "awards":
+        return settings.ES_AWARDS_ETL_VIEW_NAME, "award", "", update_date_str
+    else:
+        return settings.ES_TRANSACTIONS_ETL_VIEW_NAME, "transaction", "transaction_", update_date_str
+
+
 def execute_sql_statement(cmd, results=False, verbose=False):
     """ Simple function to execute SQL using a psycopg2 connection"""
     rows = None
@@ -340,10 +562,13 @@ def db_rows_to_dict(cursor):
     return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 
-def download_db_records(fetch_jobs, done_jobs, config):
+def download_db_records(fetch_jobs, done_jobs, config, progress):
     # There has been a recurring issue with .empty() returning true when the queue actually
     # contains multiple jobs. Wait a few seconds before starting to see if it helps
     sleep(5)
+    worker = current_process().name
+    worker_start = perf_counter()
+    job_count, record_count = 0, 0
     printf({"msg": "Queue has items: {}".format(not fetch_jobs.empty()), "f": "Download"})
     while not fetch_jobs.empty():
         if done_jobs.full():
@@ -351,7 +576,10 @@ def download_db_records(fetch_jobs, done_jobs, config):
             sleep(60)
         else:
             start = perf_counter()
-            job = fetch_jobs.get_nowait()
+            try:
+                job = fetch_jobs.get_nowait()
+            except Empty:
+                break  # Another Download process took the last job
             printf({"msg": 'Preparing to download "{}"'.format(job.csv), "job": job.name, "f": "Download"})
 
             sql_config = {
@@ -359,29 +587,54 @@ def download_db_records(fetch_jobs, done_jobs, config):
                 "fiscal_year": job.fy,
                 "process_deletes": config["process_deletes"],
                 "load_type": config["load_type"],
+                "id_range": job.id_range,
             }
             copy_sql, _, count_sql = configure_sql_strings(sql_config, job.csv, [])
 
+            job_count += 1
+            if config["stream"]:
+                # Records are streamed from the database by the ES Ingest process; only count them here
+                job.count = count_db_records(count_sql, job.name, config["skip_counts"], config["verbose"])
+                done_jobs.put(job)
+                progress.job_downloaded(job)
+                continue
+
             if os.path.isfile(job.csv):
                 os.remove(job.csv)
 
             job.count = download_csv(count_sql, copy_sql, job.csv, job.name, config["skip_counts"], config["verbose"])
             done_jobs.put(job)
+            progress.job_downloaded(job)
+            duration = perf_counter() - start
+            record_count += job.count or 0
             printf(
                 {
-                    "msg": 'CSV "{}" copy took {} seconds'.format(job.csv, perf_counter() - start),
+                    "msg": 'CSV "{}" copy took {} seconds{}'.format(
+                        job.csv, duration, format_rate(job.count, duration)
+                    ),
                     "job": job.name,
                     "f": "Download",
                 }
             )
             sleep(1)
 
-    # This "Null Job" is used to notify the other (ES data load) process this is the final job
-    done_jobs.put(DataJob(None, None, None, None))
+    # The ES Index processes are told there are no more jobs once every Download process is done
+    duration = perf_counter() - worker_start
+    msg = "{} completed {} job(s) in {}s{}".format(worker, job_count, duration, format_rate(record_count, duration))
+    printf({"msg": msg, "f": "Download"})
     printf({"msg": "PostgreSQL COPY operations complete", "f": "Download"})
     return
 
 
+def count_db_records(count_sql, job_id, skip_counts, verbose):
+    if skip_counts:
+        printf({"msg": "Skipping count checks", "job": job_id, "f": "Download"})
+        return None
+    count = execute_sql_statement(count_sql, True, verbose)[0]["count"]
+    printf({"msg": "{} records to stream from the database".format(count), "job": job_id, "f": "Download"})
+    return count
+
+
 def download_csv(count_sql, copy_sql, filename, job_id, skip_counts, verbose):
     if skip_counts:
         count = None
@@ -401,64 +654,184 @@ def download_csv(count_sql, copy_sql, filename, job_id, skip_counts, verbose):
     return count
 
 
+class DocumentChunk:
+    """
+    A chunk of documents ready to be sent to Elasticsearch, each one already serialized as the pair of NDJSON lines
+    (action and source) it takes up in a bulk request
+    """
+
+    def __init__(self, documents, unique_ids, last_id):
+        self.documents = documents
+        self.unique_ids = unique_ids  # generated_unique_(transaction|award)_id of each document, used for deletes
+        self.last_id = last_id  # transaction_id/award_id of the last document, used for checkpoints
+
+    def __len__(self):
+        return len(self.documents)
+
+
 def csv_chunk_gen(filename, chunksize, job_id, load_type):
     printf({"msg": "Opening {} (batch size = {})".format(filename, chunksize), "job": job_id, "f": "ES Ingest"})
-    # Need a specific converter to handle converting strings to correct data types (e.g. string -> array)
-    converters = {
-        "business_categories": convert_postgres_array_as_string_to_list,
-        "tas_paths": convert_postgres_array_as_string_to_list,
-        "tas_components": convert_postgres_array_as_string_to_list,
-        "federal_accounts": convert_postgres_json_array_as_string_to_list,
-        "disaster_emergency_fund_codes": convert_postgres_array_as_string_to_list,
-    }
     # Panda's data type guessing causes issues for Elasticsearch. Explicitly cast using dictionary
-    dtype = {k: str for k in VIEW_COLUMNS if k not in converters}
-    for file_df in pd.read_csv(filename, dtype=dtype, converters=converters, header=0, chunksize=chunksize):
-        file_df = file_df.where(cond=(pd.notnull(file_df)), other=None)
-        if load_type == "transactions":
-            # Route all transaction documents with the same recipient to the same shard
-            # This allows for accuracy and early-termination of "top N" recipient category aggregation queries
-            # Recipient is are highest-cardinality category with over 2M unique values to aggregate against,
-            # and this is needed for performance
-            # ES helper will pop any "meta" fields like "routing" from provided data dict and use them in the action
-            file_df["routing"] = file_df["recipient_agg_key"]
-        yield file_df.to_dict(orient="records")
-
-
-def es_data_loader(client, fetch_jobs, done_jobs, config):
-    if config["create_new_index"]:
-        # ensure template for index is present and the latest version
-        call_command("es_configure", "--template-only", "--load_type={}".format(config["load_type"]))
-    while True:
-        if not done_jobs.empty():
-            job = done_jobs.get_nowait()
-            if job.name is None:
-                break
-
-            printf({"msg": "Starting new job", "job": job.name, "f": "ES Ingest"})
-            post_to_elasticsearch(client, job, config)
-            if os.path.exists(job.csv):
-                os.remove(job.csv)
-        else:
-            printf({"msg": "No Job. Sleeping 45s", "f": "ES Ingest"})
-            sleep(45)
+    dtype = {k: str for k in CSV_STRING_COLUMNS}
+    for file_df in pd.read_csv(filename, dtype=dtype, header=0, chunksize=chunksize):
+        yield transform_documents(file_df, load_type)
+
+
+def db_chunk_gen(stream_sql, chunksize, job_id, load_type):
+    """
+    Stream records from the database through a server-side cursor, yielding them in chunks of up to chunksize
+    documents built the same way as the ones csv_chunk_gen builds from a downloaded CSV
+    """
+    printf(
+        {
+            "msg": "Streaming records from the database (batch size = {})".format(chunksize),
+            "job": job_id,
+            "f": "ES Ingest",
+        }
+    )
+    connection = psycopg2.connect(dsn=get_database_dsn_string())
+    try:
+        # A named cursor is a server-side cursor; only the rows of one batch are held in memory at a time
+        with connection.cursor(name="es_rapidloader_job_{}".format(job_id)) as cursor:
+            cursor.itersize = chunksize
+            cursor.execute(stream_sql)
+            while True:
+                rows = cursor.fetchmany(chunksize)
+                if not rows:
+                    break
+                db_df = db_rows_to_df(rows, [col[0] for col in cursor.description])
+                yield transform_documents(db_df, load_type)
+    finally:
+        connection.close()
+
+
+def db_rows_to_df(rows, columns):
+    """
+    Build the DataFrame pd.read_csv would read from a CSV of the rows (every value cast to text by
+    configure_stream_sql) so streamed documents match the ones csv_chunk_gen builds
+    """
+    db_df = pd.DataFrame.from_records(rows, columns=columns)
+    # Empty strings are read from the CSV as nulls so, to match, they are nulls here too
+    db_df = db_df.mask(db_df == "")
+    for column in db_df.columns:
+        if column not in CSV_STRING_COLUMNS:
+            # pd.read_csv infers the type of the columns it isn't told are strings, making numbers of numeric columns
+            try:
+                db_df[column] = pd.to_numeric(db_df[column])
+            except ValueError:
+                pass
+    return db_df
+
 
+def transform_documents(df, load_type):
+    """
+    Convert a DataFrame of records (nulls as NaN) into a DocumentChunk a whole column at a time: every column is
+    encoded as JSON values on its own and then each document is formatted from a template already holding its keys.
+    """
+    columns = list(df.columns)
+    encoded_columns = [encode_column(df[column], CONVERTERS.get(column)) for column in columns]
+    source_template = "{" + ",".join("{}:%s".format(encode_basestring_ascii(column)) for column in columns) + "}"
+
+    if load_type == "transactions":
+        # Route all transaction documents with the same recipient to the same shard
+        # This allows for accuracy and early-termination of "top N" recipient category aggregation queries
+        # Recipient is are highest-cardinality category with over 2M unique values to aggregate against,
+        # and this is needed for performance
+        template = '{"index":{"routing":%s}}\n' + source_template
+        encoded_columns.insert(0, encoded_columns[columns.index("recipient_agg_key")])
+        id_column, unique_id_column = "transaction_id", UNIVERSAL_TRANSACTION_ID_NAME
+    else:
+        template = '{"index":{}}\n' + source_template
+        id_column, unique_id_column = "award_id", UNIVERSAL_AWARD_ID_NAME
+
+    documents = [template % values for values in zip(*encoded_columns)]
+    last_id = str(df[id_column].iloc[-1]) if len(df) else None
+    return DocumentChunk(documents, df[unique_id_column].dropna().tolist(), last_id)
+
+
+def encode_column(series, converter=None):
+    """
+    Encode every value of a column as JSON, nulls included. A converter is only run once for each distinct value of
+    its column, since the same few arrays of federal accounts, TAS and business categories repeat across many records.
+    """
+    values = series.to_numpy(dtype=object)
+    nulls = pd.isna(values)
+    present = values[~nulls] if nulls.any() else values
+    if converter is not None:
+        distinct_values = pd.unique(present)
+        converted = [json.dumps(converter(value)) for value in distinct_values]
+        encoded = pd.Series(converted, index=distinct_values, dtype=object).reindex(present).to_numpy()
+    else:
+        try:
+            encoded = np.array(list(map(encode_basestring_ascii, present)), dtype=object)
+        except TypeError:
+            # Columns which pandas did not read as strings (only possible for some award columns)
+            encoded = np.array([json.dumps(value) for value in present], dtype=object)
+    if present is values:
+        return encoded
+    encoded_with_nulls = np.full(len(values), "null", dtype=object)
+    encoded_with_nulls[~nulls] = encoded
+    return encoded_with_nulls
+
+
+def es_data_loader(fetch_jobs, done_jobs, config, progress):
+    # Connections are never shared with the process this one was forked from or with the other ES Index processes
+    client = instantiate_elasticsearch_client()
+    worker = current_process().name
+    worker_start = perf_counter()
+    job_count, document_count = 0, 0
+    while True:
+        try:
+            job = done_jobs.get(timeout=45)
+        except Empty:
+            printf({"msg": "No Job. Waited 45s", "f": "ES Ingest"})
+            continue
+        if job.name is None:
+            break
+
+        printf({"msg": "Starting new job", "job": job.name, "f": "ES Ingest"})
+        job_count += 1
+        job_document_count = post_to_elasticsearch(client, job, config)
+        document_count += job_document_count
+        progress.job_indexed(job, job_document_count)
+        if os.path.exists(job.csv):
+            os.remove(job.csv)
+
+    duration = perf_counter() - worker_start
+    msg = "{} completed {} job(s) in {}s{}".format(worker, job_count, duration, format_rate(document_count, duration))
+    printf({"msg": msg, "f": "ES Ingest"})
     printf({"msg": "Completed Elasticsearch data load", "f": "ES Ingest"})
     return
 
 
-def streaming_post_to_es(client, chunk, index_name: str, type: str, job_id=None):
-    success, failed = 0, 0
-    try:
-        for ok, item in helpers.streaming_bulk(client, chunk, index=index_name):
-            success = [success, success + 1][ok]
-            failed = [failed + 1, failed][ok]
+def format_rate(count, duration):
+    if not count or duration <= 0:
+        return ""
+    return " ({:,} records, {:,.0f} records/s)".format(count, count / duration)
+
+
+def post_documents_to_es(client, chunk, index_name: str, job_id=None, thread_count=1):
+    """Send the already serialized documents of a DocumentChunk to Elasticsearch using thread_count threads"""
+    requests = [chunk.documents[i : i + BULK_REQUEST_SIZE] for i in range(0, len(chunk), BULK_REQUEST_SIZE)]
+
+    def _bulk(documents):
+        response = client.bulk(body="\n".join(documents) + "\n", index=index_name)
+        results = [next(iter(item.values())) for item in response["items"]]
+        return [result for result in results if not 200 <= result.get("status", 500) < 300]
 
+    try:
+        with ThreadPoolExecutor(max_workers=thread_count) as executor:
+            errors = [error for request_errors in executor.map(_bulk, requests) for error in request_errors]
     except Exception as e:
         print("Fatal error: \n\n{}...\n\n{}".format(str(e)[:5000], "*" * 80))
         raise SystemExit(1)
 
+    failed = len(errors)
+    success = len(chunk) - failed
     printf({"msg": "Success: {}, Fails: {}".format(success, failed), "job": job_id, "f": "ES Ingest"})
+    if errors:
+        print("Fatal error: \n\n{} document(s) failed to index: {}...\n\n{}".format(failed, errors[:5], "*" * 80))
+        raise SystemExit(1)
     return success, failed
 
 
@@ -545,24 +918,49 @@ def post_to_elasticsearch(client, job, config, chunksize=250000):
         raise SystemExit(1)
     if not does_index_exist:
         printf({"msg": 'Creating index "{}"'.format(job.index), "job": job.name, "f": "ES Ingest"})
-        client.indices.create(index=job.index)
+        # Ignore the error raised when another ES Index process has just created the index
+        client.indices.create(index=job.index, ignore=400)
         client.indices.refresh(job.index)
 
-    csv_generator = csv_chunk_gen(job.csv, chunksize, job.name, config["load_type"])
-    for count, chunk in enumerate(csv_generator):
+    checkpoint = JobCheckpoint.load(config, job.fy, job.id_range) if config["create_new_index"] else None
+    if checkpoint and checkpoint.started and not config["stream"]:
+        # Records are not in a stable order in the CSV so a partially loaded job has to start over
+        delete_job_from_es(client, job, config)
+        checkpoint = JobCheckpoint(checkpoint.path, job.fy, job.id_range)
+    elif checkpoint and checkpoint.started:
+        msg = "Resuming after chunk #{} ({} documents already loaded, last id {})".format(
+            checkpoint.chunks_completed - 1, checkpoint.documents, checkpoint.last_id
+        )
+        printf({"msg": msg, "job": job.name, "f": "ES Ingest"})
+        # Documents are indexed without an _id, so a chunk posted before the load was interrupted but never
+        # checkpointed would otherwise be indexed a second time
+        delete_job_from_es(client, job, config, after_id=checkpoint.last_id)
+
+    if config["stream"]:
+        sql_config = {
+            "starting_date": config["starting_date"],
+            "fiscal_year": job.fy,
+            "load_type": config["load_type"],
+            "id_range": job.id_range,
+            "after_id": checkpoint.last_id if checkpoint else None,
+        }
+        chunk_generator = db_chunk_gen(configure_stream_sql(sql_config), chunksize, job.name, config["load_type"])
+    else:
+        chunk_generator = csv_chunk_gen(job.csv, chunksize, job.name, config["load_type"])
+
+    document_count = 0
+    for count, chunk in enumerate(chunk_generator, start=checkpoint.chunks_completed if checkpoint else 0):
         if len(chunk) == 0:
             printf({"msg": "No documents to add/delete for chunk #{}".format(count), "f": "ES Ingest", "job": job.name})
             continue
         iteration = perf_counter()
         if config["process_deletes"]:
             if config["load_type"] == "awards":
-                id_list = [{"key": c[UNIVERSAL_AWARD_ID_NAME], "col": UNIVERSAL_AWARD_ID_NAME} for c in chunk]
-                delete_from_es(client, id_list, job.name, config, job.index)
+                id_list = [{"key": key, "col": UNIVERSAL_AWARD_ID_NAME} for key in chunk.unique_ids]
+                delete_from_es(client, id_list, job.name, config, job.index, refresh=False)
             else:
-                id_list = [
-                    {"key": c[UNIVERSAL_TRANSACTION_ID_NAME], "col": UNIVERSAL_TRANSACTION_ID_NAME} for c in chunk
-                ]
-                delete_from_es(client, id_list, job.name, config, job.index)
+                id_list = [{"key": key, "col": UNIVERSAL_TRANSACTION_ID_NAME} for key in chunk.unique_ids]
+                delete_from_es(client, id_list, job.name, config, job.index, refresh=False)
 
         current_rows = "({}-{})".format(count * chunksize + 1, count * chunksize + len(chunk))
         printf(
@@ -572,7 +970,10 @@ def post_to_elasticsearch(client, job, config, chunksize=250000):
                 "f": "ES Ingest",
             }
         )
-        streaming_post_to_es(client, chunk, job.index, config["load_type"], job.name)
+        success, _ = post_documents_to_es(client, chunk, job.index, job.name, config["bulk_threads"])
+        document_count += success
+        if checkpoint:
+            checkpoint.chunk_completed(success, chunk.last_id if config["stream"] else None)
         printf(
             {
                 "msg": "Iteration group #{} took {}s".format(count, perf_counter() - iteration),
@@ -580,26 +981,60 @@ def post_to_elasticsearch(client, job, config, chunksize=250000):
                 "f": "ES Ingest",
             }
         )
+    if config["process_deletes"]:
+        # Deletes made while loading each chunk are only refreshed once, here
+        client.indices.refresh(job.index)
+
+    if checkpoint:
+        checkpoint.mark_complete()
+
+    duration = perf_counter() - start
     printf(
         {
-            "msg": "Elasticsearch Index loading took {}s".format(perf_counter() - start),
+            "msg": "Elasticsearch Index loading took {}s{}".format(duration, format_rate(document_count, duration)),
             "job": job.name,
             "f": "ES Ingest",
         }
     )
+    return document_count
+
+
+def delete_job_from_es(client, job, config, after_id=None):
+    """Delete the documents of the job's fiscal year and id range, or only the ones with an id after after_id"""
+    if config["load_type"] == "awards":
+        fiscal_year_field, id_column = "fiscal_year", "award_id"
+    else:
+        fiscal_year_field, id_column = "transaction_fiscal_year", "transaction_id"
+    filters = [{"term": {fiscal_year_field: job.fy}}]
+    low, high = job.id_range
+    if after_id is not None:
+        low = max(low, int(after_id) + 1) if low is not None else int(after_id) + 1
+    if low is not None or high is not None:
+        bounds = {"gte": low, "lt": high}
+        filters.append({"range": {id_column: {k: v for k, v in bounds.items() if v is not None}}})
+    body = {"query": {"bool": {"filter": filters}}}
+    response = client.delete_by_query(
+        index=job.index, body=json.dumps(body), refresh=True, conflicts="proceed", slices="auto"
+    )
+    msg = "Deleted {} documents from a partial load of FY{}".format(response["deleted"], job.fy)
+    if after_id is not None:
+        msg += " after id {}".format(after_id)
+    printf({"msg": msg, "job": job.name, "f": "ES Ingest"})
 
 
-def deleted_transactions(client, config):
+def deleted_transactions(config):
+    client = instantiate_elasticsearch_client()
     deleted_ids = gather_deleted_ids(config)
     id_list = [{"key": deleted_id, "col": UNIVERSAL_TRANSACTION_ID_NAME} for deleted_id in deleted_ids]
     delete_from_es(client, id_list, None, config, None)
 
 
-def deleted_awards(client, config):
+def deleted_awards(config):
     """
     so we have to find all the awards connected to these transactions,
     if we can't find the awards in the database, then we have to delete them from es
     """
+    client = instantiate_elasticsearch_client()
     deleted_ids = gather_deleted_ids(config)
     id_list = [{"key": deleted_id, "col": UNIVERSAL_TRANSACTION_ID_NAME} for deleted_id in deleted_ids]
     award_ids = get_deleted_award_ids(client, id_list, config, settings.ES_TRANSACTIONS_QUERY_ALIAS_PREFIX + "-*")
@@ -645,42 +1080,27 @@ def gather_deleted_ids(config):
     printf({"msg": "Gathering all deleted transactions from S3"})
     start = perf_counter()
 
-    bucket_objects = retrieve_s3_bucket_object_list(bucket_name=config["s3_bucket"])
-    printf({"msg": f"{len(bucket_objects):,} files found in bucket '{config['s3_bucket']}'."})
-
     if config["verbose"]:
         printf({"msg": f"CSV data from {config['starting_date']} to now"})
 
-    filtered_csv_list = [
-        x
-        for x in bucket_objects
-        if (x.key.endswith(".csv") and not x.key.startswith("staging") and x.last_modified >= config["starting_date"])
-    ]
+    journal = DeleteJournal(config["s3_bucket"])
+    journal_files = journal.files(
+        lambda obj: obj.key.endswith(".csv")
+        and not obj.key.startswith("staging")
+        and obj.last_modified >= config["starting_date"]
+    )
 
     if config["verbose"]:
-        printf({"msg": f"Found {len(filtered_csv_list)} csv files"})
-
-    deleted_ids = {}
-
-    for obj in filtered_csv_list:
-        object_data = access_s3_object(bucket_name=config["s3_bucket"], obj=obj)
+        printf({"msg": f"Found {len(journal_files)} csv files"})
 
-        # Ingests the CSV into a dataframe. pandas thinks some ids are dates, so disable parsing
-        data = pd.read_csv(object_data, dtype=str)
+    for journal_file in journal_files:
+        if journal_file.column not in DELETED_ID_PREFIXES:
+            printf({"msg": f"  [Missing valid col] in {journal_file.key}"})
 
-        if "detached_award_proc_unique" in data:
-            new_ids = ["CONT_TX_" + x.upper() for x in data["detached_award_proc_unique"].values]
-        elif "afa_generated_unique" in data:
-            new_ids = ["ASST_TX_" + x.upper() for x in data["afa_generated_unique"].values]
-        else:
-            printf({"msg": f"  [Missing valid col] in {obj.key}"})
-
-        for uid in new_ids:
-            if uid in deleted_ids:
-                if deleted_ids[uid]["timestamp"] < obj.last_modified:
-                    deleted_ids[uid]["timestamp"] = obj.last_modified
-            else:
-                deleted_ids[uid] = {"timestamp": obj.last_modified}
+    deleted_ids = {
+        uid: {"timestamp": timestamp}
+        for uid, timestamp in latest_deletions(journal_files, generated_unique_transaction_id).items()
+    }
 
     if config["verbose"]:
         for uid, deleted_dict in deleted_ids.items():
@@ -690,13 +1110,48 @@ def gather_deleted_ids(config):
     return deleted_ids
 
 
+def generated_unique_transaction_id(journal_file, deleted_id):
+    prefix = DELETED_ID_PREFIXES.get(journal_file.column)
+    return prefix + deleted_id.upper() if prefix else None
+
+
 def filter_query(column, values, query_type="match_phrase"):
     queries = [{query_type: {column: str(i)}} for i in values]
     return {"query": {"bool": {"should": [queries]}}}
 
 
-def delete_query(response):
-    return {"query": {"ids": {"values": [i["_id"] for i in response["hits"]["hits"]]}}}
+def ids_query(column, values, keyword_field=None):
+    """
+    Query matching every document where column is one of values. A single terms query is used when the values can
+    be matched exactly on keyword_field; otherwise (text fields in indexes created before the field had a keyword)
+    a match_phrase per value is needed.
+    """
+    if keyword_field:
+        return {"query": {"terms": {keyword_field: [str(i) for i in values]}}}
+    return filter_query(column, values)
+
+
+def get_keyword_field(client, index, column):
+    """
+    Return the field (column itself or its keyword sub-field) on which values of column can be exactly matched in
+    every index matching index, or None when there isn't one
+    """
+    try:
+        response = client.indices.get_field_mapping(fields=[column, "{}.keyword".format(column)], index=index)
+    except Exception as e:
+        printf({"msg": "Unable to retrieve the mapping of {}: {}".format(column, str(e)), "f": "ES Delete"})
+        return None
+
+    for field in (column, "{}.keyword".format(column)):
+        field_types = [
+            next(iter(index_mappings["mappings"][field]["mapping"].values()))["type"]
+            if field in index_mappings["mappings"]
+            else None
+            for index_mappings in response.values()
+        ]
+        if field_types and all(field_type not in (None, "text") for field_type in field_types):
+            return field
+    return None
 
 
 def chunks(l, n):
@@ -705,7 +1160,7 @@ def chunks(l, n):
         yield l[i : i + n]
 
 
-def delete_from_es(client, id_list, job_id, config, index=None):
+def delete_from_es(client, id_list, job_id, config, index=None, refresh=True):
     """
     id_list = [{key:'key1',col:'tranaction_id'},
                {key:'key2',col:'generated_unique_transaction_id'}],
@@ -714,6 +1169,9 @@ def delete_from_es(client, id_list, job_id, config, index=None):
     id_list = [{key:'key1',col:'award_id'},
                {key:'key2',col:'generated_unique_award_id'}],
                ...]
+
+    Returns the number of documents deleted. The index is refreshed once all deletes are done unless refresh is False
+    (when it is left to whoever is loading documents into the index).
     """
     start = perf_counter()
 
@@ -721,34 +1179,33 @@ def delete_from_es(client, id_list, job_id, config, index=None):
 
     if index is None:
         index = "{}-*".format(config["root_index"])
-    start_ = client.count(index=index)["count"]
-    printf({"msg": "Starting amount of indices ----- {}".format(start_), "f": "ES Delete", "job": job_id})
     col_to_items_dict = defaultdict(list)
     for l in id_list:
         col_to_items_dict[l["col"]].append(l["key"])
 
+    deleted = 0
     for column, values in col_to_items_dict.items():
         printf({"msg": 'Deleting {} of "{}"'.format(len(values), column), "f": "ES Delete", "job": job_id})
-        values_generator = chunks(values, 1000)
-        for v in values_generator:
+        keyword_field = get_keyword_field(client, index, column)
+        for v in chunks(values, DELETE_CHUNK_SIZE if keyword_field else 1000):
             # IMPORTANT: This delete routine looks at just 1 index at a time. If there are duplicate records across
             # multiple indexes, those duplicates will not be caught by this routine. It is left as is because at the
             # time of this comment, we are migrating to using a single index.
-            body = filter_query(column, v)
-            response = client.search(index=index, body=json.dumps(body), size=config["max_query_size"])
-            delete_body = delete_query(response)
+            body = ids_query(column, v, keyword_field)
             try:
-                client.delete_by_query(
-                    index=index, body=json.dumps(delete_body), refresh=True, size=config["max_query_size"]
+                response = client.delete_by_query(
+                    index=index, body=json.dumps(body), refresh=False, conflicts="proceed", slices="auto"
                 )
+                deleted += response["deleted"]
             except Exception as e:
                 printf({"msg": "[ERROR][ERROR][ERROR]\n{}".format(str(e)), "f": "ES Delete", "job": job_id})
-    end_ = client.count(index=index)["count"]
+
+    if refresh and deleted:
+        client.indices.refresh(index)
 
     t = perf_counter() - start
-    total = str(start_ - end_)
-    printf({"msg": "ES Deletes took {}s. Deleted {} records".format(t, total), "f": "ES Delete", "job": job_id})
-    return
+    printf({"msg": "ES Deletes took {}s. Deleted {} records".format(t, deleted), "f": "ES Delete", "job": job_id})
+    return deleted
 
 
 def get_deleted_award_ids(client, id_list, config, index=None):
@@ -764,13 +1221,14 @@ def get_deleted_award_ids(client, id_list, config, index=None):
         col_to_items_dict[l["col"]].append(l["key"])
     awards = []
     for column, values in col_to_items_dict.items():
-        values_generator = chunks(values, 1000)
-        for v in values_generator:
-            body = filter_query(column, v)
+        keyword_field = get_keyword_field(client, index, column)
+        # Each id matches at most one document so this never asks for more than max_query_size documents
+        for v in chunks(values, min(DELETE_CHUNK_SIZE, config["max_query_size"]) if keyword_field else 1000):
+            body = ids_query(column, v, keyword_field)
+            body["_source"] = ["generated_unique_award_id"]
             response = client.search(index=index, body=json.dumps(body), size=config["max_query_size"])
-            if response["hits"]["total"]["value"] != 0:
-                awards = [x["_source"]["generated_unique_award_id"] for x in response["hits"]["hits"]]
-    return awards
+            awards.extend(x["_source"]["generated_unique_award_id"] for x in response["hits"]["hits"])
+    return list(dict.fromkeys(awards))
 
 
 def check_awards_for_deletes(id_list):
@@ -25,6 +25,14 @@ class Command(BaseCommand):
            b. Upload a CSV to Elasticsearch
                i. Continue to upload a CSV file until all years are uploaded to ES
            c. Delete CSV file
+         Fiscal years are downloaded by --download-workers processes and uploaded by --index-workers processes
+         (each sending --bulk-threads concurrent bulk requests), so several years are processed at once.
+         With --ranges-per-year each fiscal year is split into ranges of ids processed as separate jobs.
+         With --stream no CSV files are written; each year's records are streamed from the database into
+         Elasticsearch by the upload step instead
+    TO RESUME an interrupted reload:
+        Progress of every fiscal year is checkpointed under <DIRECTORY>/checkpoints/<NEW-INDEX-NAME>. Run the same
+        command again with --resume to skip the completed fiscal years and continue loading into the same index
     TO RELOAD ALL data:
         python3 manage.py es_rapidloader --index-name <NEW-INDEX-NAME> --create-new-index all
 
@@ -93,6 +101,42 @@ class Command(BaseCommand):
             help="Processes transactions updated on or after the UTC date/time provided. yyyy-mm-dd hh:mm:ss is always "
             "a safe format. Wrap in quotes if date/time contains spaces.",
         )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Stream records from the database straight into Elasticsearch instead of staging them in CSV files",
+        )
+        parser.add_argument(
+            "--download-workers",
+            type=int,
+            default=1,
+            help="Number of processes downloading (or, with --stream, counting) fiscal years of records",
+        )
+        parser.add_argument(
+            "--index-workers",
+            type=int,
+            default=1,
+            help="Number of processes indexing fiscal years of records into Elasticsearch",
+        )
+        parser.add_argument(
+            "--bulk-threads",
+            type=int,
+            default=1,
+            help="Number of threads each indexing process uses to send bulk requests to Elasticsearch",
+        )
+        parser.add_argument(
+            "--ranges-per-year",
+            type=int,
+            default=1,
+            help="Number of transaction_id/award_id ranges each fiscal year is split into. Each range is downloaded "
+            "and indexed as a separate job, so a large fiscal year is spread across the workers",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted --create-new-index load into the same index, skipping the fiscal years "
+            "(and, with --stream, the chunks) which were already loaded",
+        )
         parser.add_argument(
             "--skip-delete-index",
             action="store_true",
@@ -134,6 +178,12 @@ def process_cli_parameters(options: dict, es_client) -> dict:
         "directory",
         "skip_counts",
         "load_type",
+        "stream",
+        "download_workers",
+        "index_workers",
+        "bulk_threads",
+        "ranges_per_year",
+        "resume",
     )
     config = set_config(simple_args, options)
 
@@ -142,6 +192,8 @@ def process_cli_parameters(options: dict, es_client) -> dict:
 
     if config["create_new_index"] and not config["index_name"]:
         raise SystemExit("Fatal error: --create-new-index requires --index-name.")
+    elif config["resume"] and not config["create_new_index"]:
+        raise SystemExit("Fatal error: --resume requires --create-new-index.")
     elif config["create_new_index"]:
         config["index_name"] = config["index_name"].lower()
         config["starting_date"] = default_datetime
@@ -179,11 +231,17 @@ def process_cli_parameters(options: dict, es_client) -> dict:
             printf({"msg": "Fatal error: write alias '{}' is missing".format(write_alias)})
             raise SystemExit(1)
     else:
-        if es_client.indices.exists(config["index_name"]):
+        if es_client.indices.exists(config["index_name"]) and not config["resume"]:
             printf({"msg": "Fatal error: data load into existing index. Change index name or run an incremental load"})
             raise SystemExit(1)
 
-    if not config["directory"].is_dir():
+    if min(config["download_workers"], config["index_workers"], config["bulk_threads"], config["ranges_per_year"]) < 1:
+        msg = (
+            "Fatal error: --download-workers, --index-workers, --bulk-threads and --ranges-per-year must be at least 1"
+        )
+        printf({"msg": msg})
+        raise SystemExit(1)
+    elif not config["directory"].is_dir():
         printf({"msg": "Fatal error: provided directory does not exist"})
         raise SystemExit(1)
     elif config["starting_date"] < default_datetime:
@@ -1,3 +1,4 @@
+import io
 import logging
 import re
 import signal
@@ -5,7 +6,7 @@ import signal
 from datetime import datetime
 from django.core.management import call_command
 from django.core.management.base import CommandError
-from django.db import transaction
+from django.db import connection, transaction
 from usaspending_api.accounts.models import AppropriationAccountBalances, TreasuryAppropriationAccount
 from usaspending_api.awards.models import Award, FinancialAccountsByAwards
 from usaspending_api.common.helpers.dict_helpers import upper_case_dict_values
@@ -21,6 +22,7 @@ from usaspending_api.etl.management.helpers.load_submission import (
     get_disaster_emergency_fund,
 )
 from usaspending_api.etl.management.load_base import load_data_into_model
+from usaspending_api.etl.transaction_loaders.data_load_helpers import format_value_for_copy
 from usaspending_api.financial_activities.models import FinancialAccountsByProgramActivityObjectClass
 from usaspending_api.references.helpers import retrive_agency_name_from_code
 from usaspending_api.submissions.models import SubmissionAttributes
@@ -30,6 +32,44 @@ from usaspending_api.submissions.models import SubmissionAttributes
 # account data
 TAS_ID_TO_ACCOUNT = {}
 
+# Number of File C rows matched to their awards and inserted at a time
+FILE_C_BATCH_SIZE = 25000
+
+# find_matching_award for every (piid, parent_piid, fain, uri) staged: a PIID (and parent PIID, if given) must match
+# exactly one award, otherwise a FAIN matching exactly one award wins over a URI matching exactly one award
+MATCH_AWARDS_SQL = """
+    with piid_matches as (
+        select      s.load_order, count(*) as matches, min(a.id) as award_id
+        from        temp_file_c_award_keys as s
+                    inner join awards as a on a.piid = s.piid and
+                        (s.parent_piid is null or a.parent_award_piid = s.parent_piid)
+        where       a.latest_transaction_id is not null
+        group by    s.load_order
+    ), fain_matches as (
+        select      s.load_order, count(*) as matches, min(a.id) as award_id
+        from        temp_file_c_award_keys as s
+                    inner join awards as a on a.fain = s.fain
+        where       s.piid is null and a.latest_transaction_id is not null
+        group by    s.load_order
+    ), uri_matches as (
+        select      s.load_order, count(*) as matches, min(a.id) as award_id
+        from        temp_file_c_award_keys as s
+                    inner join awards as a on a.uri = s.uri
+        where       s.piid is null and a.latest_transaction_id is not null
+        group by    s.load_order
+    )
+    select      case
+                    when s.piid is not null then case when p.matches = 1 then p.award_id end
+                    when f.matches = 1 then f.award_id
+                    when u.matches = 1 then u.award_id
+                end
+    from        temp_file_c_award_keys as s
+                left outer join piid_matches as p on p.load_order = s.load_order
+                left outer join fain_matches as f on f.load_order = s.load_order
+                left outer join uri_matches as u on u.load_order = s.load_order
+    order by    s.load_order
+"""
+
 logger = logging.getLogger("script")
 
 
@@ -510,6 +550,45 @@ def find_matching_award(piid=None, parent_piid=None, fain=None, uri=None):
         return None
 
 
+def get_file_c_award_key(row):
+    """Returns the (piid, parent_piid, fain, uri) that a File C row is matched to its award on"""
+    if row.get("piid"):
+        return row["piid"], row.get("parent_award_id") or None, None, None
+    return None, None, row.get("fain") or None, row.get("uri") or None
+
+
+def match_awards(award_keys):
+    """
+    Set based find_matching_award: returns the id of the award matching each (piid, parent_piid, fain, uri), or None
+    """
+    rows = io.StringIO()
+    for load_order, award_key in enumerate(award_keys):
+        rows.write("\t".join(format_value_for_copy(value) for value in (load_order, *award_key)) + "\n")
+    rows.seek(0)
+
+    with connection.cursor() as cursor:
+        cursor.execute("drop table if exists temp_file_c_award_keys")
+        cursor.execute(
+            "create temporary table temp_file_c_award_keys "
+            "(load_order integer, piid text, parent_piid text, fain text, uri text)"
+        )
+        cursor.copy_expert("copy temp_file_c_award_keys from stdin", rows)
+        cursor.execute("analyze temp_file_c_award_keys")
+        cursor.execute(MATCH_AWARDS_SQL)
+        award_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("drop table temp_file_c_award_keys")
+
+    return award_ids
+
+
+def load_file_c_batch(award_keys, award_financial_data):
+    """Links a batch of File C records to their awards and inserts them, returning the ids of the awards linked"""
+    for award_id, award_financial in zip(match_awards(award_keys), award_financial_data):
+        award_financial.award_id = award_id
+    FinancialAccountsByAwards.objects.bulk_create(award_financial_data)
+    return [award_financial.award_id for award_financial in award_financial_data if award_financial.award_id]
+
+
 def load_file_c(submission_attributes, db_cursor, certified_award_financial):
     """
     Process and load file C broker data.
@@ -533,11 +612,11 @@ def load_file_c(submission_attributes, db_cursor, certified_award_financial):
     total_rows = certified_award_financial.count
     start_time = datetime.now()
     awards_touched = []
+    disaster_emergency_funds = {}
+    award_keys = []
+    award_financial_data = []
 
     for index, row in enumerate(certified_award_financial, 1):
-        if not (index % 100):
-            logger.info(f"C File Load: Loading row {index:,} of {total_rows:,} ({datetime.now() - start_time})")
-
         upper_case_dict_values(row)
 
         # Check and see if there is an entry for this TAS
@@ -548,43 +627,34 @@ def load_file_c(submission_attributes, db_cursor, certified_award_financial):
             update_skipped_tas(row, tas_rendering_label, skipped_tas)
             continue
 
-        # Find a matching transaction record, so we can use its subtier agency information to match to (or create) an
-        # Award record.
-
-        # Find the award that this award transaction belongs to. If it doesn't exist, create it.
-        filters = {}
-        if row.get("piid"):
-            filters["piid"] = row.get("piid")
-            filters["parent_piid"] = row.get("parent_award_id")
-        else:
-            if row.get("fain") and not row.get("uri"):
-                filters["fain"] = row.get("fain")
-            elif row.get("uri") and not row.get("fain"):
-                filters["uri"] = row.get("uri")
-            else:
-                filters["fain"] = row.get("fain")
-                filters["uri"] = row.get("uri")
-
-        award = find_matching_award(**filters)
-
-        if award:
-            awards_touched += [award]
-
-        award_financial_data = FinancialAccountsByAwards()
+        disaster_emergency_fund_code = row.get("disaster_emergency_fund_code")
+        if disaster_emergency_fund_code not in disaster_emergency_funds:
+            disaster_emergency_funds[disaster_emergency_fund_code] = get_disaster_emergency_fund(row)
 
         value_map_faba = {
-            "award": award,
+            "award": None,  # linked once the awards of the whole batch are matched
             "submission": submission_attributes,
             "reporting_period_start": submission_attributes.reporting_period_start,
             "reporting_period_end": submission_attributes.reporting_period_end,
             "treasury_account": treasury_account,
             "object_class": row.get("object_class"),
             "program_activity": row.get("program_activity"),
-            "disaster_emergency_fund": get_disaster_emergency_fund(row),
+            "disaster_emergency_fund": disaster_emergency_funds[disaster_emergency_fund_code],
         }
 
         # Still using the cpe|fyb regex compiled above for reverse
-        load_data_into_model(award_financial_data, row, value_map=value_map_faba, save=True, reverse=reverse)
+        award_keys.append(get_file_c_award_key(row))
+        award_financial_data.append(
+            load_data_into_model(FinancialAccountsByAwards(), row, value_map=value_map_faba, reverse=reverse)
+        )
+
+        if len(award_financial_data) == FILE_C_BATCH_SIZE:
+            awards_touched.extend(load_file_c_batch(award_keys, award_financial_data))
+            award_keys, award_financial_data = [], []
+            logger.info(f"C File Load: Loaded row {index:,} of {total_rows:,} ({datetime.now() - start_time})")
+
+    if award_financial_data:
+        awards_touched.extend(load_file_c_batch(award_keys, award_financial_data))
 
     for key in skipped_tas:
         logger.info(f"Skipped {skipped_tas[key]['count']:,} rows due to missing TAS: {key}")
@@ -595,4 +665,4 @@ def load_file_c(submission_attributes, db_cursor, certified_award_financial):
 
     logger.info(f"Skipped a total of {total_tas_skipped:,} TAS rows for File C")
 
-    return [award.id for award in awards_touched if award]
+    return awards_touched
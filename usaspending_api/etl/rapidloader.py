@@ -1,18 +1,28 @@
+import json
+
 from multiprocessing import Process, Queue
 from pathlib import Path
 from time import sleep
 
 from django.conf import settings
+from django.core.management import call_command
 from usaspending_api.broker.helpers.last_load_date import update_last_load_date
 from usaspending_api.etl.es_etl_helpers import (
     DataJob,
+    JobCheckpoint,
+    LoadProgress,
+    checkpoint_directory,
+    clear_checkpoints,
+    configure_id_bounds_sql,
     deleted_transactions,
     deleted_awards,
     download_db_records,
     es_data_loader,
+    execute_sql_statement,
     printf,
     process_guarddog,
     set_final_index_config,
+    split_id_range,
     swap_aliases,
     take_snapshot,
 )
@@ -28,43 +38,65 @@ class Rapidloader:
         download_queue = Queue()  # Queue for jobs which need a csv downloaded
         es_ingest_queue = Queue(20)  # Queue for jobs which have a csv and are ready for ES ingest
 
+        if self.config["create_new_index"] and not self.config["resume"]:
+            clear_checkpoints(self.config)  # left behind by an earlier, interrupted, load into an index of this name
+
         job_number = 0
         for fiscal_year in self.config["fiscal_years"]:
-            job_number += 1
-            index = self.config["index_name"]
-            filename = str(
-                self.config["directory"] / "{fy}_{type}.csv".format(fy=fiscal_year, type=self.config["load_type"])
-            )
+            id_ranges = self.id_ranges(fiscal_year)
+            for part, id_range in enumerate(id_ranges, 1):
+                if self.config["resume"] and JobCheckpoint.load(self.config, fiscal_year, id_range).complete:
+                    msg = "Skipping FY{} ids {}, they were completely loaded before the load was interrupted"
+                    printf({"msg": msg.format(fiscal_year, id_range)})
+                    continue
+                job_number += 1
+                index = self.config["index_name"]
+                filename_template = "{fy}_{type}.csv" if len(id_ranges) == 1 else "{fy}_{type}_{part}.csv"
+                filename = str(
+                    self.config["directory"]
+                    / filename_template.format(fy=fiscal_year, type=self.config["load_type"], part=part)
+                )
 
-            new_job = DataJob(job_number, index, fiscal_year, filename)
+                new_job = DataJob(job_number, index, fiscal_year, filename, id_range=id_range)
 
-            if Path(filename).exists():
-                Path(filename).unlink()
-            download_queue.put(new_job)
+                if Path(filename).exists():
+                    Path(filename).unlink()
+                download_queue.put(new_job)
 
         printf({"msg": "There are {} jobs to process".format(job_number)})
+        progress = LoadProgress(job_number)  # shared by every process below
+
+        if self.config["create_new_index"]:
+            # ensure template for index is present and the latest version
+            call_command("es_configure", "--template-only", "--load_type={}".format(self.config["load_type"]))
 
-        process_list = [
+        download_processes = [
             Process(
-                name="Download Process",
+                name="Download Process {}".format(worker + 1),
                 target=download_db_records,
-                args=(download_queue, es_ingest_queue, self.config),
-            ),
+                args=(download_queue, es_ingest_queue, self.config, progress),
+            )
+            for worker in range(self.config["download_workers"])
+        ]
+        index_processes = [
             Process(
-                name="ES Index Process",
+                name="ES Index Process {}".format(worker + 1),
                 target=es_data_loader,
-                args=(self.elasticsearch_client, download_queue, es_ingest_queue, self.config),
-            ),
+                args=(download_queue, es_ingest_queue, self.config, progress),
+            )
+            for worker in range(self.config["index_workers"])
         ]
+        process_list = download_processes + index_processes
 
-        process_list[0].start()  # Start Download process
+        for process in download_processes:
+            process.start()  # Start Download processes
 
         if self.config["process_deletes"]:
             process_list.append(
                 Process(
                     name="S3 Deleted Records Scrapper Process",
                     target=deleted_transactions if self.config["load_type"] == "transactions" else deleted_awards,
-                    args=(self.elasticsearch_client, self.config),
+                    args=(self.config,),
                 )
             )
             process_list[-1].start()  # start S3 csv fetch proces
@@ -72,16 +104,48 @@ class Rapidloader:
                 printf({"msg": "Waiting to start ES ingest until S3 deletes are complete"})
                 sleep(7)
 
-        process_list[1].start()  # start ES ingest process
+        for process in index_processes:
+            process.start()  # start ES ingest processes
 
+        downloads_complete = False
         while True:
             sleep(10)
             if process_guarddog(process_list):
                 raise SystemExit("Fatal error: review logs to determine why process died.")
+            elif not downloads_complete and all([not x.is_alive() for x in download_processes]):
+                # This "Null Job" is used to notify each ES data load process there are no more jobs; the
+                # queue being bounded keeps Download processes from getting too far ahead of ES indexing
+                for _ in index_processes:
+                    es_ingest_queue.put(DataJob(None, None, None, None))
+                downloads_complete = True
             elif all([not x.is_alive() for x in process_list]):
                 printf({"msg": "All ETL processes completed execution with no error codes"})
                 break
 
+    def id_ranges(self, fiscal_year) -> list:
+        """
+        Split the fiscal year into --ranges-per-year ranges of transaction/award ids which are loaded as separate jobs,
+        so that the largest fiscal years are spread across the workers instead of holding up the whole load
+        """
+        saved_ranges = checkpoint_directory(self.config) / "{}_ranges.json".format(fiscal_year)
+        if self.config["resume"] and saved_ranges.exists():
+            # The checkpoints of the interrupted load are for the ranges it used
+            return [tuple(id_range) for id_range in json.loads(saved_ranges.read_text())]
+        elif self.config["ranges_per_year"] <= 1:
+            return [(None, None)]
+
+        sql_config = {
+            "starting_date": self.config["starting_date"],
+            "fiscal_year": fiscal_year,
+            "load_type": self.config["load_type"],
+        }
+        bounds = execute_sql_statement(configure_id_bounds_sql(sql_config), True, self.config["verbose"])[0]
+        id_ranges = split_id_range(bounds["min_id"], bounds["max_id"], self.config["ranges_per_year"])
+        if self.config["create_new_index"]:
+            saved_ranges.parent.mkdir(parents=True, exist_ok=True)
+            saved_ranges.write_text(json.dumps(id_ranges))
+        return id_ranges
+
     def complete_process(self) -> None:
         if self.config["create_new_index"]:
             set_final_index_config(self.elasticsearch_client, self.config["index_name"])
@@ -91,6 +155,8 @@ class Rapidloader:
                 printf({"msg": "Closing old indices and adding aliases"})
                 swap_aliases(self.elasticsearch_client, self.config["index_name"], self.config["load_type"])
 
+            clear_checkpoints(self.config)
+
         if self.config["snapshot"]:
             printf({"msg": "Taking snapshot"})
             take_snapshot(self.elasticsearch_client, self.config["index_name"], settings.ES_REPOSITORY)
@@ -0,0 +1,41 @@
+import pytest
+
+from model_mommy import mommy
+from usaspending_api.etl.management.commands.load_submission import (
+    find_matching_award,
+    get_file_c_award_key,
+    match_awards,
+)
+
+
+@pytest.mark.django_db
+def test_match_awards_links_the_same_awards_as_find_matching_award():
+    mommy.make("awards.Award", id=1, piid="PIID1", parent_award_piid="PARENT1", latest_transaction_id=1)
+    mommy.make("awards.Award", id=2, piid="PIID1", parent_award_piid="PARENT2", latest_transaction_id=2)
+    mommy.make("awards.Award", id=3, piid="PIID2", latest_transaction_id=3)
+    mommy.make("awards.Award", id=4, piid="PIID3", latest_transaction_id=None)
+    mommy.make("awards.Award", id=5, fain="FAIN1", uri="URI1", latest_transaction_id=5)
+    mommy.make("awards.Award", id=6, fain="FAIN2", uri="URI2", latest_transaction_id=6)
+    mommy.make("awards.Award", id=7, fain="FAIN2", uri="URI3", latest_transaction_id=7)
+
+    rows = [
+        {"piid": "PIID1", "parent_award_id": "PARENT1"},
+        {"piid": "PIID1", "parent_award_id": None},
+        {"piid": "PIID1", "parent_award_id": "PARENT3"},
+        {"piid": "PIID2", "parent_award_id": ""},
+        {"piid": "PIID3"},
+        {"piid": "", "fain": "FAIN1"},
+        {"piid": None, "fain": "FAIN1", "uri": "URI1"},
+        {"fain": "FAIN2", "uri": "URI2"},
+        {"fain": "FAIN2"},
+        {"uri": "URI3"},
+        {"piid": "PIID2", "fain": "FAIN1", "uri": "URI1"},
+        {"fain": "FAIN3", "uri": "URI2"},
+        {},
+    ]
+    award_keys = [get_file_c_award_key(row) for row in rows]
+
+    row_by_row = [getattr(find_matching_award(*award_key), "id", None) for award_key in award_keys]
+
+    assert row_by_row == [1, None, None, 3, None, 5, 5, 6, None, 7, 3, 6, None]
+    assert match_awards(award_keys) == row_by_row
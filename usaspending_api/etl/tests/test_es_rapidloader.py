@@ -1,13 +1,35 @@
+import csv
+import json
+import pandas as pd
 import pytest
 
 from collections import OrderedDict
 from datetime import datetime, timezone
+from django.db import connection
 from model_mommy import mommy
 from pathlib import Path
+from unittest.mock import Mock
 from usaspending_api.common.elasticsearch.client import instantiate_elasticsearch_client
 from usaspending_api.common.helpers.sql_helpers import execute_sql_to_ordered_dictionary
 from usaspending_api.common.helpers.text_helpers import generate_random_string
-from usaspending_api.etl.es_etl_helpers import configure_sql_strings, check_awards_for_deletes, get_deleted_award_ids
+from usaspending_api.etl.es_etl_helpers import (
+    VIEW_COLUMNS,
+    DataJob,
+    JobCheckpoint,
+    check_awards_for_deletes,
+    clear_checkpoints,
+    configure_sql_strings,
+    configure_stream_sql,
+    csv_chunk_gen,
+    db_chunk_gen,
+    db_rows_to_df,
+    delete_from_es,
+    delete_job_from_es,
+    get_deleted_award_ids,
+    get_keyword_field,
+    split_id_range,
+    transform_documents,
+)
 from usaspending_api.etl.rapidloader import Rapidloader
 
 
@@ -117,6 +139,12 @@ config = {
     "starting_date": datetime(2007, 10, 1, 0, 0, tzinfo=timezone.utc),
     "max_query_size": 10000,
     "is_incremental_load": False,
+    "stream": False,
+    "download_workers": 1,
+    "index_workers": 1,
+    "bulk_threads": 1,
+    "ranges_per_year": 1,
+    "resume": False,
 }
 
 
@@ -127,6 +155,7 @@ def test_es_award_loader_class(award_data_fixture, elasticsearch_award_index, ba
     loader.run_load_steps()
     assert elasticsearch_client.indices.exists(config["index_name"])
     elasticsearch_client.indices.delete(index=config["index_name"], ignore_unavailable=False)
+    clear_checkpoints(config)
 
 
 def test_es_transaction_loader_class(award_data_fixture, elasticsearch_transaction_index, baby_sleeps):
@@ -138,6 +167,203 @@ def test_es_transaction_loader_class(award_data_fixture, elasticsearch_transacti
     loader.run_load_steps()
     assert elasticsearch_client.indices.exists(config["index_name"])
     elasticsearch_client.indices.delete(index=config["index_name"], ignore_unavailable=False)
+    clear_checkpoints(config)
+
+
+def test_es_transaction_loader_class_streaming(award_data_fixture, elasticsearch_transaction_index, baby_sleeps):
+    stream_config = dict(
+        config,
+        root_index="transaction-query",
+        load_type="transactions",
+        stream=True,
+        download_workers=2,
+        index_workers=3,
+        bulk_threads=2,
+        ranges_per_year=3,
+    )
+    elasticsearch_client = instantiate_elasticsearch_client()
+    loader = Rapidloader(stream_config, elasticsearch_client)
+    loader.run_load_steps()
+    assert elasticsearch_client.indices.exists(stream_config["index_name"])
+    assert not list(stream_config["directory"].glob("*_transactions.csv"))
+    elasticsearch_client.indices.delete(index=stream_config["index_name"], ignore_unavailable=False)
+    clear_checkpoints(stream_config)
+
+
+def test_configure_stream_sql():
+    stream_config = dict(config, fiscal_year=2019, load_type="transactions")
+    stream_sql = configure_stream_sql(stream_config)
+    assert stream_sql.startswith('\nSELECT "transaction_id"::text AS "transaction_id", ')
+    assert stream_sql.endswith(
+        """
+FROM transaction_delta_view
+WHERE transaction_fiscal_year=2019 AND update_date >= '2007-10-01'
+ORDER BY transaction_delta_view.transaction_id
+"""
+    )
+
+
+def test_configure_stream_sql_after_id():
+    stream_config = dict(config, fiscal_year=2019, load_type="awards", after_id="1234")
+    stream_sql = configure_stream_sql(stream_config)
+    assert stream_sql.endswith(
+        """
+FROM award_delta_view
+WHERE fiscal_year=2019 AND update_date >= '2007-10-01' AND award_id > 1234
+ORDER BY award_delta_view.award_id
+"""
+    )
+
+
+@pytest.fixture
+def stream_view(transactional_db, settings):
+    """
+    A stand in for the transaction delta view holding transactions 1 to 12 in fiscal year 2019. It is committed so it
+    can be read through the separate connection db_chunk_gen streams from.
+    """
+    values = {
+        "transaction_id": "id",
+        "generated_unique_transaction_id": "'CONT_TX_' || id",
+        "update_date": "'2019-10-01'::date",
+    }
+    columns = ", ".join('{} AS "{}"'.format(values.get(column, "NULL::text"), column) for column in VIEW_COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE VIEW test_stream_view AS SELECT {}, 2019 AS transaction_fiscal_year "
+            "FROM generate_series(1, 12) AS id".format(columns)
+        )
+    settings.ES_TRANSACTIONS_ETL_VIEW_NAME = "test_stream_view"
+    yield
+    with connection.cursor() as cursor:
+        cursor.execute("DROP VIEW test_stream_view")
+
+
+def test_resumed_stream_loads_every_record(stream_view, tmp_path):
+    stream_config = dict(config, fiscal_year=2019, load_type="transactions", directory=tmp_path)
+    checkpoint = JobCheckpoint.load(stream_config, 2019)
+    loaded_ids = []
+
+    # Interrupt the load after two chunks, once "11" and "12" would have been loaded were ids sorted as text
+    chunks = db_chunk_gen(configure_stream_sql(stream_config), 2, "interrupted", "transactions")
+    for chunk, _ in zip(chunks, range(2)):
+        loaded_ids.extend(json.loads(document.split("\n")[1])["transaction_id"] for document in chunk.documents)
+        checkpoint.chunk_completed(len(chunk), chunk.last_id)
+    chunks.close()
+
+    checkpoint = JobCheckpoint.load(stream_config, 2019)
+    assert checkpoint.last_id == "4"
+    resumed_sql = configure_stream_sql(dict(stream_config, after_id=checkpoint.last_id))
+    for chunk in db_chunk_gen(resumed_sql, 2, "resumed", "transactions"):
+        loaded_ids.extend(json.loads(document.split("\n")[1])["transaction_id"] for document in chunk.documents)
+
+    assert loaded_ids == [str(transaction_id) for transaction_id in range(1, 13)]
+
+
+def test_delete_job_from_es_after_id():
+    client = Mock()
+    client.delete_by_query.return_value = {"deleted": 3}
+    job = DataJob("1", "test-index", 2019, None, id_range=(100, 200))
+    transaction_config = dict(config, load_type="transactions")
+
+    delete_job_from_es(client, job, transaction_config)
+    delete_job_from_es(client, job, transaction_config, after_id="150")
+    delete_job_from_es(client, DataJob("2", "test-index", 2019, None), transaction_config, after_id="150")
+
+    assert [
+        json.loads(call[1]["body"])["query"]["bool"]["filter"] for call in client.delete_by_query.call_args_list
+    ] == [
+        [{"term": {"transaction_fiscal_year": 2019}}, {"range": {"transaction_id": {"gte": 100, "lt": 200}}}],
+        [{"term": {"transaction_fiscal_year": 2019}}, {"range": {"transaction_id": {"gte": 151, "lt": 200}}}],
+        [{"term": {"transaction_fiscal_year": 2019}}, {"range": {"transaction_id": {"gte": 151}}}],
+    ]
+
+
+def test_job_checkpoint(tmp_path):
+    checkpoint_config = dict(config, directory=tmp_path, index_name="test-checkpoint-transactions")
+    checkpoint = JobCheckpoint.load(checkpoint_config, 2019)
+    assert not checkpoint.started and not checkpoint.complete
+
+    checkpoint.chunk_completed(100, "123")
+    checkpoint.chunk_completed(50, "456")
+    checkpoint = JobCheckpoint.load(checkpoint_config, 2019)
+    assert (checkpoint.chunks_completed, checkpoint.documents, checkpoint.last_id) == (2, 150, "456")
+    assert checkpoint.started and not checkpoint.complete
+
+    checkpoint.mark_complete()
+    assert JobCheckpoint.load(checkpoint_config, 2019).complete
+    assert not JobCheckpoint.load(checkpoint_config, 2020).started
+
+    clear_checkpoints(checkpoint_config)
+    assert not JobCheckpoint.load(checkpoint_config, 2019).complete
+
+
+def test_transform_documents():
+    df = pd.DataFrame(
+        {
+            "transaction_id": ["1", "2"],
+            "generated_unique_transaction_id": ["CONT_TX_1", "CONT_TX_2"],
+            "piid": [None, "P/2"],
+            "recipient_agg_key": ["abc-123", None],
+            "tas_paths": ["{agency=097,tas=1}", "{}"],
+            "federal_accounts": ['[{"id": 1, "account_title": null}]', None],
+            "business_categories": [None, "{a,b}"],
+        }
+    )
+    chunk = transform_documents(df.copy(), "transactions")
+    assert len(chunk) == 2
+    assert chunk.unique_ids == ["CONT_TX_1", "CONT_TX_2"]
+    assert chunk.last_id == "2"
+    assert [json.loads(line) for line in chunk.documents[0].split("\n")] == [
+        {"index": {"routing": "abc-123"}},
+        {
+            "transaction_id": "1",
+            "generated_unique_transaction_id": "CONT_TX_1",
+            "piid": None,
+            "recipient_agg_key": "abc-123",
+            "tas_paths": ["agency=097", "tas=1"],
+            "federal_accounts": ['{"account_title": "", "id": "1"}'],
+            "business_categories": None,
+        },
+    ]
+    assert [json.loads(line) for line in chunk.documents[1].split("\n")] == [
+        {"index": {"routing": None}},
+        {
+            "transaction_id": "2",
+            "generated_unique_transaction_id": "CONT_TX_2",
+            "piid": "P/2",
+            "recipient_agg_key": None,
+            "tas_paths": None,
+            "federal_accounts": None,
+            "business_categories": ["a", "b"],
+        },
+    ]
+
+    award_df = pd.DataFrame({"award_id": [5], "generated_unique_award_id": ["CONT_AWD_5"], "total_obligation": [1.5]})
+    award_chunk = transform_documents(award_df, "awards")
+    assert award_chunk.documents == [
+        '{"index":{}}\n{"award_id":5,"generated_unique_award_id":"CONT_AWD_5","total_obligation":1.5}'
+    ]
+    assert award_chunk.last_id == "5"
+
+
+def test_streamed_documents_match_csv_documents(tmp_path):
+    columns = ["award_id", "generated_unique_award_id", "total_obligation", "fiscal_year", "tas_paths", "piid"]
+    # Every value as configure_stream_sql selects it: cast to text
+    rows = [
+        ("5", "CONT_AWD_5", "1.50", "2019", "{agency=097}", ""),
+        ("6", "CONT_AWD_6", None, "2020", None, "P6"),
+    ]
+    csv_file = tmp_path / "awards.csv"
+    with open(str(csv_file), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+    csv_chunk = next(csv_chunk_gen(str(csv_file), 10, "csv", "awards"))
+    db_chunk = transform_documents(db_rows_to_df(rows, columns), "awards")
+    assert db_chunk.documents == csv_chunk.documents
+    assert db_chunk.last_id == csv_chunk.last_id
+    assert json.loads(db_chunk.documents[0].split("\n")[1])["total_obligation"] == 1.5
 
 
 def test_configure_sql_strings():
@@ -160,6 +386,27 @@ WHERE fiscal_year=2019 AND update_date >= '2007-10-01'
     assert count == count_sql
 
 
+def test_configure_sql_strings_id_range():
+    range_config = dict(config, fiscal_year=2019, load_type="transactions", id_range=(100, 200))
+    copy, _, count = configure_sql_strings(range_config, "filename", [])
+    where = "WHERE transaction_fiscal_year=2019 AND update_date >= '2007-10-01' AND transaction_id >= 100 AND "
+    assert where + "transaction_id < 200\n) TO STDOUT" in copy
+    assert count.endswith(where + "transaction_id < 200\n")
+
+    range_config["id_range"] = (None, 100)
+    assert configure_sql_strings(range_config, "filename", [])[2].endswith(
+        "update_date >= '2007-10-01' AND transaction_id < 100\n"
+    )
+    assert "AND transaction_id >= 200\nORDER BY" in configure_stream_sql(dict(range_config, id_range=(200, None)))
+
+
+def test_split_id_range():
+    assert split_id_range(None, None, 4) == [(None, None)]
+    assert split_id_range(1, 100, 1) == [(None, None)]
+    assert split_id_range(1, 100, 4) == [(None, 26), (26, 51), (51, 76), (76, None)]
+    assert split_id_range(1, 2, 4) == [(None, 2), (2, None)]
+
+
 # SQL method is being mocked here since the `execute_sql_statement` used doesn't use the same DB connection to avoid multiprocessing errors
 def mock_execute_sql(sql, results):
     return execute_sql_to_ordered_dictionary(sql)
@@ -184,3 +431,35 @@ def test_get_award_ids(award_data_fixture, elasticsearch_transaction_index):
     client = elasticsearch_transaction_index.client
     ids = get_deleted_award_ids(client, id_list, config, index=elasticsearch_transaction_index.index_name)
     assert ids == ["CONT_AWD_IND12PB00323"]
+
+
+def test_get_award_ids_across_chunks(award_data_fixture, elasticsearch_transaction_index, monkeypatch):
+    monkeypatch.setattr("usaspending_api.etl.es_etl_helpers.DELETE_CHUNK_SIZE", 1)
+    elasticsearch_transaction_index.update_index()
+    id_list = [{"key": 1, "col": "transaction_id"}, {"key": 2, "col": "transaction_id"}]
+    client = elasticsearch_transaction_index.client
+    ids = get_deleted_award_ids(client, id_list, config, index=elasticsearch_transaction_index.index_name)
+    assert sorted(ids) == ["ASST_NON_P063P100612", "CONT_AWD_IND12PB00323"]
+
+
+def test_get_keyword_field(elasticsearch_transaction_index):
+    elasticsearch_transaction_index.update_index()
+    client = elasticsearch_transaction_index.client
+    index = elasticsearch_transaction_index.index_name
+    assert get_keyword_field(client, index, "transaction_id") == "transaction_id"
+    assert get_keyword_field(client, index, "generated_unique_award_id") == "generated_unique_award_id"
+    assert (
+        get_keyword_field(client, index, "generated_unique_transaction_id") == "generated_unique_transaction_id.keyword"
+    )
+    assert get_keyword_field(client, index, "detached_award_proc_unique") is None
+
+
+def test_delete_from_es(award_data_fixture, elasticsearch_transaction_index):
+    elasticsearch_transaction_index.update_index()
+    client = elasticsearch_transaction_index.client
+    index = elasticsearch_transaction_index.index_name
+    id_list = [{"key": 1, "col": "transaction_id"}, {"key": 3, "col": "transaction_id"}]
+
+    assert delete_from_es(client, id_list, None, config, index) == 1
+    assert client.count(index=index)["count"] == 1
+    assert delete_from_es(client, id_list, None, config, index) == 0
@@ -1,14 +1,21 @@
 from datetime import datetime
+import io
 import os
 import re
-import boto3
 import csv
 import logging
 
 from django.conf import settings
 
+from usaspending_api.transactions.transaction_delete_journal_helpers import DeleteJournal, latest_deletions
+
 logger = logging.getLogger("console")
 
+# columns only written when a row is created, never when it is updated
+INSERT_ONLY_COLUMNS = ["create_date", "created_at"]
+
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
 
 def capitalize_if_string(val):
     try:
@@ -39,6 +46,52 @@ def format_value_for_sql(val, cur):
     return str(cur.mogrify("%s", (val,)), "utf-8")
 
 
+def format_value_for_copy(val):
+    """formats a value as a field of a postgres COPY in text format"""
+    if val is None:
+        return "\\N"
+    if isinstance(val, bool):
+        val = "t" if val else "f"
+    elif isinstance(val, (list, tuple)):
+        elements = [
+            "NULL" if element is None else '"{}"'.format(str(element).replace("\\", "\\\\").replace('"', '\\"'))
+            for element in val
+        ]
+        val = "{{{}}}".format(",".join(elements))
+    return str(val).translate(COPY_ESCAPES)
+
+
+def format_column_list(columns):
+    """formats column names as a comma separated list of quoted identifiers"""
+    return ",".join(f'"{column}"' for column in columns)
+
+
+def format_update_list(columns, source, excluded_columns=()):
+    """formats the assignments of an update setting each column, other than excluded_columns, to source's value"""
+    return ",".join(f'"{column}" = {source}."{column}"' for column in columns if column not in excluded_columns)
+
+
+def copy_to_staging_table(cursor, rows, columns, staging_table, destination_table, staging_columns):
+    """
+    Creates a temporary table with staging_columns typed like the same columns of destination_table, plus a load_order
+    column, and copies rows (lists of values for columns) into it in order
+    """
+    cursor.execute(f'drop table if exists "{staging_table}"')
+    cursor.execute(
+        f'create temporary table "{staging_table}" as '
+        f'select {format_column_list(staging_columns)} from "{destination_table}" limit 0'
+    )
+    cursor.execute(f'alter table "{staging_table}" add column load_order integer')
+
+    copy_rows = io.StringIO()
+    for load_order, values in enumerate(rows):
+        copy_rows.write("\t".join(format_value_for_copy(value) for value in [*values, load_order]) + "\n")
+    copy_rows.seek(0)
+    cursor.copy_expert(f'copy "{staging_table}" ({format_column_list(columns + ["load_order"])}) from stdin', copy_rows)
+    # temporary tables are never analyzed by autovacuum
+    cursor.execute(f'analyze "{staging_table}"')
+
+
 def format_bulk_insert_list_column_sql(cursor, load_objects, type):
     """creates formatted sql text to put into a bulk insert statement"""
     keys = load_objects[0][type].keys()
@@ -61,7 +114,7 @@ def format_insert_or_update_column_sql(cursor, load_object, type):
         columns.append('"{}"'.format(key))
         val = format_value_for_sql(load_object[type][key], cursor)
         values.append(val)
-        if key not in ["create_date", "created_at"]:
+        if key not in INSERT_ONLY_COLUMNS:
             update_pairs.append(" {}={}".format(key, val))
 
     col_string = "({})".format(",".join(map(str, columns)))
@@ -98,30 +151,14 @@ def get_deleted_fpds_data_from_s3(date):
                 "Missing required environment variables: USASPENDING_AWS_REGION, DELETED_TRANSACTION_JOURNAL_FILES"
             )
 
-        s3client = boto3.client("s3", region_name=aws_region)
-        s3resource = boto3.resource("s3", region_name=aws_region)
-        s3_bucket = s3resource.Bucket(DELETED_TRANSACTION_JOURNAL_FILES)
-
-        # make an array of all the keys in the bucket
-        file_list = [item.key for item in s3_bucket.objects.all()]
-
-        # Only use files that match the date we're currently checking
-        for item in file_list:
-            # if the date on the file is the same day as we're checking
-            if (
-                re.search(regex_str, item)
-                and "/" not in item
-                and datetime.strptime(item[: item.find("_")], "%m-%d-%Y").date() >= date
-            ):
-                s3_item = s3client.get_object(Bucket=DELETED_TRANSACTION_JOURNAL_FILES, Key=item)
-                reader = csv.reader(s3_item["Body"].read().decode("utf-8").splitlines())
-
-                # skip the header, the reader doesn't ignore it for some reason
-                next(reader)
-                # make an array of all the detached_award_procurement_ids
-                unique_key_list = [rows[0] for rows in reader]
-
-                ids_to_delete += unique_key_list
+        # Only use files from the date we're checking onwards
+        journal_files = DeleteJournal(DELETED_TRANSACTION_JOURNAL_FILES).files(
+            lambda obj: re.search(regex_str, obj.key)
+            and "/" not in obj.key
+            and datetime.strptime(obj.key[: obj.key.find("_")], "%m-%d-%Y").date() >= date
+        )
+        # make an array of all the detached_award_procurement_ids
+        ids_to_delete += list(latest_deletions(journal_files))
 
     logger.info("Number of records to delete: %s" % str(len(ids_to_delete)))
     return ids_to_delete
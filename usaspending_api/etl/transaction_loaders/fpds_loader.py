@@ -1,7 +1,7 @@
 import logging
 from psycopg2.extras import DictCursor
 from psycopg2 import Error
-from django.db import connection
+from django.db import connection, transaction
 
 from usaspending_api.etl.transaction_loaders.field_mappings_fpds import (
     transaction_fpds_nonboolean_columns,
@@ -13,7 +13,14 @@ from usaspending_api.etl.transaction_loaders.field_mappings_fpds import (
     transaction_fpds_functions,
     all_broker_columns,
 )
-from usaspending_api.etl.transaction_loaders.data_load_helpers import capitalize_if_string, false_if_null
+from usaspending_api.etl.transaction_loaders.data_load_helpers import (
+    capitalize_if_string,
+    copy_to_staging_table,
+    false_if_null,
+    format_column_list,
+    format_update_list,
+    INSERT_ONLY_COLUMNS,
+)
 from usaspending_api.etl.transaction_loaders.generic_loaders import (
     update_transaction_fpds,
     update_transaction_normalized,
@@ -28,6 +35,13 @@ logger = logging.getLogger("console")
 
 failed_ids = []
 
+# load object type -> (destination table, staging table, staging columns resolved during the load)
+STAGING_TABLES = {
+    "award": ("awards", "temp_fpds_load_award", []),
+    "transaction_normalized": ("transaction_normalized", "temp_fpds_load_transaction_normalized", ["id", "award_id"]),
+    "transaction_fpds": ("transaction_fpds", "temp_fpds_load_transaction_fpds", ["transaction_id"]),
+}
+
 
 def delete_stale_fpds(detached_award_procurement_ids):
     """
@@ -154,6 +168,111 @@ def _transform_objects(broker_objects):
 
 def _load_transactions(load_objects):
     """returns ids for each award touched"""
+    if not load_objects:
+        return []
+    try:
+        return _bulk_load_transactions(load_objects)
+    except Error as e:
+        logger.warning(f"Batch failed to load as a set, loading its records one at a time.\nDetails: {e.pgerror}")
+        return _load_transactions_by_row(load_objects)
+
+
+def _bulk_load_transactions(load_objects):
+    """
+    Loads the whole batch with a handful of set based statements against staging tables copied from the load objects,
+    producing the same rows as loading them one at a time in order. returns ids for each award touched
+    """
+    with transaction.atomic():
+        connection.ensure_connection()
+        with connection.connection.cursor() as cursor:
+            columns = {load_type: list(load_objects[0][load_type]) for load_type in STAGING_TABLES}
+            for load_type in STAGING_TABLES:
+                _stage_load_objects(cursor, load_objects, load_type, columns[load_type])
+
+            # AWARD GET OR CREATE: the first transaction (in load order) of a new award creates it
+            award_columns = format_column_list(columns["award"])
+            cursor.execute(
+                f"insert into awards ({award_columns}) "
+                f"select {award_columns} from ("
+                "  select distinct on (generated_unique_award_id) * from temp_fpds_load_award s "
+                "  where not exists ("
+                "    select from awards a where a.generated_unique_award_id = s.generated_unique_award_id"
+                "  ) "
+                "  order by generated_unique_award_id, load_order"
+                ") new_awards order by load_order"
+            )
+            cursor.execute(
+                "update temp_fpds_load_transaction_normalized s set award_id = a.id from ("
+                "  select generated_unique_award_id, min(id) as id from awards "
+                "  where generated_unique_award_id in (select unique_award_key from temp_fpds_load_transaction_normalized) "
+                "  group by generated_unique_award_id"
+                ") a where a.generated_unique_award_id = s.unique_award_key"
+            )
+            cursor.execute("select distinct award_id from temp_fpds_load_transaction_normalized")
+            ids_of_awards_created_or_updated = [row[0] for row in cursor.fetchall()]
+
+            # TRANSACTION UPSERT: a transaction repeated in the batch ends up with the values of its last occurrence
+            cursor.execute(
+                "update temp_fpds_load_transaction_fpds s set transaction_id = f.transaction_id "
+                "from transaction_fpds f where f.detached_award_proc_unique = s.detached_award_proc_unique"
+            )
+            cursor.execute(
+                "delete from temp_fpds_load_transaction_fpds s using temp_fpds_load_transaction_fpds later "
+                "where later.detached_award_proc_unique = s.detached_award_proc_unique and later.load_order > s.load_order"
+            )
+            cursor.execute(
+                "update temp_fpds_load_transaction_fpds s set transaction_id = new_ids.id from ("
+                "  select load_order, nextval(pg_get_serial_sequence('transaction_normalized', 'id')) as id "
+                "  from temp_fpds_load_transaction_fpds where transaction_id is null order by load_order"
+                ") new_ids where new_ids.load_order = s.load_order"
+            )
+            cursor.execute(
+                "update temp_fpds_load_transaction_normalized s set id = f.transaction_id "
+                "from temp_fpds_load_transaction_fpds f where f.load_order = s.load_order"
+            )
+            cursor.execute("delete from temp_fpds_load_transaction_normalized where id is null")
+
+            normalized_columns = format_column_list(columns["transaction_normalized"] + ["award_id"])
+            normalized_updates = format_update_list(
+                columns["transaction_normalized"] + ["award_id"], "s", INSERT_ONLY_COLUMNS
+            )
+            cursor.execute(
+                f"update transaction_normalized t set {normalized_updates} "
+                f"from temp_fpds_load_transaction_normalized s where t.id = s.id"
+            )
+            cursor.execute(
+                f"insert into transaction_normalized (id, {normalized_columns}) "
+                f"select id, {normalized_columns} from temp_fpds_load_transaction_normalized s "
+                f"where not exists (select from transaction_normalized t where t.id = s.id) order by load_order"
+            )
+
+            fpds_columns = format_column_list(columns["transaction_fpds"] + ["transaction_id"])
+            cursor.execute(
+                f"insert into transaction_fpds ({fpds_columns}) "
+                f"select {fpds_columns} from temp_fpds_load_transaction_fpds order by load_order "
+                f"on conflict (detached_award_proc_unique) do update set "
+                f"{format_update_list(columns['transaction_fpds'], 'excluded', INSERT_ONLY_COLUMNS)}"
+            )
+            logger.debug(f"loaded {cursor.rowcount:,} fpds transactions")
+
+            for _, staging_table, _ in STAGING_TABLES.values():
+                cursor.execute(f'drop table "{staging_table}"')
+
+    return ids_of_awards_created_or_updated
+
+
+def _stage_load_objects(cursor, load_objects, load_type, columns):
+    """Copies one type of the load objects into a temporary table typed like its destination table"""
+    destination_table, staging_table, staging_columns = STAGING_TABLES[load_type]
+    rows = ([load_object[load_type][column] for column in columns] for load_object in load_objects)
+    copy_to_staging_table(cursor, rows, columns, staging_table, destination_table, columns + staging_columns)
+
+
+def _load_transactions_by_row(load_objects):
+    """
+    Loads each transaction with its own award and transaction lookups, so that a record which cannot be loaded is
+    reported in failed_ids without failing the rest of its batch. returns ids for each award touched
+    """
     ids_of_awards_created_or_updated = set()
     connection.ensure_connection()
     with connection.connection.cursor(cursor_factory=DictCursor) as cursor:
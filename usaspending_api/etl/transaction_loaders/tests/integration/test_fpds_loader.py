@@ -6,6 +6,14 @@ from django.core.management import call_command
 from model_mommy import mommy
 
 from usaspending_api.awards.models import Award, TransactionFPDS
+from usaspending_api.etl.transaction_loaders.fpds_loader import (
+    _bulk_load_transactions,
+    _extract_broker_objects,
+    _load_transactions_by_row,
+    _transform_objects,
+)
+from usaspending_api.etl.transaction_loaders.tests.transaction_load_test_helpers import load_and_roll_back
+from usaspending_api.transactions.models import SourceProcurementTransaction
 from usaspending_api.etl.transaction_loaders.field_mappings_fpds import (
     transaction_fpds_nonboolean_columns,
     transaction_normalized_nonboolean_columns,
@@ -114,3 +122,32 @@ def test_load_source_procurement_by_ids():
     assert transactions_by_id[101].fiscal_year == 2010
     assert transactions_by_id[201].fiscal_year == 2010
     assert transactions_by_id[301].fiscal_year == 2011
+
+
+def _load_with(loader):
+    """Loads one transaction, then a batch that updates it and adds others to a new and an existing award"""
+
+    def load():
+        loader(_transform_objects(_extract_broker_objects([101])))
+        SourceProcurementTransaction.objects.filter(detached_award_procurement_id=101).update(piid="updated")
+        return loader(_transform_objects(_extract_broker_objects([101, 201, 301, 401])))
+
+    return load_and_roll_back(load, TransactionFPDS)
+
+
+@pytest.mark.django_db
+def test_load_as_set_matches_load_by_row():
+    _assemble_source_procurement_records([101, 201, 301, 401])
+    SourceProcurementTransaction.objects.filter(detached_award_procurement_id=301).update(
+        unique_award_key="existing_award"
+    )
+    mommy.make("awards.Award", generated_unique_award_id="EXISTING_AWARD", transaction_unique_id="EXISTING")
+
+    rows_by_row, award_keys_by_row = _load_with(_load_transactions_by_row)
+    rows_as_set, award_keys_as_set = _load_with(_bulk_load_transactions)
+
+    assert award_keys_as_set == award_keys_by_row == ["EXISTING_AWARD", "UNIQUE_AWARD_KEY"]
+    assert len(rows_as_set[0]) == 2
+    assert len(rows_as_set[2]) == 4
+    assert "UPDATED" in [row["piid"] for row in rows_as_set[2]]
+    assert rows_as_set == rows_by_row
@@ -1,4 +1,13 @@
-from usaspending_api.etl.transaction_loaders.data_load_helpers import capitalize_if_string, false_if_null
+from datetime import date
+from decimal import Decimal
+
+from usaspending_api.etl.transaction_loaders.data_load_helpers import (
+    capitalize_if_string,
+    false_if_null,
+    format_column_list,
+    format_update_list,
+    format_value_for_copy,
+)
 
 
 def test_capitalize_if_string():
@@ -14,3 +23,20 @@ def test_false_if_null():
     assert false_if_null(True)
     assert not false_if_null(False)
     assert not false_if_null(None)
+
+
+def test_format_value_for_copy():
+    assert format_value_for_copy(None) == "\\N"
+    assert format_value_for_copy(True) == "t"
+    assert format_value_for_copy("False") == "False"
+    assert format_value_for_copy(Decimal("10.50")) == "10.50"
+    assert format_value_for_copy(date(2010, 1, 1)) == "2010-01-01"
+    assert format_value_for_copy("A\\B\tC\nD\rE") == "A\\\\B\\tC\\nD\\rE"
+    assert format_value_for_copy(["small_business", 'say "hi"', None]) == '{"small_business","say \\\\"hi\\\\"",NULL}'
+    assert format_value_for_copy([]) == "{}"
+
+
+def test_format_column_and_update_lists():
+    assert format_column_list(["piid", "create_date"]) == '"piid","create_date"'
+    assert format_update_list(["piid", "create_date"], "s") == '"piid" = s."piid","create_date" = s."create_date"'
+    assert format_update_list(["piid", "create_date"], "excluded", ["create_date"]) == '"piid" = excluded."piid"'
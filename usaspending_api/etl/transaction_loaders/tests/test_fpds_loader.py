@@ -4,7 +4,7 @@ import datetime
 from usaspending_api.etl.transaction_loaders.fpds_loader import (
     _create_load_object,
     _transform_objects,
-    _load_transactions,
+    _load_transactions_by_row,
 )
 from usaspending_api.etl.transaction_loaders.field_mappings_fpds import (
     transaction_fpds_nonboolean_columns,
@@ -13,6 +13,7 @@ from usaspending_api.etl.transaction_loaders.field_mappings_fpds import (
 )
 from usaspending_api.etl.transaction_loaders.data_load_helpers import format_insert_or_update_column_sql
 
+from psycopg2 import Error
 from unittest.mock import MagicMock, patch
 
 
@@ -88,6 +89,7 @@ def test_load_ids_empty():
 
 
 # These are patched in opposite order from when they're listed in the function params, because that's how the fixture works
+@patch("usaspending_api.etl.transaction_loaders.fpds_loader._bulk_load_transactions", side_effect=Error)
 @patch("usaspending_api.etl.transaction_loaders.fpds_loader.connection")
 @patch("usaspending_api.etl.transaction_loaders.derived_field_functions_fpds._fetch_subtier_agency_id", return_value=1)
 @patch("usaspending_api.etl.transaction_loaders.fpds_loader._extract_broker_objects")
@@ -113,10 +115,12 @@ def test_load_ids_dummy_id(
     mock__extract_broker_objects,
     mock___fetch_subtier_agency_id,
     mock_connection,
+    mock__bulk_load_transactions,
 ):
     """
     End-to-end unit test (which should not attempt database connections) to exercise the code-under-test
-    independently, given fake broker IDs to load
+    independently, given fake broker IDs to load. The set based load is made to fail so that the batch falls back
+    to being loaded one record at a time
     """
     ###################
     # BEGIN SETUP MOCKS
@@ -249,4 +253,4 @@ def test_load_transactions(mock__fetch_subtier_agency_id, mock_connection):
     mega_key_list.update(mega_boolean_key_list)
 
     load_objects = _transform_objects([mega_key_list])
-    _load_transactions(load_objects)
+    _load_transactions_by_row(load_objects)
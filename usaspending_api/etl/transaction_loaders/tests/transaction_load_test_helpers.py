@@ -0,0 +1,40 @@
+from django.db import transaction
+
+from usaspending_api.awards.models import Award, TransactionNormalized
+
+
+def without(row, *columns):
+    return {column: value for column, value in row.items() if column not in columns}
+
+
+def loaded_rows(transaction_model):
+    """
+    Every loaded award, normalized transaction and transaction_model (TransactionFPDS or TransactionFABS) row, with
+    generated ids and load times replaced by the natural keys they point to
+    """
+    award_keys = dict(Award.objects.values_list("id", "generated_unique_award_id"))
+    transaction_keys = dict(TransactionNormalized.objects.values_list("id", "transaction_unique_id"))
+    awards = [without(row, "id", "create_date", "update_date") for row in Award.objects.values()]
+    transactions_normalized = [
+        {**without(row, "id", "award_id", "create_date", "update_date"), "award": award_keys[row["award_id"]]}
+        for row in TransactionNormalized.objects.values()
+    ]
+    transactions = [
+        {**without(row, "transaction_id"), "transaction": transaction_keys[row["transaction_id"]]}
+        for row in transaction_model.objects.values()
+    ]
+    return [sorted(rows, key=str) for rows in (awards, transactions_normalized, transactions)]
+
+
+def load_and_roll_back(load, transaction_model):
+    """
+    Runs load, which returns the ids of the awards it created or updated, in a transaction that is rolled back after
+    reading back what it loaded. Returns the loaded_rows and the keys of those awards so that different ways of
+    loading the same records can be compared.
+    """
+    with transaction.atomic():
+        award_ids = load()
+        rows = loaded_rows(transaction_model)
+        award_keys = sorted(Award.objects.filter(id__in=award_ids).values_list("generated_unique_award_id", flat=True))
+        transaction.set_rollback(True)
+    return rows, award_keys
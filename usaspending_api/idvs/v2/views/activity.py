@@ -1,5 +1,5 @@
 from collections import OrderedDict
-from copy import copy, deepcopy
+from copy import copy
 
 from psycopg2.sql import Identifier, Literal, SQL
 from rest_framework.request import Request
@@ -138,7 +138,7 @@ class IDVActivityViewSet(APIView):
 
     @staticmethod
     def _parse_and_validate_request(request: dict) -> dict:
-        return TinyShield(deepcopy(TINY_SHIELD_MODELS)).block(request)
+        return TinyShield.compile(TINY_SHIELD_MODELS).block(request)
 
     @staticmethod
     def _business_logic(request_data: dict) -> tuple:
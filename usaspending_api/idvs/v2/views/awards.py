@@ -1,5 +1,4 @@
 from collections import OrderedDict
-from copy import deepcopy
 
 from psycopg2.sql import Identifier, Literal, SQL
 from rest_framework.request import Request
@@ -180,7 +179,7 @@ class IDVAwardsViewSet(APIView):
 
     @staticmethod
     def _parse_and_validate_request(request: dict) -> dict:
-        return TinyShield(deepcopy(TINY_SHIELD_MODELS)).block(request)
+        return TinyShield.compile(TINY_SHIELD_MODELS).block(request)
 
     @staticmethod
     def _business_logic(request_data: dict) -> list:
@@ -1,5 +1,4 @@
 from collections import OrderedDict
-from copy import deepcopy
 
 from psycopg2.sql import Identifier, Literal, SQL
 from rest_framework.request import Request
@@ -131,7 +130,7 @@ class IDVFundingViewSet(APIView):
 
     @staticmethod
     def _parse_and_validate_request(request_data: dict) -> dict:
-        return TinyShield(deepcopy(TINY_SHIELD_MODELS)).block(request_data)
+        return TinyShield.compile(TINY_SHIELD_MODELS).block(request_data)
 
     @staticmethod
     def _business_logic(request_data: dict) -> list:
@@ -1,8 +1,10 @@
 import logging
 
+from datetime import datetime, timezone
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from pathlib import Path
+from usaspending_api.broker.helpers.last_load_date import update_last_load_date
 from usaspending_api.common.etl import mixins
 from usaspending_api.common.helpers.timing_helpers import ScriptTimer as Timer
 
@@ -21,10 +23,12 @@ class Command(mixins.ETLMixin, BaseCommand):
     etl_dml_sql_directory = Path(__file__).resolve().parent.parent / "sql" / "recipient_lookup"
 
     def handle(self, *args, **options):
+        start_time = datetime.now(timezone.utc)
         with Timer("SQL Files"):
             try:
                 with transaction.atomic():
                     self._perform_load()
+                    update_last_load_date("recipient_lookup", start_time)
                     t = Timer("Commit transaction")
                     t.log_starting_message()
                 t.log_success_message()
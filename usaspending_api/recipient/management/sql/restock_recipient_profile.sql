@@ -345,6 +345,11 @@ INSERT INTO public.recipient_profile (
   FROM public.temporary_restock_recipient_profile;
 DROP TABLE public.temporary_restock_recipient_profile;
 DROP MATERIALIZED VIEW public.temporary_recipients_from_transactions_view;
+-- Record the restock as a "recipient_profile" load (external data type 204) for RECIPIENT_PROFILE_TABLE
+UPDATE public.external_data_load_date SET last_load_date = now() WHERE external_data_type_id = 204;
+INSERT INTO public.external_data_load_date (last_load_date, external_data_type_id)
+  SELECT now(), 204
+  WHERE NOT EXISTS (SELECT 1 FROM public.external_data_load_date WHERE external_data_type_id = 204);
 COMMIT;
 
 VACUUM ANALYZE public.recipient_profile;
@@ -2,11 +2,13 @@ import glob
 import logging
 import re
 
+from datetime import datetime, timezone
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from openpyxl import load_workbook
 
+from usaspending_api.broker.helpers.last_load_date import update_last_load_date
 from usaspending_api.references.models import NAICS
 
 
@@ -73,6 +75,7 @@ def load_single_naics(naics_code, naics_year, naics_desc):
 @transaction.atomic
 def load_naics(path, append):
     logger = logging.getLogger("console")
+    start_time = datetime.now(timezone.utc)
 
     if append:
         logger.info("Appending definitions to existing guide")
@@ -91,3 +94,5 @@ def load_naics(path, append):
 
         naics_year = p_year.search(path).group()
         populate_naics_fields(ws, naics_year, path)
+
+    update_last_load_date("naics", start_time)
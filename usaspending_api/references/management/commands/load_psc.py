@@ -1,4 +1,6 @@
+from datetime import datetime, timezone
 from django.core.management.base import BaseCommand
+from usaspending_api.broker.helpers.last_load_date import update_last_load_date
 from usaspending_api.references.models import PSC
 import os
 import logging
@@ -28,6 +30,7 @@ def load_psc(fullpath, update):
     """
     Create/Update Product or Service Code records from a Excel doc of historical data.
     """
+    start_time = datetime.now(timezone.utc)
     try:
         logger = logging.getLogger("console")
         wb = load_workbook(filename=fullpath, data_only=True)
@@ -58,6 +61,7 @@ def load_psc(fullpath, update):
         if update:
             update_lengths()
             logger.log(20, "Updated PSC codes.")
+        update_last_load_date("psc", start_time)
     except IOError:
         logger.error("Could not open file {}".format(fullpath))
 
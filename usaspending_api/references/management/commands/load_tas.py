@@ -2,13 +2,14 @@ import csv
 import logging
 import sys
 
-from datetime import datetime
+from datetime import datetime, timezone
 
 from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.db import transaction
 
 from usaspending_api.accounts.models import TreasuryAppropriationAccount
+from usaspending_api.broker.helpers.last_load_date import update_last_load_date
 from usaspending_api.common.helpers.timing_helpers import ConsoleTimer as Timer
 from usaspending_api.common.retrieve_file_from_uri import RetrieveFileFromUri
 from usaspending_api.etl.management.load_base import load_data_into_model
@@ -49,6 +50,7 @@ class Command(BaseCommand):
 
     @transaction.atomic()
     def handle(self, *args, **options):
+        start_time = datetime.now(timezone.utc)
         try:
             with Timer("Loading TAS from {}".format(options["location"] or "Broker")):
                 if options["location"]:
@@ -74,6 +76,8 @@ class Command(BaseCommand):
                 agencies = update_federal_account_agency()
                 logger.info(f"   Updated {agencies:,} Federal Account agency links")
 
+            update_last_load_date("tas", start_time)
+
             logger.info("=== TAS loader finished successfully! ===")
 
         except Exception as e:
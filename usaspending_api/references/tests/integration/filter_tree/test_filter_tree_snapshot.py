@@ -0,0 +1,43 @@
+import pytest
+
+from datetime import datetime, timezone
+from model_mommy import mommy
+
+from usaspending_api.broker.helpers.last_load_date import update_last_load_date
+from usaspending_api.broker.lookups import EXTERNAL_DATA_TYPE_DICT
+from usaspending_api.references.v2.views.filter_tree.naics import NAICS_SNAPSHOT
+from usaspending_api.references.v2.views.filter_tree.tas_filter_tree import TASFilterTree
+
+
+@pytest.mark.django_db
+def test_tas_tree_is_served_from_one_snapshot(multiple_tas, django_assert_num_queries):
+    # The load date the snapshot is versioned on and the snapshot itself
+    with django_assert_num_queries(2):
+        tree = [node.to_JSON() for node in TASFilterTree().search(None, None, None, 2, None)]
+
+    with django_assert_num_queries(0):
+        assert [node.to_JSON() for node in TASFilterTree().search(None, None, None, 2, None)] == tree
+        treasury_accounts = [node.to_JSON() for node in TASFilterTree().search("001", "0001", None, 0, None)]
+
+    assert [(agency["id"], agency["count"]) for agency in tree] == [("001", 4)]
+    assert [(fa["id"], fa["count"]) for fa in tree[0]["children"]] == [("0001", 4)]
+    treasury_accounts.sort(key=lambda tas: tas["id"])
+    assert treasury_accounts == [
+        {"id": f"0000{i}", "ancestors": ["001", "0001"], "description": f"TAS 0000{i}", "count": 0, "children": None}
+        for i in range(1, 5)
+    ]
+    assert sorted(tree[0]["children"][0]["children"], key=lambda tas: tas["id"]) == treasury_accounts
+
+
+@pytest.mark.django_db
+def test_snapshot_rebuilt_after_load(settings):
+    mommy.make("broker.ExternalDataType", external_data_type_id=EXTERNAL_DATA_TYPE_DICT["naics"])
+    settings.FILTER_TREE_VERSION_CHECK = 0
+    mommy.make("references.NAICS", code="11", description="Agriculture, Forestry, Fishing and Hunting")
+    assert NAICS_SNAPSHOT.get().tier1_codes == ("11",)
+
+    mommy.make("references.NAICS", code="21", description="Mining, Quarrying, and Oil and Gas Extraction")
+    assert NAICS_SNAPSHOT.get().tier1_codes == ("11",)
+
+    update_last_load_date("naics", datetime.now(timezone.utc))
+    assert NAICS_SNAPSHOT.get().tier1_codes == ("11", "21")
@@ -1,9 +1,12 @@
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable
+from usaspending_api.common.versioned_cache import LoadVersionedValue
 
 DEFAULT_CHILDREN = 0
 
+_SNAPSHOT_CACHES = []
+
 
 @dataclass
 class UnlinkedNode:
@@ -30,6 +33,23 @@ class Node:
         }
 
 
+class SnapshotCache(LoadVersionedValue):
+    """
+    In-process snapshot of a reference hierarchy, so that filter tree requests are answered from memory instead of
+    querying for every node. It is rebuilt after its loader runs, checked every FILTER_TREE_VERSION_CHECK seconds, or
+    once it is FILTER_TREE_SNAPSHOT_TIMEOUT seconds old.
+    """
+
+    def __init__(self, data_type: str, build: Callable[[], Any]):
+        super().__init__(data_type, build, "FILTER_TREE_VERSION_CHECK", "FILTER_TREE_SNAPSHOT_TIMEOUT")
+        _SNAPSHOT_CACHES.append(self)
+
+
+def clear_snapshot_caches():
+    for snapshot_cache in _SNAPSHOT_CACHES:
+        snapshot_cache.clear()
+
+
 class FilterTree(metaclass=ABCMeta):
     def search(self, tier1, tier2, tier3, child_layers, filter_string) -> list:
         if tier3:
@@ -1,20 +1,54 @@
 import logging
-from collections import OrderedDict
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass
 
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models.functions import Length
-from django.db.models import Q
 
 from usaspending_api.common.cache_decorator import cache_response
 from usaspending_api.common.validator.tinyshield import TinyShield
 from usaspending_api.references.models import NAICS
-from usaspending_api.references.v2.views.filter_tree.filter_tree import DEFAULT_CHILDREN
+from usaspending_api.references.v2.views.filter_tree.filter_tree import DEFAULT_CHILDREN, SnapshotCache
 
 logger = logging.getLogger("console")
 
 
+@dataclass(frozen=True)
+class NAICSSnapshot:
+    """
+    NAICS descriptions by code, the sorted 2 digit codes, the sorted child codes of each 2 and 4 digit code and the
+    number of 6 digit codes under each of them
+    """
+
+    descriptions: dict
+    tier1_codes: tuple
+    children: dict
+    counts: dict
+
+
+def build_naics_snapshot() -> NAICSSnapshot:
+    descriptions = dict(NAICS.objects.values_list("code", "description"))
+    children = defaultdict(list)
+    counts = Counter()
+    for code in sorted(descriptions):
+        if len(code) in (4, 6):
+            children[code[:-2]].append(code)
+        if len(code) == 6:
+            counts[code[:2]] += 1
+            counts[code[:4]] += 1
+
+    return NAICSSnapshot(
+        descriptions=descriptions,
+        tier1_codes=tuple(code for code in sorted(descriptions) if len(code) == 2),
+        children={code: tuple(child_codes) for code, child_codes in children.items()},
+        counts=dict(counts),
+    )
+
+
+NAICS_SNAPSHOT = SnapshotCache("naics", build_naics_snapshot)
+
+
 class NAICSViewSet(APIView):
     """
     Return a list of NAICS or a filtered list of NAICS
@@ -40,111 +74,76 @@ class NAICSViewSet(APIView):
         validated = TinyShield(models).block(data)
         return validated
 
-    def _fetch_children(self, naics_code, naics_filter=None) -> list:
+    def _fetch_children(self, naics_code) -> list:
         results = []
-        if naics_filter:
-            naics = NAICS.objects.annotate(text_len=Length("code")).filter(
-                **naics_filter, code__startswith=naics_code, text_len=len(naics_code) + 2
-            )
-        else:
-            naics = NAICS.objects.annotate(text_len=Length("code")).filter(
-                code__startswith=naics_code, text_len=len(naics_code) + 2
-            )
-        for naic in naics:
-            if len(naic.code) < 6:
-                result = OrderedDict()
-                result["naics"] = naic.code
-                result["naics_description"] = naic.description
-                result["count"] = (
-                    NAICS.objects.annotate(text_len=Length("code"))
-                    .filter(code__startswith=naic.code, text_len=6)
-                    .count()
-                )
-            else:
-                result = OrderedDict()
-                result["naics"] = naic.code
-                result["naics_description"] = naic.description
-                result["count"] = DEFAULT_CHILDREN
+        for code in self.snapshot.children.get(naics_code, ()):
+            result = OrderedDict()
+            result["naics"] = code
+            result["naics_description"] = self.snapshot.descriptions[code]
+            result["count"] = self.snapshot.counts.get(code, 0) if len(code) < 6 else DEFAULT_CHILDREN
             results.append(result)
-        results.sort(key=lambda x: x["naics"])
         return results
 
     def _filter_search(self, naics_filter: dict) -> dict:
-        search_filter = Q(description__icontains=naics_filter["description__icontains"])
-        search_filter |= Q(code__icontains=naics_filter["description__icontains"])
-        if naics_filter.get("code"):
-            search_filter &= Q(code__startswith=naics_filter["code"])
+        search_text = naics_filter["description__icontains"].upper()
+        code_prefix = str(naics_filter.get("code") or "")
         tier1_codes = set()
         tier2_codes = set()
-        tier3_codes = set()
-        naics = list(NAICS.objects.annotate(text_len=Length("code")).filter(search_filter))
-        tier3_naics = [naic for naic in naics if len(naic.code) == 6]
-        tier2_naics = [naic for naic in naics if len(naic.code) == 4]
-        tier1_naics = [naic for naic in naics if len(naic.code) == 2]
-        for naic in tier3_naics:
-            tier3_codes.add(naic.code)
-            tier2_codes.add(naic.code[:4])
-            tier1_codes.add(naic.code[:2])
-
-        for naic in tier2_naics:
-            tier2_codes.add(naic.code)
-            tier1_codes.add(naic.code[:2])
-
-        extra_tier2_naics = NAICS.objects.annotate(text_len=Length("code")).filter(code__in=tier2_codes, text_len=4)
-        extra_tier1_naics = NAICS.objects.annotate(text_len=Length("code")).filter(code__in=tier1_codes, text_len=2)
-        tier2 = set(list(tier2_naics)) | set(list(extra_tier2_naics))
-        tier1 = set(list(tier1_naics)) | set(list(extra_tier1_naics))
+        naics = [
+            code
+            for code, description in self.snapshot.descriptions.items()
+            if (search_text in description.upper() or search_text in code.upper()) and code.startswith(code_prefix)
+        ]
+        tier3_naics = [code for code in naics if len(code) == 6]
+        tier2_naics = [code for code in naics if len(code) == 4]
+        tier1_naics = [code for code in naics if len(code) == 2]
+        for code in tier3_naics:
+            tier2_codes.add(code[:4])
+            tier1_codes.add(code[:2])
+
+        for code in tier2_naics:
+            tier1_codes.add(code[:2])
+
+        tier2 = set(tier2_naics) | {code for code in tier2_codes if code in self.snapshot.descriptions}
+        tier1 = set(tier1_naics) | {code for code in tier1_codes if code in self.snapshot.descriptions}
         tier2_results = {}
 
-        for naic in tier2:
+        for code in tier2:
             result = OrderedDict()
-            result["naics"] = naic.code
-            result["naics_description"] = naic.description
-            result["count"] = (
-                NAICS.objects.annotate(text_len=Length("code")).filter(code__startswith=naic.code, text_len=6).count()
-            )
+            result["naics"] = code
+            result["naics_description"] = self.snapshot.descriptions[code]
+            result["count"] = self.snapshot.counts.get(code, 0)
             result["children"] = []
-            tier2_results[naic.code] = result
+            tier2_results[code] = result
 
-        for naic in tier3_naics:
+        for code in sorted(tier3_naics):
             result = OrderedDict()
-            result["naics"] = naic.code
-            result["naics_description"] = naic.description
+            result["naics"] = code
+            result["naics_description"] = self.snapshot.descriptions[code]
             result["count"] = DEFAULT_CHILDREN
-            tier2_results[naic.code[:4]]["children"].append(result)
-            tier2_results[naic.code[:4]]["children"].sort(key=lambda x: x["naics"])
+            tier2_results[code[:4]]["children"].append(result)
         tier1_results = {}
-        for naic in tier1:
+        for code in tier1:
             result = OrderedDict()
-            result["naics"] = naic.code
-            result["naics_description"] = naic.description
-            result["count"] = (
-                NAICS.objects.annotate(text_len=Length("code")).filter(code__startswith=naic.code, text_len=6).count()
-            )
+            result["naics"] = code
+            result["naics_description"] = self.snapshot.descriptions[code]
+            result["count"] = self.snapshot.counts.get(code, 0)
             result["children"] = []
-            tier1_results[naic.code] = result
-        for key in tier2_results.keys():
+            tier1_results[code] = result
+        for key in sorted(tier2_results.keys()):
             tier1_results[key[:2]]["children"].append(tier2_results[key])
-            tier1_results[key[:2]]["children"].sort(key=lambda x: x["naics"])
-        results = []
-        for key in tier1_results.keys():
-            results.append(tier1_results[key])
-        results.sort(key=lambda x: x["naics"])
+        results = [tier1_results[key] for key in sorted(tier1_results.keys())]
         response_content = OrderedDict({"results": results})
         return response_content
 
     def _default_view(self) -> dict:
-        naics = NAICS.objects.annotate(text_len=Length("code")).filter(text_len=2)
         results = []
-        for naic in naics:
+        for code in self.snapshot.tier1_codes:
             result = OrderedDict()
-            result["naics"] = naic.code
-            result["naics_description"] = naic.description
-            result["count"] = (
-                NAICS.objects.annotate(text_len=Length("code")).filter(code__startswith=naic.code, text_len=6).count()
-            )
+            result["naics"] = code
+            result["naics_description"] = self.snapshot.descriptions[code]
+            result["count"] = self.snapshot.counts.get(code, 0)
             results.append(result)
-        results.sort(key=lambda x: x["naics"])
         response_content = OrderedDict({"results": results})
         return response_content
 
@@ -161,22 +160,18 @@ class NAICSViewSet(APIView):
             naics_filter.update({"description__icontains": description})
             return self._filter_search(naics_filter)
 
-        naics = NAICS.objects.filter(**naics_filter)
         results = []
-        for naic in naics:
+        code = str(code)
+        if code in self.snapshot.descriptions:
             result = OrderedDict()
-            if len(naic.code) < 6:
-                result["naics"] = naic.code
-                result["naics_description"] = naic.description
-                result["count"] = (
-                    NAICS.objects.annotate(text_len=Length("code"))
-                    .filter(code__startswith=naic.code, text_len=6)
-                    .count()
-                )
-                result["children"] = self._fetch_children(naic.code)
+            if len(code) < 6:
+                result["naics"] = code
+                result["naics_description"] = self.snapshot.descriptions[code]
+                result["count"] = self.snapshot.counts.get(code, 0)
+                result["children"] = self._fetch_children(code)
             else:
-                result["naics"] = naic.code
-                result["naics_description"] = naic.description
+                result["naics"] = code
+                result["naics_description"] = self.snapshot.descriptions[code]
                 result["count"] = DEFAULT_CHILDREN
             results.append(result)
 
@@ -186,5 +181,6 @@ class NAICSViewSet(APIView):
     @cache_response()
     def get(self, request: Request, requested_naics: str = None) -> Response:
         request_data = self._parse_and_validate_request(requested_naics, request.GET)
+        self.snapshot = NAICS_SNAPSHOT.get()
         results = self._business_logic(request_data)
         return Response(results)
@@ -1,8 +1,10 @@
 import re
 
+from collections import defaultdict
+from dataclasses import dataclass
 from string import ascii_uppercase, digits
 from usaspending_api.references.models import PSC
-from usaspending_api.references.v2.views.filter_tree.filter_tree import UnlinkedNode, FilterTree
+from usaspending_api.references.v2.views.filter_tree.filter_tree import UnlinkedNode, FilterTree, SnapshotCache
 
 
 PSC_GROUPS = {
@@ -15,7 +17,38 @@ PSC_GROUPS = {
 }
 
 
+@dataclass(frozen=True)
+class PSCSnapshot:
+    """PSC nodes of each group, and of each code prefix and length, in the order they were read"""
+
+    groups: dict
+    by_prefix_and_length: dict
+
+
+def build_psc_snapshot() -> PSCSnapshot:
+    groups = defaultdict(list)
+    by_prefix_and_length = defaultdict(list)
+    for code, description, length in PSC.objects.values_list("code", "description", "length"):
+        node = {"id": code, "description": description}
+        for group, group_description in PSC_GROUPS.items():
+            if re.match(group_description["pattern"], code, re.IGNORECASE):
+                groups[group].append(node)
+        for prefix_length in range(1, len(code) + 1):
+            by_prefix_and_length[(code[:prefix_length], length)].append(node)
+
+    return PSCSnapshot(
+        groups={group: tuple(nodes) for group, nodes in groups.items()},
+        by_prefix_and_length={key: tuple(nodes) for key, nodes in by_prefix_and_length.items()},
+    )
+
+
+PSC_SNAPSHOT = SnapshotCache("psc", build_psc_snapshot)
+
+
 class PSCFilterTree(FilterTree):
+    def __init__(self):
+        self.snapshot = PSC_SNAPSHOT.get()
+
     def raw_search(self, tiered_keys):
         if not self._path_is_valid(tiered_keys):
             return []
@@ -40,21 +73,13 @@ class PSCFilterTree(FilterTree):
         return PSC_GROUPS.keys()
 
     def _psc_from_group(self, group):
-        # The default regex value will match nothing
-        return self._psc_from_regex(PSC_GROUPS.get(group, {}).get("pattern") or "(?!)")
-
-    def _psc_from_regex(self, regex):
-        return [
-            {"id": object.code, "description": object.description} for object in PSC.objects.filter(code__iregex=regex)
-        ]  # normally very unsafe, but regexes are not being supplied by the user
+        # Groups other than PSC_GROUPS have no codes
+        return self.snapshot.groups.get(group, ())
 
     def _psc_from_parent(self, parent):
         # two out of three branches of the PSC tree "jump" over 3 character codes
         desired_len = len(parent) + 2 if len(parent) == 2 and parent[0] != "A" else len(parent) + 1
-        return [
-            {"id": object.code, "description": object.description}
-            for object in PSC.objects.filter(length=desired_len, code__startswith=parent)
-        ]
+        return self.snapshot.by_prefix_and_length.get((parent, desired_len), ())
 
     def unlinked_node_from_data(self, ancestors: list, data) -> UnlinkedNode:
         if len(ancestors) == 0:  # A tier zero search is returning an agency dictionary
@@ -1,60 +1,78 @@
+from collections import defaultdict, namedtuple
+from dataclasses import dataclass
 from usaspending_api.common.helpers.business_logic_helpers import cfo_presentation_order, faba_with_file_D_data
-from usaspending_api.accounts.models import TreasuryAppropriationAccount, FederalAccount
-from usaspending_api.references.v2.views.filter_tree.filter_tree import UnlinkedNode, FilterTree
-from usaspending_api.references.models import ToptierAgency
+from usaspending_api.accounts.models import TreasuryAppropriationAccount
+from usaspending_api.references.v2.views.filter_tree.filter_tree import UnlinkedNode, FilterTree, SnapshotCache
 from django.db.models import Exists, OuterRef
 
+FederalAccountData = namedtuple("FederalAccountData", ["federal_account_code", "account_title"])
+TreasuryAccountData = namedtuple("TreasuryAccountData", ["tas_rendering_label", "account_title"])
 
-class TASFilterTree(FilterTree):
-    def raw_search(self, tiered_keys):
-        if len(tiered_keys) == 0:
-            return self._toptier_search()
-        if len(tiered_keys) == 1:
-            return self._fa_given_agency(tiered_keys[0])
-        if len(tiered_keys) == 2:
-            return self._tas_given_fa(tiered_keys[0], tiered_keys[1])
-        return []
 
-    def _toptier_search(self):
-        agency_set = (
-            ToptierAgency.objects.annotate(
-                has_faba=Exists(
-                    faba_with_file_D_data().filter(
-                        treasury_account__federal_account__parent_toptier_agency=OuterRef("pk")
-                    )
-                )
-            )
-            .filter(has_faba=True)
-            .values("toptier_code", "name", "abbreviation")
-        )
-
-        agency_dictionaries = [self._dictionary_from_agency(agency) for agency in agency_set]
-        cfo_sort_results = cfo_presentation_order(agency_dictionaries)
-        return cfo_sort_results["cfo_agencies"] + cfo_sort_results["other_agencies"]
+@dataclass(frozen=True)
+class TASSnapshot:
+    """Agencies, federal accounts and TAS with File C records linked to awards, keyed on the path to their parent"""
 
-    def _dictionary_from_agency(self, agency):
-        return {"toptier_code": agency["toptier_code"], "name": agency["name"], "abbreviation": agency["abbreviation"]}
+    agencies: tuple
+    federal_accounts: dict
+    treasury_accounts: dict
 
-    def _fa_given_agency(self, agency):
-        return FederalAccount.objects.annotate(
-            has_faba=Exists(faba_with_file_D_data().filter(treasury_account__federal_account=OuterRef("pk")))
-        ).filter(has_faba=True, parent_toptier_agency__toptier_code=agency)
 
-    def _tas_given_fa(self, agency, fed_account):
-        return TreasuryAppropriationAccount.objects.annotate(
+def build_tas_snapshot() -> TASSnapshot:
+    treasury_accounts = (
+        TreasuryAppropriationAccount.objects.annotate(
             has_faba=Exists(faba_with_file_D_data().filter(treasury_account=OuterRef("pk")))
-        ).filter(
-            has_faba=True,
-            federal_account__federal_account_code=fed_account,
-            federal_account__parent_toptier_agency__toptier_code=agency,
         )
+        .filter(has_faba=True, federal_account__parent_toptier_agency__isnull=False)
+        .values_list(
+            "federal_account__parent_toptier_agency__toptier_code",
+            "federal_account__parent_toptier_agency__name",
+            "federal_account__parent_toptier_agency__abbreviation",
+            "federal_account__federal_account_code",
+            "federal_account__account_title",
+            "tas_rendering_label",
+            "account_title",
+        )
+    )
+
+    agencies = {}
+    federal_accounts = defaultdict(dict)
+    tas_by_federal_account = defaultdict(list)
+    for toptier_code, name, abbreviation, fa_code, fa_title, tas_rendering_label, tas_title in treasury_accounts:
+        agencies[toptier_code] = {"toptier_code": toptier_code, "name": name, "abbreviation": abbreviation}
+        federal_accounts[toptier_code][fa_code] = FederalAccountData(fa_code, fa_title)
+        tas_by_federal_account[(toptier_code, fa_code)].append(TreasuryAccountData(tas_rendering_label, tas_title))
+
+    cfo_sort_results = cfo_presentation_order(list(agencies.values()))
+    return TASSnapshot(
+        agencies=tuple(cfo_sort_results["cfo_agencies"] + cfo_sort_results["other_agencies"]),
+        federal_accounts={code: tuple(accounts.values()) for code, accounts in federal_accounts.items()},
+        treasury_accounts={key: tuple(accounts) for key, accounts in tas_by_federal_account.items()},
+    )
+
+
+TAS_SNAPSHOT = SnapshotCache("tas", build_tas_snapshot)
+
+
+class TASFilterTree(FilterTree):
+    def __init__(self):
+        self.snapshot = TAS_SNAPSHOT.get()
+
+    def raw_search(self, tiered_keys):
+        if len(tiered_keys) == 0:
+            return self.snapshot.agencies
+        if len(tiered_keys) == 1:
+            return self.snapshot.federal_accounts.get(tiered_keys[0], ())
+        if len(tiered_keys) == 2:
+            return self.snapshot.treasury_accounts.get((tiered_keys[0], tiered_keys[1]), ())
+        return []
 
     def unlinked_node_from_data(self, ancestors: list, data) -> UnlinkedNode:
         if len(ancestors) == 0:  # A tier zero search is returning an agency dictionary
             return self._generate_agency_node(ancestors, data)
-        if len(ancestors) == 1:  # A tier one search is returning a FederalAccount object
+        if len(ancestors) == 1:  # A tier one search is returning a FederalAccountData tuple
             return self._generate_federal_account_node(ancestors, data)
-        if len(ancestors) == 2:  # A tier two search will be returning a TreasuryAppropriationAccount object
+        if len(ancestors) == 2:  # A tier two search will be returning a TreasuryAccountData tuple
             return UnlinkedNode(id=data.tas_rendering_label, ancestors=ancestors, description=data.account_title)
 
     def _generate_agency_node(self, ancestors, data):
@@ -1,5 +1,4 @@
 from collections import OrderedDict
-from copy import deepcopy
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from usaspending_api.accounts.helpers import TAS_COMPONENT_TO_FIELD_MAPPING
@@ -36,7 +35,7 @@ class TASAutocomplete(APIView):
 
     @staticmethod
     def _parse_and_validate_request(request_data):
-        return TinyShield(deepcopy(TINY_SHIELD_MODELS)).block(request_data)
+        return TinyShield.compile(TINY_SHIELD_MODELS).block(request_data)
 
     def _business_logic(self, filters, limit):
 
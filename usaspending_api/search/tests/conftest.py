@@ -1,3 +1,5 @@
+import pytest
+
 from usaspending_api.search.tests.data.spending_by_award_test_data import spending_by_award_test_data
 from usaspending_api.search.tests.integration.spending_by_category.spending_test_fixtures import (
     agencies_with_subagencies,
@@ -6,6 +8,7 @@ from usaspending_api.search.tests.integration.spending_by_category.spending_test
     basic_award,
     subagency_award,
 )
+from usaspending_api.search.v2.views.spending_by_award import AGENCY_ID_CACHE
 
 
 __all__ = [
@@ -16,3 +19,9 @@ __all__ = [
     "spending_by_award_test_data",
     "subagency_award",
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_agency_id_cache():
+    """Agency ids cached in process by spending_by_award must not outlive the test data they were read from"""
+    AGENCY_ID_CACHE.clear()
@@ -5,6 +5,9 @@ from rest_framework import status
 from usaspending_api.common.helpers.generic_helper import get_time_period_message
 from usaspending_api.search.tests.data.search_filters_test_data import non_legacy_filters
 from usaspending_api.search.tests.data.utilities import setup_elasticsearch_test
+from usaspending_api.search.v2.views.spending_by_category_views.spending_by_category import (
+    AbstractSpendingByCategoryViewSet,
+)
 
 
 def test_success_with_all_filters(client, monkeypatch, elasticsearch_transaction_index, awards_and_transactions):
@@ -63,3 +66,30 @@ def test_correct_response_of_empty_list(client, monkeypatch, elasticsearch_trans
     }
     assert resp.status_code == status.HTTP_200_OK, "Failed to return 200 Response"
     assert resp.json() == expected_response
+
+
+def test_correct_response_when_buckets_exceed_initial_count(
+    client, monkeypatch, elasticsearch_transaction_index, awards_and_transactions
+):
+
+    setup_elasticsearch_test(monkeypatch, elasticsearch_transaction_index)
+    # Only a single bucket is requested up front for the page of 10 (upper_limit of 11)
+    monkeypatch.setattr(AbstractSpendingByCategoryViewSet, "initial_bucket_margin", -10)
+
+    resp = client.post(
+        "/api/v2/search/spending_by_category/cfda",
+        content_type="application/json",
+        data=json.dumps({"filters": {"time_period": [{"start_date": "2018-10-01", "end_date": "2020-09-30"}]}}),
+    )
+    expected_response = {
+        "category": "cfda",
+        "limit": 10,
+        "page_metadata": {"page": 1, "next": None, "previous": None, "hasNext": False, "hasPrevious": False},
+        "results": [
+            {"amount": 550.0, "code": "20.200", "id": 200, "name": "CFDA 2"},
+            {"amount": 5.0, "code": "10.100", "id": 100, "name": "CFDA 1"},
+        ],
+        "messages": [get_time_period_message()],
+    }
+    assert resp.status_code == status.HTTP_200_OK, "Failed to return 200 Response"
+    assert resp.json() == expected_response
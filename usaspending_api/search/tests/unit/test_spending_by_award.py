@@ -1,5 +1,7 @@
 import pytest
 
+from model_mommy import mommy
+
 from usaspending_api.awards.v2.lookups.lookups import contract_subaward_mapping
 from usaspending_api.common.helpers.api_helper import raise_if_award_types_not_valid_subset, raise_if_sort_key_not_valid
 from usaspending_api.common.helpers.generic_helper import get_time_period_message
@@ -140,3 +142,55 @@ def test_populate_response():
 
     expected_dictionary["results"] = []
     assert view.populate_response(results=[], has_next=True) == expected_dictionary
+
+
+@pytest.mark.django_db
+def test_get_agency_database_ids(django_assert_num_queries):
+    mommy.make("references.ToptierAgency", toptier_agency_id=1, toptier_code="001")
+    mommy.make("references.ToptierAgency", toptier_agency_id=2, toptier_code="002")
+    mommy.make("references.Agency", id=11, toptier_agency_id=1, toptier_flag=True)
+    mommy.make("references.Agency", id=12, toptier_agency_id=1, toptier_flag=True)
+    mommy.make("references.Agency", id=21, toptier_agency_id=2, toptier_flag=True)
+    mommy.make("submissions.SubmissionAttributes", toptier_code="001")
+
+    view = SpendingByAwardVisualizationViewSet()
+    codes = {view.normalize_toptier_code(code) for code in (1, 2.0, "3")}
+    assert codes == {"001", "002", "003"}
+
+    with django_assert_num_queries(2):
+        assert view.get_agency_database_ids(codes) == {"001": 11, "002": None, "003": None}
+    with django_assert_num_queries(0):
+        assert view.get_agency_database_ids(codes) == {"001": 11, "002": None, "003": None}
+
+
+@pytest.mark.django_db
+def test_append_recipient_hash_levels(django_assert_num_queries):
+    for recipient_hash, duns, level in (
+        ("00000000-0000-0000-0000-000000000001", "111111111", "R"),
+        ("00000000-0000-0000-0000-000000000002", "222222222", "C"),
+    ):
+        mommy.make("recipient.RecipientLookup", recipient_hash=recipient_hash, duns=duns)
+        mommy.make(
+            "recipient.RecipientProfile", recipient_hash=recipient_hash, recipient_level=level, recipient_name=duns
+        )
+
+    view = SpendingByAwardVisualizationViewSet()
+    view.fields = ["Award ID", "recipient_id"]
+    results = [
+        {"recipient_id": "111111111", "parent_recipient_unique_id": None},
+        {"recipient_id": "222222222", "parent_recipient_unique_id": "999999999"},
+        {"recipient_id": "222222222", "parent_recipient_unique_id": None},
+        {"recipient_id": None, "parent_recipient_unique_id": None},
+    ]
+
+    with django_assert_num_queries(1):
+        results = view.append_recipient_hash_levels(results)
+    assert [result["recipient_id"] for result in results] == [
+        "00000000-0000-0000-0000-000000000001-R",
+        "00000000-0000-0000-0000-000000000002-C",
+        None,
+        None,
+    ]
+
+    view.fields = ["Award ID"]
+    assert view.append_recipient_hash_levels([{"recipient_id": "111111111"}]) == [{}]
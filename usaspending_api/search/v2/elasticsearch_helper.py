@@ -39,7 +39,7 @@ def get_total_results(keyword):
     filter_query = QueryWithFilters.generate_transactions_elasticsearch_query(
         {"keyword_search": [es_minimal_sanitize(keyword)]}
     )
-    search = TransactionSearch().filter(filter_query)
+    search = TransactionSearch().filter(filter_query).extra(size=0)
     search.aggs.bucket("types", aggs)
     response = search.handle_execute()
 
@@ -27,6 +27,28 @@ logger = logging.getLogger(__name__)
 API_VERSION = settings.API_VERSION
 
 
+def _prepare_spending_by_transaction_models():
+    models = [
+        {
+            "name": "fields",
+            "key": "fields",
+            "type": "array",
+            "array_type": "text",
+            "text_type": "search",
+            "optional": False,
+        }
+    ]
+    models.extend(copy.deepcopy(AWARD_FILTER))
+    models.extend(copy.deepcopy(PAGINATION))
+    for m in models:
+        if m["name"] in ("keywords", "award_type_codes", "sort"):
+            m["optional"] = False
+    return models
+
+
+SPENDING_BY_TRANSACTION_MODELS = _prepare_spending_by_transaction_models()
+
+
 @api_transformations(api_version=API_VERSION, function_list=API_TRANSFORM_FUNCTIONS)
 class SpendingByTransactionVisualizationViewSet(APIView):
     """
@@ -38,22 +60,7 @@ class SpendingByTransactionVisualizationViewSet(APIView):
     @cache_response()
     def post(self, request):
 
-        models = [
-            {
-                "name": "fields",
-                "key": "fields",
-                "type": "array",
-                "array_type": "text",
-                "text_type": "search",
-                "optional": False,
-            }
-        ]
-        models.extend(copy.deepcopy(AWARD_FILTER))
-        models.extend(copy.deepcopy(PAGINATION))
-        for m in models:
-            if m["name"] in ("keywords", "award_type_codes", "sort"):
-                m["optional"] = False
-        validated_payload = TinyShield(models).block(request.data)
+        validated_payload = TinyShield.compile(SPENDING_BY_TRANSACTION_MODELS).block(request.data)
 
         record_num = (validated_payload["page"] - 1) * validated_payload["limit"]
         if record_num >= settings.ES_TRANSACTIONS_MAX_RESULT_WINDOW:
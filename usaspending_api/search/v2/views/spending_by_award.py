@@ -3,6 +3,7 @@ import copy
 from sys import maxsize
 from django.conf import settings
 from django.db.models import F
+from psycopg2.sql import Literal, SQL
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
@@ -36,7 +37,7 @@ from usaspending_api.recipient.v2.lookups import SPECIAL_CASES
 
 
 from usaspending_api.common.api_versioning import api_transformations, API_TRANSFORM_FUNCTIONS
-from usaspending_api.common.cache_decorator import cache_response
+from usaspending_api.common.cache_decorator import LocalResponseCache, cache_response
 from usaspending_api.common.helpers.api_helper import raise_if_award_types_not_valid_subset, raise_if_sort_key_not_valid
 from usaspending_api.common.helpers.sql_helpers import execute_sql_to_ordered_dictionary
 from usaspending_api.common.query_with_filters import QueryWithFilters
@@ -50,6 +51,26 @@ from usaspending_api.submissions.models import SubmissionAttributes
 
 logger = logging.getLogger(__name__)
 
+# Database ids of the agencies of toptier codes are held in process for this many seconds
+AGENCY_ID_CACHE_TIMEOUT = 300
+AGENCY_ID_CACHE = LocalResponseCache(1000)
+
+RECIPIENT_HASH_SQL = SQL(
+    """
+    select
+        rl.duns,
+        rp.recipient_level,
+        rp.recipient_hash || '-' || rp.recipient_level as hash
+    from
+        recipient_profile rp
+        inner join recipient_lookup rl on rl.recipient_hash = rp.recipient_hash
+    where
+        rl.duns in ({recipient_ids}) and
+        rp.recipient_level in ('R', 'C') and
+        rp.recipient_name not in ({special_cases})
+"""
+)
+
 GLOBAL_MAP = {
     "award": {
         "award_semaphore": "type",
@@ -75,6 +96,51 @@ GLOBAL_MAP = {
 }
 
 
+def _prepare_tiny_shield_models():
+    models = [
+        {"name": "fields", "key": "fields", "type": "array", "array_type": "text", "text_type": "search", "min": 1},
+        {"name": "subawards", "key": "subawards", "type": "boolean", "default": False},
+        {
+            "name": "object_class",
+            "key": "filter|object_class",
+            "type": "array",
+            "array_type": "text",
+            "text_type": "search",
+        },
+        {
+            "name": "program_activity",
+            "key": "filter|program_activity",
+            "type": "array",
+            "array_type": "integer",
+            "array_max": maxsize,
+        },
+        {
+            "name": "last_record_unique_id",
+            "key": "last_record_unique_id",
+            "type": "integer",
+            "required": False,
+            "allow_nulls": True,
+        },
+        {
+            "name": "last_record_sort_value",
+            "key": "last_record_sort_value",
+            "type": "text",
+            "text_type": "search",
+            "required": False,
+            "allow_nulls": True,
+        },
+    ]
+    models.extend(copy.deepcopy(AWARD_FILTER_NO_RECIPIENT_ID))
+    models.extend(copy.deepcopy(PAGINATION))
+    for m in models:
+        if m["name"] in ("award_type_codes", "fields"):
+            m["optional"] = False
+    return models
+
+
+TINY_SHIELD_MODELS = _prepare_tiny_shield_models()
+
+
 @api_transformations(api_version=settings.API_VERSION, function_list=API_TRANSFORM_FUNCTIONS)
 class SpendingByAwardVisualizationViewSet(APIView):
     """
@@ -119,46 +185,7 @@ class SpendingByAwardVisualizationViewSet(APIView):
 
     @staticmethod
     def validate_request_data(request_data):
-        models = [
-            {"name": "fields", "key": "fields", "type": "array", "array_type": "text", "text_type": "search", "min": 1},
-            {"name": "subawards", "key": "subawards", "type": "boolean", "default": False},
-            {
-                "name": "object_class",
-                "key": "filter|object_class",
-                "type": "array",
-                "array_type": "text",
-                "text_type": "search",
-            },
-            {
-                "name": "program_activity",
-                "key": "filter|program_activity",
-                "type": "array",
-                "array_type": "integer",
-                "array_max": maxsize,
-            },
-            {
-                "name": "last_record_unique_id",
-                "key": "last_record_unique_id",
-                "type": "integer",
-                "required": False,
-                "allow_nulls": True,
-            },
-            {
-                "name": "last_record_sort_value",
-                "key": "last_record_sort_value",
-                "type": "text",
-                "text_type": "search",
-                "required": False,
-                "allow_nulls": True,
-            },
-        ]
-        models.extend(copy.deepcopy(AWARD_FILTER_NO_RECIPIENT_ID))
-        models.extend(copy.deepcopy(PAGINATION))
-        for m in models:
-            if m["name"] in ("award_type_codes", "fields"):
-                m["optional"] = False
-
-        return TinyShield(models).block(request_data)
+        return TinyShield.compile(TINY_SHIELD_MODELS).block(request_data)
 
     def if_no_intersection(self):
         # "Special case" behavior: there will never be results when the website provides this value
@@ -306,17 +333,44 @@ class SpendingByAwardVisualizationViewSet(APIView):
 
     # For an unknown reason, ES tends to return the awarding agency toptier codes as integers or floats, instead of as
     # text. This function casts the code back to a string and appends any leading zeroes that were lost.
-    def get_agency_database_id(self, code):
+    @staticmethod
+    def normalize_toptier_code(code):
         if len(str(int(code))) < 3:
             code = "{zeroes}{code}".format(zeroes=("0" * (3 - len(str(int(code))))), code=int(code))
-        agency_id = Agency.objects.filter(toptier_agency__toptier_code=code, toptier_flag=True).first()
-        submission = SubmissionAttributes.objects.filter(toptier_code=code).first()
-        if submission is None or agency_id is None:
-            return None
-        return agency_id.id
+        return str(code)
+
+    @staticmethod
+    def get_agency_database_ids(codes) -> dict:
+        """
+        Map each toptier code to the database id of its toptier Agency, or None when the agency has no submissions.
+        Codes not already in AGENCY_ID_CACHE are resolved with one query for the agencies and one for the submissions.
+        """
+        agency_ids = {}
+        for code in codes:
+            cached = AGENCY_ID_CACHE.get(code)
+            if cached is not None:
+                agency_ids[code] = cached[0]  # cached as a one item tuple, since None is a valid agency id
+
+        missing_codes = set(codes) - set(agency_ids)
+        if missing_codes:
+            first_agency_ids = {}
+            agencies = Agency.objects.filter(toptier_agency__toptier_code__in=missing_codes, toptier_flag=True)
+            for code, agency_id in agencies.order_by("id").values_list("toptier_agency__toptier_code", "id"):
+                first_agency_ids.setdefault(code, agency_id)
+            submitted_codes = set(
+                SubmissionAttributes.objects.filter(toptier_code__in=missing_codes)
+                .values_list("toptier_code", flat=True)
+                .distinct()
+            )
+            for code in missing_codes:
+                agency_ids[code] = first_agency_ids.get(code) if code in submitted_codes else None
+                AGENCY_ID_CACHE.set(code, (agency_ids[code],), AGENCY_ID_CACHE_TIMEOUT)
+
+        return agency_ids
 
     def construct_es_response_for_prime_awards(self, response) -> dict:
         results = []
+        awarding_agency_codes = []
         for res in response:
             hit = res.to_dict()
             row = {k: hit[v] for k, v in self.constants["internal_id_fields"].items()}
@@ -341,18 +395,25 @@ class SpendingByAwardVisualizationViewSet(APIView):
             if row.get("Award Amount"):
                 row["Award Amount"] = float(row["Award Amount"])
             if row.get("Awarding Agency"):
-                code = row.pop("agency_code")
-                row["awarding_agency_id"] = self.get_agency_database_id(code)
+                code = self.normalize_toptier_code(row.pop("agency_code"))
+                row["awarding_agency_id"] = None  # resolved for the whole page below
+                awarding_agency_codes.append((row, code))
             row["generated_internal_id"] = hit["generated_unique_award_id"]
             row["recipient_id"] = hit.get("recipient_unique_id")
             row["parent_recipient_unique_id"] = hit.get("parent_recipient_unique_id")
 
             if "Award ID" in self.fields:
                 row["Award ID"] = hit["display_award_id"]
-            row = self.append_recipient_hash_level(row)
-            row.pop("parent_recipient_unique_id")
             results.append(row)
 
+        agency_ids = self.get_agency_database_ids({code for row, code in awarding_agency_codes})
+        for row, code in awarding_agency_codes:
+            row["awarding_agency_id"] = agency_ids[code]
+
+        results = self.append_recipient_hash_levels(results)
+        for row in results:
+            row.pop("parent_recipient_unique_id")
+
         last_record_unique_id = None
         last_record_sort_value = None
         offset = 1
@@ -385,38 +446,27 @@ class SpendingByAwardVisualizationViewSet(APIView):
             ],
         }
 
-    def append_recipient_hash_level(self, result) -> dict:
+    def append_recipient_hash_levels(self, results) -> list:
+        """Replace the DUNS of each result's recipient with its recipient hash and level, using one query for all"""
         if "recipient_id" not in self.fields:
-            result.pop("recipient_id")
-            return result
-
-        id = result.get("recipient_id")
-        parent_id = result.get("parent_recipient_unique_id")
-        if id:
-            sql = """(
-                    select
-                        rp.recipient_hash || '-' ||  rp.recipient_level as hash
-                    from
-                        recipient_profile rp
-                        inner join recipient_lookup rl on rl.recipient_hash = rp.recipient_hash
-                    where
-                        rl.duns = {recipient_id} and
-                        rp.recipient_level = case
-                            when {parent_recipient_unique_id} is null then 'R'
-                            else 'C'
-                        end and
-                    rp.recipient_name not in {special_cases}
-            )"""
-
-            special_cases = ["'" + case + "'" for case in SPECIAL_CASES]
-            SQL = sql.format(
-                recipient_id="'" + id + "'",
-                parent_recipient_unique_id=parent_id if parent_id else "null",
-                special_cases="(" + ", ".join(special_cases) + ")",
-            )
-            row = execute_sql_to_ordered_dictionary(SQL)
-            if len(row) > 0:
-                result["recipient_id"] = row[0].get("hash")
-            else:
-                result["recipient_id"] = None
-        return result
+            for result in results:
+                result.pop("recipient_id")
+            return results
+
+        recipient_ids = sorted({result["recipient_id"] for result in results if result.get("recipient_id")})
+        if not recipient_ids:
+            return results
+
+        sql = RECIPIENT_HASH_SQL.format(
+            recipient_ids=SQL(", ").join(Literal(recipient_id) for recipient_id in recipient_ids),
+            special_cases=SQL(", ").join(Literal(case) for case in SPECIAL_CASES),
+        )
+        hashes = {}
+        for row in execute_sql_to_ordered_dictionary(sql):
+            hashes.setdefault((row["duns"], row["recipient_level"]), row["hash"])
+
+        for result in results:
+            if result.get("recipient_id"):
+                recipient_level = "C" if result.get("parent_recipient_unique_id") else "R"
+                result["recipient_id"] = hashes.get((result["recipient_id"], recipient_level))
+        return results
@@ -24,6 +24,32 @@ from usaspending_api.common.validator.tinyshield import TinyShield
 logger = logging.getLogger(__name__)
 
 
+def _prepare_tiny_shield_models():
+    models = [
+        {"name": "subawards", "key": "subawards", "type": "boolean", "default": False},
+        {
+            "name": "object_class",
+            "key": "filter|object_class",
+            "type": "array",
+            "array_type": "text",
+            "text_type": "search",
+        },
+        {
+            "name": "program_activity",
+            "key": "filter|program_activity",
+            "type": "array",
+            "array_type": "integer",
+            "array_max": maxsize,
+        },
+    ]
+    models.extend(copy.deepcopy(AWARD_FILTER_NO_RECIPIENT_ID))
+    models.extend(copy.deepcopy(PAGINATION))
+    return models
+
+
+TINY_SHIELD_MODELS = _prepare_tiny_shield_models()
+
+
 @api_transformations(api_version=settings.API_VERSION, function_list=API_TRANSFORM_FUNCTIONS)
 class SpendingByAwardCountVisualizationViewSet(APIView):
     """This route takes award filters, and returns the number of awards in each award type.
@@ -35,27 +61,8 @@ class SpendingByAwardCountVisualizationViewSet(APIView):
 
     @cache_response()
     def post(self, request):
-        models = [
-            {"name": "subawards", "key": "subawards", "type": "boolean", "default": False},
-            {
-                "name": "object_class",
-                "key": "filter|object_class",
-                "type": "array",
-                "array_type": "text",
-                "text_type": "search",
-            },
-            {
-                "name": "program_activity",
-                "key": "filter|program_activity",
-                "type": "array",
-                "array_type": "integer",
-                "array_max": maxsize,
-            },
-        ]
-        models.extend(copy.deepcopy(AWARD_FILTER_NO_RECIPIENT_ID))
-        models.extend(copy.deepcopy(PAGINATION))
         self.original_filters = request.data.get("filters")
-        json_request = TinyShield(models).block(request.data)
+        json_request = TinyShield.compile(TINY_SHIELD_MODELS).block(request.data)
         subawards = json_request["subawards"]
         filters = add_date_range_comparison_types(
             json_request.get("filters", None), subawards, gte_date_type="action_date", lte_date_type="date_signed"
@@ -109,7 +116,7 @@ class SpendingByAwardCountVisualizationViewSet(APIView):
 
     def query_elasticsearch_for_prime_awards(self, filters) -> list:
         filter_query = QueryWithFilters.generate_awards_elasticsearch_query(filters)
-        s = AwardSearch().filter(filter_query)
+        s = AwardSearch().filter(filter_query).extra(size=0)
 
         s.aggs.bucket(
             "types",
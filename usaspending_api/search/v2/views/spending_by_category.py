@@ -37,6 +37,35 @@ logger = logging.getLogger(__name__)
 API_VERSION = settings.API_VERSION
 
 
+def _prepare_tiny_shield_models():
+    categories = [
+        "awarding_agency",
+        "awarding_subagency",
+        "funding_agency",
+        "funding_subagency",
+        "recipient_duns",
+        "recipient_parent_duns",
+        "cfda",
+        "psc",
+        "naics",
+        "county",
+        "district",
+        "country",
+        "state_territory",
+        "federal_account",
+    ]
+    models = [
+        {"name": "category", "key": "category", "type": "enum", "enum_values": categories, "optional": False},
+        {"name": "subawards", "key": "subawards", "type": "boolean", "default": False, "optional": True},
+    ]
+    models.extend(copy.deepcopy(AWARD_FILTER))
+    models.extend(copy.deepcopy(PAGINATION))
+    return models
+
+
+TINY_SHIELD_MODELS = _prepare_tiny_shield_models()
+
+
 @api_transformations(api_version=API_VERSION, function_list=API_TRANSFORM_FUNCTIONS)
 class SpendingByCategoryVisualizationViewSet(APIView):
     """
@@ -49,32 +78,9 @@ class SpendingByCategoryVisualizationViewSet(APIView):
     @cache_response()
     def post(self, request: Request) -> Response:
         """Return all budget function/subfunction titles matching the provided search text"""
-        categories = [
-            "awarding_agency",
-            "awarding_subagency",
-            "funding_agency",
-            "funding_subagency",
-            "recipient_duns",
-            "recipient_parent_duns",
-            "cfda",
-            "psc",
-            "naics",
-            "county",
-            "district",
-            "country",
-            "state_territory",
-            "federal_account",
-        ]
-        models = [
-            {"name": "category", "key": "category", "type": "enum", "enum_values": categories, "optional": False},
-            {"name": "subawards", "key": "subawards", "type": "boolean", "default": False, "optional": True},
-        ]
-        models.extend(copy.deepcopy(AWARD_FILTER))
-        models.extend(copy.deepcopy(PAGINATION))
-
         # Apply/enforce POST body schema and data validation in request
         original_filters = request.data.get("filters")
-        validated_payload = TinyShield(models).block(request.data)
+        validated_payload = TinyShield.compile(TINY_SHIELD_MODELS).block(request.data)
 
         # Execute the business logic for the endpoint and return a python dict to be converted to a Django response
         business_logic_lookup = {
@@ -33,6 +33,18 @@ class Category:
     agg_key: str
 
 
+def _prepare_tiny_shield_models():
+    models = [
+        {"name": "subawards", "key": "subawards", "type": "boolean", "default": False, "optional": True},
+    ]
+    models.extend(copy.deepcopy(AWARD_FILTER))
+    models.extend(copy.deepcopy(PAGINATION))
+    return models
+
+
+TINY_SHIELD_MODELS = _prepare_tiny_shield_models()
+
+
 @api_transformations(api_version=settings.API_VERSION, function_list=API_TRANSFORM_FUNCTIONS)
 class AbstractSpendingByCategoryViewSet(APIView, metaclass=ABCMeta):
     """
@@ -45,17 +57,14 @@ class AbstractSpendingByCategoryViewSet(APIView, metaclass=ABCMeta):
     pagination: Pagination
     subawards: bool
     high_cardinality_categories: List[str] = ["recipient_duns"]
+    # Buckets requested up front, beyond the ones needed for the requested page, for categories that are not high
+    # cardinality; covers the unique values of most filtered categories in a single search
+    initial_bucket_margin: int = 100
 
     @cache_response()
     def post(self, request: Request) -> Response:
-        models = [
-            {"name": "subawards", "key": "subawards", "type": "boolean", "default": False, "optional": True},
-        ]
-        models.extend(copy.deepcopy(AWARD_FILTER))
-        models.extend(copy.deepcopy(PAGINATION))
-
         original_filters = request.data.get("filters")
-        validated_payload = TinyShield(models).block(request.data)
+        validated_payload = TinyShield.compile(TINY_SHIELD_MODELS).block(request.data)
 
         return Response(self.perform_search(validated_payload, original_filters))
 
@@ -115,9 +124,16 @@ class AbstractSpendingByCategoryViewSet(APIView, metaclass=ABCMeta):
             .order_by("-amount")
         )
 
-    def build_elasticsearch_search_with_aggregations(self, filter_query: ES_Q) -> Optional[TransactionSearch]:
+    def build_elasticsearch_search_with_aggregations(
+        self, filter_query: ES_Q, bucket_count: Optional[int] = None
+    ) -> TransactionSearch:
         """
         Using the provided ES_Q object creates a TransactionSearch object with the necessary applied aggregations.
+
+        For categories that are not high cardinality the terms aggregation has to return every bucket so that they
+        can be sorted by sum. When the number of buckets is not known yet the aggregation is sized to the buckets of
+        the requested page plus "initial_bucket_margin"; should that not return every bucket a follow up search is
+        sized from the cardinality of the category.
         """
         # Create the filtered Search Object
         search = TransactionSearch().filter(filter_query)
@@ -133,17 +149,15 @@ class AbstractSpendingByCategoryViewSet(APIView, metaclass=ABCMeta):
             sum_bucket_sort = sum_aggregations["sum_bucket_truncate"]
             group_by_agg_key_values = {"order": {"sum_field": "desc"}}
         else:
-            # Get count of unique buckets; terminate early if there are no buckets matching criteria
-            bucket_count = get_number_of_unique_terms(filter_query, f"{self.category.agg_key}.hash")
-            if bucket_count == 0:
-                return None
-            else:
-                # Add 100 to make sure that we consider enough records in each shard for accurate results;
-                # Only needed for non high-cardinality fields since those are being routed
-                size = bucket_count
-                shard_size = bucket_count + 100
-                sum_bucket_sort = sum_aggregations["sum_bucket_sort"]
-                group_by_agg_key_values = {}
+            if bucket_count is None:
+                bucket_count = self.pagination.upper_limit + self.initial_bucket_margin
+
+            # Add 100 to make sure that we consider enough records in each shard for accurate results;
+            # Only needed for non high-cardinality fields since those are being routed
+            size = bucket_count
+            shard_size = bucket_count + 100
+            sum_bucket_sort = sum_aggregations["sum_bucket_sort"]
+            group_by_agg_key_values = {}
 
         if shard_size > 10000:
             logger.warning(f"Max number of buckets reached for aggregation key: {self.category.agg_key}.")
@@ -169,10 +183,22 @@ class AbstractSpendingByCategoryViewSet(APIView, metaclass=ABCMeta):
 
     def query_elasticsearch_for_prime_awards(self, filter_query: ES_Q) -> list:
         search = self.build_elasticsearch_search_with_aggregations(filter_query)
-        if search is None:
-            return []
         response = search.handle_execute()
-        results = self.build_elasticsearch_result(response.aggs.to_dict())
+        response_dict = response.aggs.to_dict()
+
+        # Documents left out of the terms aggregation means that not every bucket was returned and the sort by sum
+        # could be missing buckets; search again with enough buckets based on the cardinality of the category
+        if (
+            self.category.name not in self.high_cardinality_categories
+            and response_dict["group_by_agg_key"].get("sum_other_doc_count", 0) > 0
+        ):
+            field_count = get_number_of_unique_terms(filter_query, f"{self.category.agg_key}.hash")
+            bucket_count = max(field_count, self.pagination.upper_limit + self.initial_bucket_margin + 1)
+            search = self.build_elasticsearch_search_with_aggregations(filter_query, bucket_count)
+            response = search.handle_execute()
+            response_dict = response.aggs.to_dict()
+
+        results = self.build_elasticsearch_result(response_dict)
         return results
 
     @abstractmethod
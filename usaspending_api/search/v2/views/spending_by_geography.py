@@ -39,6 +39,39 @@ class GeoLayer(Enum):
     STATE = "state"
 
 
+def _prepare_tiny_shield_models():
+    models = [
+        {"name": "subawards", "key": "subawards", "type": "boolean", "default": False},
+        {
+            "name": "scope",
+            "key": "scope",
+            "type": "enum",
+            "optional": False,
+            "enum_values": ["place_of_performance", "recipient_location"],
+        },
+        {
+            "name": "geo_layer",
+            "key": "geo_layer",
+            "type": "enum",
+            "optional": False,
+            "enum_values": ["state", "county", "district"],
+        },
+        {
+            "name": "geo_layer_filters",
+            "key": "geo_layer_filters",
+            "type": "array",
+            "array_type": "text",
+            "text_type": "search",
+        },
+    ]
+    models.extend(copy.deepcopy(AWARD_FILTER))
+    models.extend(copy.deepcopy(PAGINATION))
+    return models
+
+
+TINY_SHIELD_MODELS = _prepare_tiny_shield_models()
+
+
 @api_transformations(api_version=API_VERSION, function_list=API_TRANSFORM_FUNCTIONS)
 class SpendingByGeographyVisualizationViewSet(APIView):
     """
@@ -61,34 +94,8 @@ class SpendingByGeographyVisualizationViewSet(APIView):
 
     @cache_response()
     def post(self, request: Request) -> Response:
-        models = [
-            {"name": "subawards", "key": "subawards", "type": "boolean", "default": False},
-            {
-                "name": "scope",
-                "key": "scope",
-                "type": "enum",
-                "optional": False,
-                "enum_values": ["place_of_performance", "recipient_location"],
-            },
-            {
-                "name": "geo_layer",
-                "key": "geo_layer",
-                "type": "enum",
-                "optional": False,
-                "enum_values": ["state", "county", "district"],
-            },
-            {
-                "name": "geo_layer_filters",
-                "key": "geo_layer_filters",
-                "type": "array",
-                "array_type": "text",
-                "text_type": "search",
-            },
-        ]
-        models.extend(copy.deepcopy(AWARD_FILTER))
-        models.extend(copy.deepcopy(PAGINATION))
         original_filters = request.data.get("filters")
-        json_request = TinyShield(models).block(request.data)
+        json_request = TinyShield.compile(TINY_SHIELD_MODELS).block(request.data)
 
         agg_key_dict = {
             "county": "county_agg_key",
@@ -47,6 +47,26 @@ GROUPING_LOOKUP = {
 }
 
 
+def _prepare_tiny_shield_models():
+    models = [
+        {"name": "subawards", "key": "subawards", "type": "boolean", "default": False},
+        {
+            "name": "group",
+            "key": "group",
+            "type": "enum",
+            "enum_values": list(GROUPING_LOOKUP.keys()),
+            "default": "fy",
+            "optional": False,  # allow to be optional in the future
+        },
+    ]
+    models.extend(copy.deepcopy(AWARD_FILTER))
+    models.extend(copy.deepcopy(PAGINATION))
+    return models
+
+
+TINY_SHIELD_MODELS = _prepare_tiny_shield_models()
+
+
 @api_transformations(api_version=API_VERSION, function_list=API_TRANSFORM_FUNCTIONS)
 class SpendingOverTimeVisualizationViewSet(APIView):
     """
@@ -57,20 +77,7 @@ class SpendingOverTimeVisualizationViewSet(APIView):
 
     @staticmethod
     def validate_request_data(json_data: dict) -> dict:
-        models = [
-            {"name": "subawards", "key": "subawards", "type": "boolean", "default": False},
-            {
-                "name": "group",
-                "key": "group",
-                "type": "enum",
-                "enum_values": list(GROUPING_LOOKUP.keys()),
-                "default": "fy",
-                "optional": False,  # allow to be optional in the future
-            },
-        ]
-        models.extend(copy.deepcopy(AWARD_FILTER))
-        models.extend(copy.deepcopy(PAGINATION))
-        validated_data = TinyShield(models).block(json_data)
+        validated_data = TinyShield.compile(TINY_SHIELD_MODELS).block(json_data)
 
         if validated_data.get("filters", None) is None:
             raise InvalidParameterException("Missing request parameters: filters")
@@ -5,6 +5,7 @@ For the full list of settings and their values: https://docs.djangoproject.com/e
 
 import dj_database_url
 import os
+import tempfile
 
 from django.db import DEFAULT_DB_ALIAS
 from django.utils.crypto import get_random_string
@@ -54,6 +55,25 @@ IS_LOCAL = True
 # False: leave the message in the local file-backed queue to be picked up and processed by the bulk-download container
 RUN_LOCAL_DOWNLOAD_IN_PROCESS = os.environ.get("RUN_LOCAL_DOWNLOAD_IN_PROCESS", "").lower() not in ["false", "0", "no"]
 
+# How to write file downloads
+# True: stream the psql COPY output directly into partitioned zip entries, writing each byte to disk only once;
+# False: write the full psql output to disk, then count, partition, and zip it in separate passes
+STREAM_DOWNLOADS_TO_ZIP = os.environ.get("STREAM_DOWNLOADS_TO_ZIP", "").lower() in ["true", "1", "yes"]
+
+# Maximum number of sources (e.g. D1 and D2 files) of a single download to generate concurrently; 1 generates them
+# one after another.  Values above 1 are unsafe: each source forks its PSQL and zip processes from a worker thread, and
+# a child forked while another thread holds a lock (logging, database driver) can deadlock
+DOWNLOAD_SOURCE_WORKERS = int(os.environ.get("DOWNLOAD_SOURCE_WORKERS", 1))
+
+# Award download sources with an estimated row count above the threshold are split into key ranges which are
+# exported by DOWNLOAD_EXPORT_WORKERS concurrent PSQL processes; 1 exports every source with a single PSQL process
+DOWNLOAD_EXPORT_WORKERS = int(os.environ.get("DOWNLOAD_EXPORT_WORKERS", 1))
+DOWNLOAD_EXPORT_SPLIT_ROW_THRESHOLD = int(os.environ.get("DOWNLOAD_EXPORT_SPLIT_ROW_THRESHOLD", 2000000))
+
+# Deflate level (0-9; lower is faster but produces larger files) and number of threads used to compress download files
+DOWNLOAD_ZIP_COMPRESSION_LEVEL = int(os.environ.get("DOWNLOAD_ZIP_COMPRESSION_LEVEL", 6))
+DOWNLOAD_ZIP_COMPRESSION_WORKERS = int(os.environ.get("DOWNLOAD_ZIP_COMPRESSION_WORKERS", os.cpu_count() or 1))
+
 # AWS Region for USAspending Infrastructure
 USASPENDING_AWS_REGION = ""
 if not USASPENDING_AWS_REGION:
@@ -90,6 +110,14 @@ if not DELETED_TRANSACTION_JOURNAL_FILES:
         os.environ.get("DELETED_TRANSACTION_JOURNAL_FILES") or FPDS_BUCKET_NAME or DELETED_TRANSACTIONS_S3_BUCKET_NAME
     )
 
+
+# Files of the deleted transaction journal are downloaded by DELETE_JOURNAL_FETCH_WORKERS concurrent threads, and the
+# ids parsed from each one are cached (by S3 ETag) under DELETE_JOURNAL_CACHE_PATH so a file is only downloaded once
+DELETE_JOURNAL_FETCH_WORKERS = int(os.environ.get("DELETE_JOURNAL_FETCH_WORKERS", 8))
+DELETE_JOURNAL_CACHE_PATH = os.environ.get("DELETE_JOURNAL_CACHE_PATH") or str(
+    Path(tempfile.gettempdir()) / "delete_journal_cache"
+)
+
 ############################################################
 
 STATE_DATA_BUCKET = ""
@@ -122,6 +150,8 @@ ES_AWARDS_QUERY_ALIAS_PREFIX = "award-query"
 ES_AWARDS_WRITE_ALIAS = "award-load-alias"
 ES_TIMEOUT = 90
 ES_REPOSITORY = ""
+# Maximum number of connections kept open to each Elasticsearch node by the client shared within a process
+ES_CONNECTION_POOL_MAXSIZE = int(os.environ.get("ES_CONNECTION_POOL_MAXSIZE", 25))
 
 # Application definition
 INSTALLED_APPS = [
@@ -385,6 +415,32 @@ CACHE_ENVIRONMENTS = {
 # Set the usaspending-cache to whatever our environment cache dictates
 CACHES["usaspending-cache"] = CACHE_ENVIRONMENTS[CACHE_ENVIRONMENT]
 
+# Responses cached by cache_response are also kept in a small in-process LRU in front of the usaspending-cache.
+# Entries in that LRU are not removed by clear_usaspending_cache, so they are only kept for a short time.
+RESPONSE_CACHE_LOCAL_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_LOCAL_MAX_ENTRIES", 256))
+RESPONSE_CACHE_LOCAL_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_LOCAL_TIMEOUT", 60))
+# Rendered responses larger than this many bytes are not cached
+RESPONSE_CACHE_MAX_ENTRY_SIZE = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRY_SIZE", 10 * 1024 * 1024))
+# Identical requests missing the cache wait (up to RESPONSE_CACHE_LOCK_WAIT seconds) for the one request holding the
+# lock on it to compute and cache the response. Locks expire after RESPONSE_CACHE_LOCK_TIMEOUT seconds; 0 disables them
+RESPONSE_CACHE_LOCK_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_LOCK_TIMEOUT", 120))
+RESPONSE_CACHE_LOCK_WAIT = int(os.environ.get("RESPONSE_CACHE_LOCK_WAIT", 10))
+
+# Recipient lookups and profiles used to build recipient ids are kept in process, up to
+# RECIPIENT_PROFILE_TABLE_MAX_ENTRIES of them for RECIPIENT_PROFILE_TABLE_TIMEOUT seconds. Every
+# RECIPIENT_PROFILE_TABLE_VERSION_CHECK seconds the table checks whether update_recipient_lookup or the recipient_profile
+# restock has run since and if so starts over
+RECIPIENT_PROFILE_TABLE_MAX_ENTRIES = int(os.environ.get("RECIPIENT_PROFILE_TABLE_MAX_ENTRIES", 200000))
+RECIPIENT_PROFILE_TABLE_TIMEOUT = int(os.environ.get("RECIPIENT_PROFILE_TABLE_TIMEOUT", 3600))
+RECIPIENT_PROFILE_TABLE_VERSION_CHECK = int(os.environ.get("RECIPIENT_PROFILE_TABLE_VERSION_CHECK", 60))
+
+# The TAS, PSC and NAICS filter trees are served from in-process snapshots of their hierarchies. Every
+# FILTER_TREE_VERSION_CHECK seconds a snapshot checks whether load_tas, load_psc or load_naics has run since it was
+# built and if so is rebuilt. Snapshots are also rebuilt after FILTER_TREE_SNAPSHOT_TIMEOUT seconds, since the TAS tree
+# only lists accounts with File C records linked to awards, which change with submission loads
+FILTER_TREE_VERSION_CHECK = int(os.environ.get("FILTER_TREE_VERSION_CHECK", 60))
+FILTER_TREE_SNAPSHOT_TIMEOUT = int(os.environ.get("FILTER_TREE_SNAPSHOT_TIMEOUT", 3600))
+
 # DRF extensions
 REST_FRAMEWORK_EXTENSIONS = {
     # Not caching errors, these are logged to exceptions.log
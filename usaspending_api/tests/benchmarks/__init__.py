@@ -0,0 +1,13 @@
+"""
+Benchmarks comparing optimized code paths against the implementations they replaced.  They are not collected by
+pytest and are not shipped as management commands; run one from the repository root with, e.g.
+
+    $ python3 -m usaspending_api.tests.benchmarks.benchmark_csv_helpers --help
+
+Importing this package sets up Django so the benchmarks can import models and read settings.
+"""
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "usaspending_api.settings")
+django.setup()
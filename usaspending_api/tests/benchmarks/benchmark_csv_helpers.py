@@ -0,0 +1,111 @@
+"""
+Compare the block scanning row counter and partitioner in csv_helpers against the csv module based implementations
+they replaced, using a generated delimited file resembling a download file
+
+    $ python3 -m usaspending_api.tests.benchmarks.benchmark_csv_helpers [--rows ROWS] [--row-limit ROW_LIMIT]
+"""
+import argparse
+import csv
+import logging
+import os
+import random
+import tempfile
+
+from usaspending_api.common.csv_helpers import count_rows_in_delimited_file, partition_large_delimited_file
+from usaspending_api.tests.benchmarks.helpers import timed
+
+
+logger = logging.getLogger("console")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000000, help="Number of rows in the generated file")
+    parser.add_argument("--row-limit", type=int, default=1000000, help="Number of rows per partition")
+    options = vars(parser.parse_args())
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        file_path = os.path.join(working_dir, "benchmark.csv")
+        logger.info(f"Generating {options['rows']:,} row file")
+        generate_delimited_file(file_path, options["rows"])
+        logger.info(f"Generated {os.path.getsize(file_path) / 1024 ** 2:,.0f} MB file")
+
+        csv_count, csv_count_duration = timed(csv_module_count_rows, file_path)
+        count, count_duration = timed(count_rows_in_delimited_file, file_path)
+        if count != csv_count:
+            raise RuntimeError(f"Row counts differ: {count:,} vs {csv_count:,}")
+        log_comparison("Counting rows", csv_count_duration, count_duration)
+
+        csv_partitions, csv_partition_duration = timed(
+            csv_module_partition, file_path, options["row_limit"], "csv_module_%s.csv"
+        )
+        partitions, partition_duration = timed(
+            partition_large_delimited_file, file_path, ",", options["row_limit"], "block_scan_%s.csv"
+        )
+        for csv_partition, partition in zip(csv_partitions, partitions):
+            if count_rows_in_delimited_file(partition) != count_rows_in_delimited_file(csv_partition):
+                raise RuntimeError(f"Partition row counts differ for {os.path.basename(partition)}")
+        if len(partitions) != len(csv_partitions):
+            raise RuntimeError(f"Partition counts differ: {len(partitions)} vs {len(csv_partitions)}")
+        log_comparison(f"Partitioning into {len(partitions)} files", csv_partition_duration, partition_duration)
+
+
+def generate_delimited_file(file_path, rows):
+    random.seed(0)
+    with open(file_path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["transaction_id", "piid", "recipient_name", "award_description", "amount", "action_date"])
+        for row_number in range(rows):
+            description = random.choice(
+                ["SERVICES", "SUPPLIES, MISC", 'SO-CALLED "WIDGETS"', "LINE ONE\nLINE TWO", "", "IT SUPPORT"]
+            )
+            writer.writerow(
+                [
+                    row_number,
+                    f"PIID{row_number % 99991:08d}",
+                    f"RECIPIENT {row_number % 7919}, INC.",
+                    description,
+                    f"{random.random() * 1000000:.2f}",
+                    "2020-01-01",
+                ]
+            )
+
+
+def csv_module_count_rows(file_path, delimiter=","):
+    with open(file_path, "r") as f:
+        row_count = sum(1 for row in csv.reader((line.replace("\0", "") for line in f), delimiter=delimiter))
+    return row_count - 1 if row_count > 0 else row_count
+
+
+def csv_module_partition(file_path, row_limit, output_name_template, delimiter=","):
+    new_csv_list = []
+    output_path = os.path.dirname(file_path)
+    with open(file_path, "r") as source_csv:
+        reader = csv.reader(source_csv, delimiter=delimiter)
+        headers = next(reader)
+        dest_csv = None
+        try:
+            for line_number, row in enumerate(reader):
+                if line_number % row_limit == 0:
+                    if dest_csv:
+                        dest_csv.close()
+                    new_csv_list.append(os.path.join(output_path, output_name_template % (len(new_csv_list) + 1)))
+                    dest_csv = open(new_csv_list[-1], "w")
+                    writer = csv.writer(dest_csv, delimiter=delimiter)
+                    writer.writerow(headers)
+                writer.writerow(row)
+        finally:
+            if dest_csv:
+                dest_csv.close()
+    return new_csv_list
+
+
+def log_comparison(description, csv_module_duration, block_scan_duration):
+    logger.info(
+        f"{description}: csv module {csv_module_duration:.2f}s, block scan {block_scan_duration:.2f}s "
+        f"({csv_module_duration / block_scan_duration:.1f}x faster)"
+    )
+
+
+if __name__ == "__main__":
+    main()
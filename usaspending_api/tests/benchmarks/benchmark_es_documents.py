@@ -0,0 +1,119 @@
+"""
+Compare the column at a time document transformation used by es_rapidloader against the per cell pandas converters
+and per document serialization it replaced, using a generated transactions CSV
+
+    $ python3 -m usaspending_api.tests.benchmarks.benchmark_es_documents [--rows ROWS] [--chunksize CHUNKSIZE]
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import tempfile
+
+import pandas as pd
+
+from elasticsearch.serializer import JSONSerializer
+
+from usaspending_api.etl.es_etl_helpers import CONVERTERS, VIEW_COLUMNS, csv_chunk_gen
+from usaspending_api.tests.benchmarks.helpers import timed
+
+
+logger = logging.getLogger("console")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="Number of rows in the generated file")
+    parser.add_argument("--chunksize", type=int, default=250000, help="Number of rows read at a time")
+    options = vars(parser.parse_args())
+
+    chunksize = options["chunksize"]
+    with tempfile.TemporaryDirectory() as working_dir:
+        file_path = os.path.join(working_dir, "benchmark_transactions.csv")
+        logger.info(f"Generating {options['rows']:,} row file")
+        generate_transactions_file(file_path, options["rows"])
+        logger.info(f"Generated {os.path.getsize(file_path) / 1024 ** 2:,.0f} MB file")
+
+        converters_count, converters_duration = timed(count_documents, converters_bulk_lines(file_path, chunksize))
+        vectorized_count, vectorized_duration = timed(count_documents, vectorized_bulk_lines(file_path, chunksize))
+        if vectorized_count != converters_count:
+            raise RuntimeError(f"Document counts differ: {vectorized_count:,} vs {converters_count:,}")
+
+        # Documents are compared in a sample of rows since a whole file's worth would not fit in memory
+        sample = zip(next(converters_bulk_lines(file_path, 10000)), next(vectorized_bulk_lines(file_path, 10000)))
+        for converters_document, vectorized_document in sample:
+            if parse_bulk_lines(vectorized_document) != parse_bulk_lines(converters_document):
+                raise RuntimeError(f"Documents differ: {vectorized_document} vs {converters_document}")
+
+        rows = options["rows"]
+        logger.info(
+            f"Transforming {rows:,} documents: converters {rows / converters_duration:,.0f} docs/s, vectorized "
+            f"{rows / vectorized_duration:,.0f} docs/s ({converters_duration / vectorized_duration:.1f}x faster)"
+        )
+
+
+def generate_transactions_file(file_path, rows):
+    random.seed(0)
+    federal_accounts = [
+        json.dumps(
+            [
+                {"id": account_id, "account_title": random.choice(["SALARIES AND EXPENSES", None]), "code": "097-0100"}
+                for account_id in range(random.randint(1, 3))
+            ]
+        )
+        for _ in range(200)
+    ]
+    tas_paths = ["{{agency=097,main={:04d},sub=000}}".format(main) for main in range(500)] + ["{}"]
+    business_categories = ["{small_business,category_business}", "{government}", "{}", ""]
+    disaster_emergency_fund_codes = ["{L,M}", "{N}", ""]
+    with open(file_path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(VIEW_COLUMNS)
+        for row_number in range(rows):
+            values = {column: f"{column.upper()} {row_number % 9973}" for column in VIEW_COLUMNS}
+            values.update(
+                {
+                    "transaction_id": row_number,
+                    "transaction_amount": f"{random.random() * 1000000:.2f}",
+                    "piid": random.choice([f"PIID{row_number % 99991:08d}", ""]),
+                    "tas_paths": random.choice(tas_paths),
+                    "tas_components": random.choice(tas_paths),
+                    "federal_accounts": random.choice(federal_accounts + [""]),
+                    "business_categories": random.choice(business_categories),
+                    "disaster_emergency_fund_codes": random.choice(disaster_emergency_fund_codes),
+                }
+            )
+            writer.writerow([values[column] for column in VIEW_COLUMNS])
+
+
+def converters_bulk_lines(file_path, chunksize):
+    """The transformation and serialization done by es_rapidloader before it worked a column at a time"""
+    serializer = JSONSerializer()
+    dtype = {k: str for k in VIEW_COLUMNS if k not in CONVERTERS}
+    for file_df in pd.read_csv(file_path, dtype=dtype, converters=CONVERTERS, header=0, chunksize=chunksize):
+        file_df = file_df.where(cond=(pd.notnull(file_df)), other=None)
+        file_df["routing"] = file_df["recipient_agg_key"]
+        documents = []
+        for record in file_df.to_dict(orient="records"):
+            action = {"index": {"routing": record.pop("routing")}}
+            documents.append("{}\n{}".format(serializer.dumps(action), serializer.dumps(record)))
+        yield documents
+
+
+def vectorized_bulk_lines(file_path, chunksize):
+    for chunk in csv_chunk_gen(file_path, chunksize, None, "transactions"):
+        yield chunk.documents
+
+
+def count_documents(chunks):
+    return sum(len(documents) for documents in chunks)
+
+
+def parse_bulk_lines(document):
+    return [json.loads(line) for line in document.split("\n")]
+
+
+if __name__ == "__main__":
+    main()
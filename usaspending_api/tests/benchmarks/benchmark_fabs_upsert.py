@@ -0,0 +1,121 @@
+"""
+Compare the set based FABS upsert used by fabs_nightly_loader against the per row load it replaced, using generated
+source_assistance_transaction rows.  Everything written is rolled back
+
+    $ python3 -m usaspending_api.tests.benchmarks.benchmark_fabs_upsert [--rows ROWS]
+        [--transactions-per-award TRANSACTIONS_PER_AWARD]
+"""
+import argparse
+import logging
+
+from django.db import connection, transaction
+
+from usaspending_api.broker.helpers.upsert_fabs_transactions import (
+    fetch_fabs_data_generator,
+    get_subtier_agency_map,
+    insert_new_fabs,
+    upsert_new_fabs,
+)
+from usaspending_api.tests.benchmarks.helpers import timed
+
+
+logger = logging.getLogger("script")
+
+GENERATE_SOURCE_ROWS_SQL = """
+    with subtiers as (
+        select coalesce(array_agg(subtier_code order by subtier_code), array[null]::text[]) as codes
+        from subtier_agency
+    )
+    insert into source_assistance_transaction (
+        published_award_financial_assistance_id, afa_generated_unique, unique_award_key, record_type, fain,
+        award_modification_amendme, cfda_number, action_date, period_of_performance_star, period_of_performance_curr,
+        modified_at, created_at, updated_at, awarding_sub_tier_agency_c, funding_sub_tier_agency_co, assistance_type,
+        assistance_type_desc, business_types, federal_action_obligation, is_active
+    )
+    select
+        %(first_id)s + n,
+        'BENCHMARK_' || n,
+        'ASST_NON_BENCHMARK_' || n %% %(awards)s,
+        2,
+        'BENCHMARK_' || n %% %(awards)s,
+        n::text,
+        '10.001',
+        (date '2020-01-01' + n %% 365)::text,
+        (date '2020-01-01' + n %% 365)::text,
+        (date '2021-01-01' + n %% 365)::text,
+        now()::timestamp,
+        now()::timestamp,
+        now()::timestamp,
+        codes[1 + n %% array_length(codes, 1)],
+        codes[1 + (n + 1) %% array_length(codes, 1)],
+        '02',
+        'BLOCK GRANT (A)',
+        (array['A', 'M', 'R', 'H'])[1 + n %% 4],
+        n %% 100000,
+        true
+    from subtiers, generate_series(0, %(rows)s - 1) as n
+"""
+
+LOADED_ROWS_SQL = """
+    select  count(*), count(distinct tn.award_id), sum(tn.federal_action_obligation), count(tn.awarding_agency_id)
+    from    transaction_fabs as tf
+            inner join transaction_normalized as tn on tn.id = tf.transaction_id
+    where   tf.afa_generated_unique like 'BENCHMARK\\_%'
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="Number of source rows generated")
+    parser.add_argument("--transactions-per-award", type=int, default=4, help="Source rows per summary award")
+    options = vars(parser.parse_args())
+
+    rows = options["rows"]
+    with transaction.atomic():
+        ids = generate_source_rows(rows, max(rows // options["transactions_per_award"], 1))
+        logger.info(f"Generated {rows:,} source rows")
+
+        savepoint = transaction.savepoint()
+        _, per_row_duration = timed(load, ids, False)
+        per_row_loaded = loaded_rows()
+        transaction.savepoint_rollback(savepoint)
+
+        _, set_based_duration = timed(load, ids, True)
+        set_based_loaded = loaded_rows()
+        if set_based_loaded != per_row_loaded:
+            raise RuntimeError(f"Loaded rows differ: {set_based_loaded} vs {per_row_loaded}")
+
+        logger.info(
+            f"Loading {rows:,} FABS transactions: per row {rows / per_row_duration:,.0f} rows/s, set based "
+            f"{rows / set_based_duration:,.0f} rows/s ({per_row_duration / set_based_duration:.1f}x faster)"
+        )
+        transaction.set_rollback(True)
+
+
+def generate_source_rows(rows, awards):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "select coalesce(max(published_award_financial_assistance_id), 0) + 1 from source_assistance_transaction"
+        )
+        first_id = cursor.fetchone()[0]
+        cursor.execute(GENERATE_SOURCE_ROWS_SQL, {"first_id": first_id, "awards": awards, "rows": rows})
+    return list(range(first_id, first_id + rows))
+
+
+def load(ids, set_based):
+    subtier_agencies = get_subtier_agency_map()
+    for to_insert in fetch_fabs_data_generator(ids):
+        if set_based:
+            upsert_new_fabs(to_insert, subtier_agencies)
+        else:
+            insert_new_fabs(to_insert)
+
+
+def loaded_rows():
+    with connection.cursor() as cursor:
+        cursor.execute(LOADED_ROWS_SQL)
+        return cursor.fetchone()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compare validating a generated AWARD_FILTER request with a TinyShield compiled once against building a TinyShield
+from a copy of the models for every request, as the search endpoints used to
+
+    $ python3 -m usaspending_api.tests.benchmarks.benchmark_tinyshield [--requests REQUESTS] [--items ITEMS]
+"""
+import argparse
+import copy
+import logging
+
+from usaspending_api.common.validator.award_filter import AWARD_FILTER
+from usaspending_api.common.validator.pagination import PAGINATION
+from usaspending_api.common.validator.tinyshield import TinyShield
+from usaspending_api.tests.benchmarks.helpers import timed
+
+
+logger = logging.getLogger("console")
+
+MODELS = AWARD_FILTER + PAGINATION
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Number of requests validated")
+    parser.add_argument("--items", type=int, default=50, help="Number of values in each array filter")
+    options = vars(parser.parse_args())
+
+    request = generate_request(options["items"])
+    repetitions = options["requests"]
+
+    per_request, per_request_duration = timed(
+        lambda: TinyShield(copy.deepcopy(MODELS)).block(request), repetitions=repetitions
+    )
+    compiled, compiled_duration = timed(lambda: TinyShield.compile(MODELS).block(request), repetitions=repetitions)
+    if compiled != per_request:
+        raise RuntimeError("Validated requests differ")
+
+    logger.info(
+        f"Validating {repetitions:,} requests with {options['items']:,} values per filter: per request "
+        f"TinyShield {per_request_duration * 1000 / repetitions:.3f}ms, compiled TinyShield "
+        f"{compiled_duration * 1000 / repetitions:.3f}ms per request "
+        f"({per_request_duration / compiled_duration:.1f}x faster)"
+    )
+
+
+def generate_request(items):
+    values = range(items)
+    return {
+        "filters": {
+            "keywords": [f"keyword {i}" for i in values],
+            "award_ids": [f"AWARD{i:08d}" for i in values],
+            "award_type_codes": ["A", "B", "C", "D"],
+            "time_period": [{"start_date": "2019-10-01", "end_date": "2020-09-30", "date_type": "action_date"}],
+            "agencies": [
+                {"type": "awarding", "tier": "subtier", "name": f"Agency {i}", "toptier_name": f"Toptier {i}"}
+                for i in values
+            ],
+            "legal_entities": [i + 1 for i in values],
+            "recipient_search_text": [f"recipient {i}" for i in values],
+            "recipient_scope": "domestic",
+            "recipient_locations": [{"country": "USA", "state": "VA", "zip": f"{i:05d}"} for i in values],
+            "recipient_type_names": ["small_business"],
+            "place_of_performance_scope": "domestic",
+            "place_of_performance_locations": [{"country": "USA", "state": "VA", "county": f"{i:03d}"} for i in values],
+            "award_amounts": [{"lower_bound": float(i), "upper_bound": float(i + 1)} for i in values],
+            "program_numbers": [f"10.{i:03d}" for i in values],
+            "naics_codes": {"require": [336411 + i for i in values], "exclude": [541511]},
+            "psc_codes": {"require": [["Product", "10", f"{1000 + i}"] for i in values]},
+            "tas_codes": {"require": [["091", f"091-{i:04d}"] for i in values]},
+            "contract_pricing_type_codes": ["J"],
+            "set_aside_type_codes": ["NONE"],
+            "extent_competed_type_codes": ["A"],
+        },
+        "page": 1,
+        "limit": 100,
+        "sort": "Award Amount",
+        "order": "desc",
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+from time import perf_counter
+
+
+def timed(function, *args, repetitions=1):
+    """Call function with args repetitions times, returning the result of the last call and the total seconds taken"""
+    start = perf_counter()
+    for repetition in range(repetitions):
+        result = function(*args)
+    return result, perf_counter() - start
@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from usaspending_api.transactions.transaction_delete_journal_helpers import DeleteJournal, latest_deletions
+
+OBJECTS = [
+    SimpleNamespace(
+        key="2020-01-01_FABSdeletions_1577880000.csv",
+        last_modified=datetime(2020, 1, 1, tzinfo=timezone.utc),
+        e_tag='"etag-1"',
+    ),
+    SimpleNamespace(
+        key="01-02-2020_delete_records_award_1577966400.csv",
+        last_modified=datetime(2020, 1, 2, tzinfo=timezone.utc),
+        e_tag='"etag-2"',
+    ),
+    SimpleNamespace(
+        key="2020-01-03_FABSdeletions_1578052800.csv",
+        last_modified=datetime(2020, 1, 3, tzinfo=timezone.utc),
+        e_tag='"etag-3"',
+    ),
+]
+
+CONTENTS = {
+    OBJECTS[0].key: b"afa_generated_unique\nabc\ndef\n",
+    OBJECTS[1].key: b"detached_award_proc_unique\nxyz\n",
+    OBJECTS[2].key: b"afa_generated_unique\nabc\n\n",
+}
+
+
+def _journal(tmp_path, downloads):
+    journal = DeleteJournal("test-bucket", cache_path=str(tmp_path), workers=2)
+    journal._objects = OBJECTS
+
+    def _download(key):
+        downloads.append(key)
+        return CONTENTS[key]
+
+    journal._download = _download
+    return journal
+
+
+def test_files_are_read_concurrently_and_cached_by_etag(tmp_path):
+    downloads = []
+    files = _journal(tmp_path, downloads).files(lambda obj: "FABSdeletions" in obj.key)
+
+    assert [(file.key, file.column, file.ids) for file in files] == [
+        (OBJECTS[0].key, "afa_generated_unique", ["abc", "def"]),
+        (OBJECTS[2].key, "afa_generated_unique", ["abc"]),
+    ]
+    assert sorted(downloads) == sorted([OBJECTS[0].key, OBJECTS[2].key])
+    assert sorted(path.name for path in (tmp_path / "test-bucket").iterdir()) == ["etag-1.json", "etag-3.json"]
+
+    downloads = []
+    files = _journal(tmp_path, downloads).files(lambda obj: True)
+    assert downloads == [OBJECTS[1].key]
+    assert [file.ids for file in files] == [["abc", "def"], ["xyz"], ["abc"]]
+
+
+def test_cached_files_no_longer_in_bucket_are_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "usaspending_api.transactions.transaction_delete_journal_helpers.retrieve_s3_bucket_object_list",
+        lambda bucket_name: OBJECTS[1:],
+    )
+    _journal(tmp_path, []).files(lambda obj: True)
+
+    journal = DeleteJournal("test-bucket", cache_path=str(tmp_path), workers=2)
+    assert journal.objects == OBJECTS[1:]
+    assert sorted(path.name for path in (tmp_path / "test-bucket").iterdir()) == ["etag-2.json", "etag-3.json"]
+
+
+def test_latest_deletions(tmp_path):
+    files = _journal(tmp_path, []).files(lambda obj: True)
+
+    assert latest_deletions(files) == {
+        "abc": OBJECTS[2].last_modified,
+        "def": OBJECTS[0].last_modified,
+        "xyz": OBJECTS[1].last_modified,
+    }
+    assert latest_deletions(
+        files, lambda file, deleted_id: deleted_id.upper() if file.column == "afa_generated_unique" else None
+    ) == {"ABC": OBJECTS[2].last_modified, "DEF": OBJECTS[0].last_modified}
@@ -1,19 +1,119 @@
+import boto3
 import csv
+import json
 import logging
+import os
 import re
+import threading
 
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, List
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
 from django.conf import settings
 from usaspending_api.common.helpers.date_helper import datetime_is_ge, datetime_is_lt
-from usaspending_api.common.helpers.s3_helpers import access_s3_object, retrieve_s3_bucket_object_list
+from usaspending_api.common.helpers.s3_helpers import retrieve_s3_bucket_object_list
 from usaspending_api.common.helpers.timing_helpers import ScriptTimer as Timer
 
 
 logger = logging.getLogger("script")
 
 
+class DeleteJournalFile(NamedTuple):
+    key: str
+    last_modified: datetime
+    column: str  # header of the column of ids; detached_award_proc_unique or afa_generated_unique
+    ids: List[str]
+
+
+class DeleteJournal:
+    """
+    The files of deleted transaction ids written to S3 when transactions are removed (see store_deleted_fabs and
+    AgnosticDeletes.store_delete_records) and read by every ETL which has to remove them downstream.
+
+    The bucket is listed once per DeleteJournal. Files are downloaded concurrently and the ids parsed from each one
+    are cached locally by the file's ETag, so a file is only ever downloaded and parsed once. Cached files whose ETag
+    is no longer in the bucket are removed when it is listed.
+    """
+
+    def __init__(self, bucket_name: Optional[str] = None, cache_path: Optional[str] = None, workers: int = None):
+        self.bucket_name = bucket_name or settings.DELETED_TRANSACTION_JOURNAL_FILES
+        self.cache_path = Path(cache_path or settings.DELETE_JOURNAL_CACHE_PATH) / (self.bucket_name or "")
+        self.workers = workers or settings.DELETE_JOURNAL_FETCH_WORKERS
+        self._objects = None
+        self._thread_local = threading.local()
+
+    @property
+    def objects(self) -> List["boto3.resources.factory.s3.ObjectSummary"]:
+        if self._objects is None:
+            self._objects = retrieve_s3_bucket_object_list(self.bucket_name)
+            logger.info(f"{len(self._objects):,} files found in bucket '{self.bucket_name}'.")
+            self._prune_cache()
+        return self._objects
+
+    def _prune_cache(self):
+        e_tags = {obj.e_tag.strip('"') for obj in self._objects}
+        for cache_file in self.cache_path.glob("*.json"):
+            if cache_file.stem not in e_tags:
+                try:
+                    cache_file.unlink()
+                except FileNotFoundError:
+                    pass  # Already removed by another process pruning the same cache
+
+    def files(self, include: Callable[["boto3.resources.factory.s3.ObjectSummary"], bool]) -> List[DeleteJournalFile]:
+        """Return the files of the journal for which include(S3 object) is true, in the order they were listed"""
+        objects = [obj for obj in self.objects if include(obj)]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(self._read_file, objects))
+
+    def _read_file(self, obj) -> DeleteJournalFile:
+        cache_file = self.cache_path / "{}.json".format(obj.e_tag.strip('"'))
+        if cache_file.exists():
+            cached = json.loads(cache_file.read_text())
+        else:
+            cached = parse_delete_journal_file(self._download(obj.key))
+            self.cache_path.mkdir(parents=True, exist_ok=True)
+            # Write to a file of its own first so a partially written file is never read back
+            temp_file = cache_file.with_suffix(".{}.tmp".format(threading.get_ident()))
+            temp_file.write_text(json.dumps(cached))
+            os.replace(str(temp_file), str(cache_file))
+        logger.info(f"{len(cached['ids']):,} delete ids found in {obj.key}")
+        return DeleteJournalFile(obj.key, obj.last_modified, cached["column"], cached["ids"])
+
+    def _download(self, key: str) -> bytes:
+        # boto3 clients are thread safe but creating them is not, so each thread creates its own from its own session
+        if not hasattr(self._thread_local, "client"):
+            session = boto3.session.Session()
+            self._thread_local.client = session.client("s3", region_name=settings.USASPENDING_AWS_REGION)
+        return self._thread_local.client.get_object(Bucket=self.bucket_name, Key=key)["Body"].read()
+
+
+def parse_delete_journal_file(contents: bytes) -> dict:
+    reader = csv.reader(contents.decode("utf-8").splitlines())
+    header = next(reader, None)
+    return {"column": header[0] if header else None, "ids": [row[0] for row in reader if row]}
+
+
+def latest_deletions(
+    files: List[DeleteJournalFile], transform_id: Callable[[DeleteJournalFile, str], Optional[str]] = None
+) -> Dict[str, datetime]:
+    """
+    Map every id deleted in files to the last time it was deleted (the last modified time of the latest file listing
+    it). transform_id can rewrite the ids of a file, returning None for ones to skip.
+    """
+    deleted = {}
+    for file in files:
+        for deleted_id in file.ids:
+            if transform_id is not None:
+                deleted_id = transform_id(file, deleted_id)
+                if deleted_id is None:
+                    continue
+            if deleted_id not in deleted or deleted[deleted_id] < file.last_modified:
+                deleted[deleted_id] = file.last_modified
+    return deleted
+
+
 def retrieve_deleted_fabs_transactions(start_datetime: datetime, end_datetime: Optional[datetime] = None) -> dict:
     FABS_regex = r".*_FABSdeletions_(?P<epoch>\d+)\.csv"
     return retrieve_deleted_transactions(FABS_regex, start_datetime, end_datetime)
@@ -27,28 +127,21 @@ def retrieve_deleted_fpds_transactions(start_datetime: datetime, end_datetime: O
 def retrieve_deleted_transactions(
     regex: str, start_datetime: datetime, end_datetime: Optional[datetime] = None
 ) -> dict:
+    journal = DeleteJournal()
     with Timer("Obtaining S3 Object list"):
-        objects = retrieve_s3_bucket_object_list(settings.DELETED_TRANSACTION_JOURNAL_FILES)
-        logger.info(f"{len(objects):,} files found in bucket '{settings.DELETED_TRANSACTION_JOURNAL_FILES}'.")
-        objects = [o for o in objects if re.fullmatch(regex, o.key) is not None]
+        objects = [o for o in journal.objects if re.fullmatch(regex, o.key) is not None]
         logger.info(f"{len(objects):,} files match file pattern '{regex}'.")
         objects = limit_objects_to_date_range(objects, regex, start_datetime, end_datetime)
         logger.info(
             f"{len(objects):,} files found in date range {start_datetime} through {end_datetime or 'the end of time'}."
         )
 
+    keys = {obj.key for obj in objects}
     deleted_records = defaultdict(list)
-    for obj in objects:
-        object_data = access_s3_object(settings.DELETED_TRANSACTION_JOURNAL_FILES, obj)
-        reader = csv.reader(object_data.read().decode("utf-8").splitlines())
-        next(reader)  # skip the header
-
-        transaction_id_list = [rows[0] for rows in reader]
-        logger.info(f"{len(transaction_id_list):,} delete ids found in {obj.key}")
-
-        if transaction_id_list:
-            file_date = obj.key[: obj.key.find("_")]
-            deleted_records[file_date].extend(transaction_id_list)
+    for file in journal.files(lambda obj: obj.key in keys):
+        if file.ids:
+            file_date = file.key[: file.key.find("_")]
+            deleted_records[file_date].extend(file.ids)
 
     return deleted_records
 